@@ -0,0 +1,68 @@
+"""
+Times mutate, configure_crossover and distance on DefaultGenome against ArrayGenome,
+for genomes of increasing size.
+"""
+from __future__ import print_function
+
+import os
+import random
+import timeit
+
+import numpy as np
+
+import neat
+
+
+def make_genomes(genome_type, config, num_hidden, count=20):
+    config.num_hidden = num_hidden
+    config.node_indexer = None
+    genomes = []
+    for key in range(count):
+        g = genome_type(key)
+        g.configure_new(config)
+        g.fitness = random.random()
+        genomes.append(g)
+    return genomes
+
+
+def time_operators(genome_type, config, genomes):
+    def mutate():
+        for g in genomes:
+            g.mutate(config)
+
+    def crossover():
+        for g1, g2 in zip(genomes, genomes[1:]):
+            genome_type(0).configure_crossover(g1, g2, config)
+
+    def distance():
+        for g1 in genomes:
+            for g2 in genomes:
+                g1.distance(g2, config)
+
+    return [min(timeit.repeat(f, number=1, repeat=3)) for f in (mutate, crossover, distance)]
+
+
+def run(config_file):
+    config = neat.Config(neat.DefaultGenome, neat.DefaultReproduction,
+                         neat.DefaultSpeciesSet, neat.DefaultStagnation,
+                         config_file)
+    # Both genome types take the same DefaultGenomeConfig.
+    genome_config = config.genome_config
+    genome_config.initial_connection = 'full_direct'
+
+    print("{0:>8} {1:>12} {2:>14} {3:>12} {4:>14} {5:>14}".format(
+        "nodes", "connections", "genome", "mutate (ms)", "crossover (ms)", "distance (ms)"))
+    for num_hidden in (10, 50, 200):
+        for genome_type in (neat.DefaultGenome, neat.ArrayGenome):
+            random.seed(0)
+            np.random.seed(0)
+            genomes = make_genomes(genome_type, genome_config, num_hidden)
+            nodes, connections = genomes[0].size()
+            times = time_operators(genome_type, genome_config, genomes)
+            print("{0:8d} {1:12d} {2:>14} {3:12.2f} {4:14.2f} {5:14.2f}".format(
+                nodes, connections, genome_type.__name__, *[t * 1000.0 for t in times]))
+
+
+if __name__ == '__main__':
+    local_dir = os.path.dirname(__file__)
+    run(os.path.join(local_dir, 'config-benchmark'))
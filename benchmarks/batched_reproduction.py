@@ -0,0 +1,76 @@
+"""
+Times making one generation of children (crossover then mutation, from parent pairs
+already chosen) with DefaultGenome and ArrayGenome one child at a time, and with
+ArrayGenome.create_offspring for all of them at once, as DefaultReproduction uses it.
+"""
+from __future__ import print_function
+
+import os
+import random
+import time
+
+import numpy as np
+
+import neat
+
+
+def make_parents(genome_type, config, count):
+    config.node_indexer = None
+    parents = []
+    for key in range(count):
+        g = genome_type(key)
+        g.configure_new(config)
+        for _ in range(5):
+            g.mutate(config)
+        g.fitness = random.random()
+        parents.append(g)
+    return parents
+
+
+def one_at_a_time(genome_type, keys, pairs, config):
+    children = []
+    for key, (parent1, parent2) in zip(keys, pairs):
+        child = genome_type(key)
+        child.configure_crossover(parent1, parent2, config)
+        child.mutate(config)
+        children.append(child)
+    return children
+
+
+def run(config_file):
+    config = neat.Config(neat.DefaultGenome, neat.DefaultReproduction,
+                         neat.DefaultSpeciesSet, neat.DefaultStagnation,
+                         config_file)
+    # Both genome types take the same DefaultGenomeConfig.
+    genome_config = config.genome_config
+    # Small genomes (8 inputs, 2 outputs, 5 hidden nodes), so that large populations fit.
+    genome_config.num_inputs = 8
+    genome_config.input_keys = [-i - 1 for i in range(8)]
+    genome_config.num_outputs = 2
+    genome_config.output_keys = [0, 1]
+    genome_config.num_hidden = 5
+    genome_config.initial_connection = 'full_direct'
+
+    print("{0:>10} {1:>14} {2:>16} {3:>16} {4:>20}".format(
+        "pop_size", "genes/child", "DefaultGenome (s)", "ArrayGenome (s)", "create_offspring (s)"))
+    for pop_size in (1000, 10000, 100000):
+        random.seed(0)
+        np.random.seed(0)
+        times = []
+        for genome_type, batched in ((neat.DefaultGenome, False), (neat.ArrayGenome, False), (neat.ArrayGenome, True)):
+            parents = make_parents(genome_type, genome_config, pop_size // 5)
+            pairs = [(random.choice(parents), random.choice(parents)) for _ in range(pop_size)]
+            keys = list(range(pop_size))
+            start = time.time()
+            if batched:
+                children = genome_type.create_offspring(keys, pairs, genome_config)
+            else:
+                children = one_at_a_time(genome_type, keys, pairs, genome_config)
+            times.append(time.time() - start)
+        genes = np.mean([sum(child.size()) for child in children])
+        print("{0:10d} {1:14.1f} {2:16.2f} {3:16.2f} {4:20.2f}".format(pop_size, genes, *times))
+
+
+if __name__ == '__main__':
+    local_dir = os.path.dirname(__file__)
+    run(os.path.join(local_dir, 'config-benchmark'))
@@ -0,0 +1,55 @@
+"""
+Times the attribute mutation of DefaultGenome.mutate (with the structural mutations
+turned off) gene by gene and with bulk_mutation, for genomes of increasing size.
+"""
+from __future__ import print_function
+
+import os
+import random
+import timeit
+
+import neat
+
+
+def make_genomes(config, num_hidden, count=20):
+    config.num_hidden = num_hidden
+    config.node_indexer = None
+    genomes = []
+    for key in range(count):
+        g = neat.DefaultGenome(key)
+        g.configure_new(config)
+        genomes.append(g)
+    return genomes
+
+
+def run(config_file):
+    config = neat.Config(neat.DefaultGenome, neat.DefaultReproduction,
+                         neat.DefaultSpeciesSet, neat.DefaultStagnation,
+                         config_file)
+    genome_config = config.genome_config
+    genome_config.initial_connection = 'full_direct'
+    genome_config.conn_add_prob = genome_config.conn_delete_prob = 0.0
+    genome_config.node_add_prob = genome_config.node_delete_prob = 0.0
+
+    print("{0:>8} {1:>12} {2:>16} {3:>14} {4:>8}".format(
+        "nodes", "connections", "per gene (ms)", "bulk (ms)", "speedup"))
+    for num_hidden in (0, 10, 50, 200):
+        random.seed(0)
+        genomes = make_genomes(genome_config, num_hidden)
+
+        def mutate():
+            for g in genomes:
+                g.mutate(genome_config)
+
+        times = []
+        for bulk in (False, True):
+            genome_config.bulk_mutation = bulk
+            times.append(min(timeit.repeat(mutate, number=1, repeat=5)))
+        nodes, connections = genomes[0].size()
+        print("{0:8d} {1:12d} {2:16.2f} {3:14.2f} {4:7.1f}x".format(
+            nodes, connections, times[0] * 1000.0, times[1] * 1000.0, times[0] / times[1]))
+
+
+if __name__ == '__main__':
+    local_dir = os.path.dirname(__file__)
+    run(os.path.join(local_dir, 'config-benchmark'))
@@ -0,0 +1,59 @@
+"""
+Times simulating one second of a CTRNN with the dictionary-based CTRNN at a
+conservative fixed time step, and with VectorizedCTRNN using each integration
+method at half of its maximum stable time step.
+"""
+from __future__ import print_function
+
+import os
+import random
+import timeit
+
+import neat
+from neat.ctrnn import INTEGRATION_METHODS
+from neat.ctrnn.vectorized import VectorizedCTRNN
+
+TIME_CONSTANT = 0.05
+FIXED_TIME_STEP = 0.001
+
+
+def make_genome(config, num_hidden, num_mutations):
+    config.genome_config.num_hidden = num_hidden
+    config.genome_config.node_indexer = None
+    g = neat.DefaultGenome(0)
+    g.configure_new(config.genome_config)
+    for _ in range(num_mutations):
+        g.mutate_add_connection(config.genome_config)
+    return g
+
+
+def simulate(net, inputs, time_step):
+    net.reset()
+    net.advance(inputs, 1.0, time_step)
+
+
+def run(config_file):
+    config = neat.Config(neat.DefaultGenome, neat.DefaultReproduction,
+                         neat.DefaultSpeciesSet, neat.DefaultStagnation,
+                         config_file)
+    config.genome_config.feed_forward = False
+    random.seed(0)
+    inputs = [random.uniform(-1.0, 1.0) for _ in config.genome_config.input_keys]
+
+    print("{0:>8} {1:>12} {2:>12} {3:>12} {4:>12} {5:>12} {6:>12}".format(
+        "nodes", "connections", "dicts (ms)", "euler (ms)", "fwd (ms)", "rk4 (ms)", "exp (ms)"))
+    for num_hidden in (10, 50, 100):
+        g = make_genome(config, num_hidden, num_hidden * 5)
+        net = neat.ctrnn.CTRNN.create(g, config, TIME_CONSTANT)
+        times = [min(timeit.repeat(lambda: simulate(net, inputs, FIXED_TIME_STEP), number=1, repeat=3))]
+        for method in INTEGRATION_METHODS:
+            vnet = VectorizedCTRNN.create(g, config, TIME_CONSTANT, method)
+            time_step = 0.5 * vnet.get_max_time_step()
+            times.append(min(timeit.repeat(lambda: simulate(vnet, inputs, time_step), number=1, repeat=3)))
+        print("{0:8d} {1:12d} {2:12.2f} {3:12.2f} {4:12.2f} {5:12.2f} {6:12.2f}".format(
+            len(g.nodes), len(g.connections), *[t * 1000.0 for t in times]))
+
+
+if __name__ == '__main__':
+    local_dir = os.path.dirname(__file__)
+    run(os.path.join(local_dir, 'config-benchmark'))
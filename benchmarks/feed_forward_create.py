@@ -0,0 +1,68 @@
+"""
+Times FeedForwardNetwork.create on large feed-forward genomes, comparing it with
+the previous implementation, which scanned every connection once per node.
+"""
+from __future__ import print_function
+
+import os
+import random
+import timeit
+
+import neat
+from neat.graphs import feed_forward_layers
+from neat.six_util import itervalues
+
+
+def create_by_scanning(genome, config):
+    """The previous FeedForwardNetwork.create, kept here for comparison."""
+    connections = [cg.key for cg in itervalues(genome.connections) if cg.enabled]
+
+    layers = feed_forward_layers(config.genome_config.input_keys, config.genome_config.output_keys, connections)
+    node_evals = []
+    for layer in layers:
+        for node in layer:
+            inputs = []
+            for conn_key in connections:
+                inode, onode = conn_key
+                if onode == node:
+                    cg = genome.connections[conn_key]
+                    inputs.append((inode, cg.weight))
+
+            ng = genome.nodes[node]
+            aggregation_function = config.genome_config.aggregation_function_defs.get(ng.aggregation)
+            activation_function = config.genome_config.activation_defs.get(ng.activation)
+            node_evals.append((node, activation_function, aggregation_function, ng.bias, ng.response, inputs))
+
+    return neat.nn.FeedForwardNetwork(config.genome_config.input_keys, config.genome_config.output_keys, node_evals)
+
+
+def make_genome(config, num_hidden, num_splits):
+    config.genome_config.num_hidden = num_hidden
+    config.genome_config.node_indexer = None
+    g = neat.DefaultGenome(0)
+    g.configure_new(config.genome_config)
+    # Split some connections so that the network has more than one hidden layer.
+    for _ in range(num_splits):
+        g.mutate_add_node(config.genome_config)
+    return g
+
+
+def run(config_file):
+    config = neat.Config(neat.DefaultGenome, neat.DefaultReproduction,
+                         neat.DefaultSpeciesSet, neat.DefaultStagnation,
+                         config_file)
+    random.seed(0)
+
+    print("{0:>8} {1:>12} {2:>14} {3:>14} {4:>8}".format(
+        "nodes", "connections", "scan (ms)", "grouped (ms)", "speedup"))
+    for num_hidden in (10, 50, 100, 200):
+        g = make_genome(config, num_hidden, num_hidden)
+        old = min(timeit.repeat(lambda: create_by_scanning(g, config), number=1, repeat=3))
+        new = min(timeit.repeat(lambda: neat.nn.FeedForwardNetwork.create(g, config), number=1, repeat=3))
+        print("{0:8d} {1:12d} {2:14.2f} {3:14.2f} {4:7.1f}x".format(
+            len(g.nodes), len(g.connections), old * 1000.0, new * 1000.0, old / new))
+
+
+if __name__ == '__main__':
+    local_dir = os.path.dirname(__file__)
+    run(os.path.join(local_dir, 'config-benchmark'))
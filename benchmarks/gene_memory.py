@@ -0,0 +1,83 @@
+"""
+Reports the memory used per gene, genome and species object with the slotted classes,
+against plain objects holding the same attributes in a per-instance __dict__ (as the
+classes did before they had __slots__).  Attribute values are shared between the two,
+so only the objects themselves are counted.
+"""
+from __future__ import print_function
+
+import os
+import random
+import tracemalloc
+
+import neat
+from neat.species import Species
+
+
+_dict_classes = {}
+
+
+def as_dict_object(obj):
+    """Returns an instance of a plain class (one per original class) with the same attributes as obj."""
+    cls = _dict_classes.get(obj.__class__)
+    if cls is None:
+        cls = _dict_classes[obj.__class__] = type('Dict' + obj.__class__.__name__, (object,), {})
+    d = cls()
+    for name, value in obj.__getstate__().items():
+        setattr(d, name, value)
+    return d
+
+
+def traced_bytes(make, objects):
+    """Returns the bytes allocated by make(obj) for each of objects, per object."""
+    tracemalloc.start()
+    start = tracemalloc.get_traced_memory()[0]
+    copies = [make(obj) for obj in objects]
+    size = tracemalloc.get_traced_memory()[0] - start
+    tracemalloc.stop()
+    del copies
+    return size / float(len(objects))
+
+
+def copy_slotted(obj):
+    new = obj.__class__.__new__(obj.__class__)
+    new.__setstate__(obj.__getstate__())
+    return new
+
+
+def run(config_file):
+    config = neat.Config(neat.DefaultGenome, neat.DefaultReproduction,
+                         neat.DefaultSpeciesSet, neat.DefaultStagnation,
+                         config_file)
+    random.seed(0)
+    config.genome_config.num_hidden = 20
+    genomes = []
+    for key in range(50):
+        g = neat.DefaultGenome(key)
+        g.configure_new(config.genome_config)
+        for _ in range(200):
+            g.mutate_add_connection(config.genome_config)
+        genomes.append(g)
+
+    species = []
+    for key, g in enumerate(genomes):
+        s = Species(key, 0)
+        s.update(g, {g.key: g})
+        species.append(s)
+
+    objects = [("node gene", [ng for g in genomes for ng in g.nodes.values()]),
+               ("connection gene", [cg for g in genomes for cg in g.connections.values()]),
+               ("genome", genomes),
+               ("species", species)]
+
+    print("{0:>16} {1:>10} {2:>16} {3:>16} {4:>8}".format("object", "count", "__dict__ (B)", "__slots__ (B)", "saving"))
+    for name, objs in objects:
+        before = traced_bytes(as_dict_object, objs)
+        after = traced_bytes(copy_slotted, objs)
+        print("{0:>16} {1:10d} {2:16.1f} {3:16.1f} {4:7.0f}%".format(
+            name, len(objs), before, after, 100.0 * (1.0 - after / before)))
+
+
+if __name__ == '__main__':
+    local_dir = os.path.dirname(__file__)
+    run(os.path.join(local_dir, 'config-benchmark'))
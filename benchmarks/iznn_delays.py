@@ -0,0 +1,52 @@
+"""
+Times IZNN and VectorizedIZNN on a randomly connected network with propagation
+delays drawn uniformly from zero up to the given maximum; the cost per step
+should not grow with the length of the delays.
+"""
+from __future__ import print_function
+
+import random
+import timeit
+
+import neat
+from neat.iznn.vectorized import VectorizedIZNN
+
+NUM_NEURONS = 200
+LINKS_PER_NEURON = 20
+NUM_STEPS = 1000
+TIME_STEP = 0.05
+
+
+def make_network(max_delay, backend):
+    random.seed(0)
+    p = neat.iznn.REGULAR_SPIKING_PARAMS
+    neurons = {}
+    delays = {}
+    for key in range(NUM_NEURONS):
+        links = [(random.randrange(NUM_NEURONS), random.uniform(-0.5, 3.0)) for _ in range(LINKS_PER_NEURON)]
+        for i, w in links:
+            delays[i, key] = random.uniform(0.0, max_delay)
+        neurons[key] = neat.iznn.IZNeuron(random.uniform(5.0, 15.0), p['a'], p['b'], p['c'], p['d'], links)
+    return backend(neurons, [], list(neurons), delays=delays)
+
+
+def simulate(net):
+    net.reset()
+    return net.advance_many(NUM_STEPS, [], TIME_STEP)
+
+
+def run():
+    print("{0:>14} {1:>14} {2:>12} {3:>12} {4:>12}".format(
+        "max delay (ms)", "spikes/step", "IZNN (ms)", "dense (ms)", "event (ms)"))
+    for max_delay in (0.0, 1.0, 5.0, 20.0, 100.0):
+        net = make_network(max_delay, neat.iznn.IZNN)
+        dense = make_network(max_delay, VectorizedIZNN)
+        event = make_network(max_delay, lambda *args, **kwargs: VectorizedIZNN(*args, event_driven=True, **kwargs))
+        spikes = simulate(dense).sum() / NUM_STEPS
+        times = [min(timeit.repeat(lambda: simulate(n), number=1, repeat=3)) for n in (net, dense, event)]
+        print("{0:14.1f} {1:14.2f} {2:12.2f} {3:12.2f} {4:12.2f}".format(
+            max_delay, spikes, *[t * 1000.0 for t in times]))
+
+
+if __name__ == '__main__':
+    run()
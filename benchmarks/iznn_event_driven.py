@@ -0,0 +1,50 @@
+"""
+Compares the dense and event-driven modes of VectorizedIZNN on a randomly
+connected network at several firing rates, set by the neurons' bias currents
+(drawn uniformly from 0.5 to 1.5 times the given level).
+"""
+from __future__ import print_function
+
+import random
+import timeit
+
+import neat
+from neat.iznn.vectorized import VectorizedIZNN
+
+NUM_NEURONS = 1000
+LINKS_PER_NEURON = 100
+NUM_STEPS = 2000
+TIME_STEP = 0.05
+
+
+def make_neurons(bias):
+    p = neat.iznn.REGULAR_SPIKING_PARAMS
+    neurons = {}
+    for key in range(NUM_NEURONS):
+        links = [(random.randrange(NUM_NEURONS), random.uniform(-0.5, 0.5)) for _ in range(LINKS_PER_NEURON)]
+        neurons[key] = neat.iznn.IZNeuron(random.uniform(0.5 * bias, 1.5 * bias), p['a'], p['b'], p['c'], p['d'], links)
+    return neurons
+
+
+def simulate(net):
+    net.reset()
+    return net.advance_many(NUM_STEPS, [], TIME_STEP)
+
+
+def run():
+    random.seed(0)
+    print("{0:>6} {1:>14} {2:>12} {3:>12} {4:>8}".format(
+        "bias", "spikes/step", "dense (ms)", "event (ms)", "speedup"))
+    for bias in (0.0, 5.0, 10.0, 20.0, 40.0, 80.0):
+        neurons = make_neurons(bias)
+        dense = VectorizedIZNN(neurons, [], list(neurons))
+        event = VectorizedIZNN(neurons, [], list(neurons), event_driven=True)
+        spikes = simulate(dense).sum() / NUM_STEPS
+        old = min(timeit.repeat(lambda: simulate(dense), number=1, repeat=3))
+        new = min(timeit.repeat(lambda: simulate(event), number=1, repeat=3))
+        print("{0:6.1f} {1:14.2f} {2:12.2f} {3:12.2f} {4:7.1f}x".format(
+            bias, spikes, old * 1000.0, new * 1000.0, old / new))
+
+
+if __name__ == '__main__':
+    run()
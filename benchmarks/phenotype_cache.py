@@ -0,0 +1,61 @@
+"""
+Runs a short evolution with a fitness function that builds a FeedForwardNetwork for
+every genome, with and without a PhenotypeCache (keyed by genome identity, the
+default, or by genome_fingerprint or genome_hashes), and reports the time spent
+creating networks and the cache's hit rate.  Hits come from elites and, with a
+fingerprint, from identical offspring.
+"""
+from __future__ import print_function
+
+import os
+import random
+import time
+
+import neat
+from neat.phenotype_cache import genome_fingerprint, genome_hashes
+
+NUM_GENERATIONS = 5
+NUM_CASES = 10
+
+
+def run_evolution(config, cache):
+    random.seed(0)
+    cases = [[random.uniform(-1.0, 1.0) for _ in config.genome_config.input_keys] for _ in range(NUM_CASES)]
+    timing = [0.0]
+
+    def eval_genomes(genomes, config):
+        for ignored_genome_id, genome in genomes:
+            start = time.time()
+            if cache is None:
+                net = neat.nn.FeedForwardNetwork.create(genome, config)
+            else:
+                net = cache.create(neat.nn.FeedForwardNetwork, genome, config)
+            timing[0] += time.time() - start
+            genome.fitness = sum(sum(net.activate(case)) for case in cases)
+
+    p = neat.Population(config)
+    p.run(eval_genomes, NUM_GENERATIONS)
+    return timing[0]
+
+
+def run():
+    local_dir = os.path.dirname(__file__)
+    config = neat.Config(neat.DefaultGenome, neat.DefaultReproduction,
+                         neat.DefaultSpeciesSet, neat.DefaultStagnation,
+                         os.path.join(local_dir, 'config-benchmark'))
+    config.fitness_threshold = float('inf')
+    config.genome_config.num_hidden = 0
+
+    print("{0:>20} {1:>10} {2:>8} {3:>8} {4:>9}".format("key", "time (ms)", "hits", "misses", "hit rate"))
+    print("{0:>20} {1:10.1f}".format("(no cache)", run_evolution(config, None) * 1000.0))
+    for fingerprint in (None, genome_fingerprint, genome_hashes):
+        cache = neat.PhenotypeCache(fingerprint=fingerprint)
+        elapsed = run_evolution(config, cache)
+        stats = cache.get_stats()
+        print("{0:>20} {1:10.1f} {2:8d} {3:8d} {4:8.1f}%".format(
+            "(identity)" if fingerprint is None else fingerprint.__name__, elapsed * 1000.0, stats['hits'], stats['misses'],
+            100.0 * stats['hits'] / (stats['hits'] + stats['misses'])))
+
+
+if __name__ == '__main__':
+    run()
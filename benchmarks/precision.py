@@ -0,0 +1,65 @@
+"""
+Times activate_batch of VectorizedFeedForwardNetwork with float64, float32 and float16
+storage, and reports the memory held in the network's arrays and the largest
+difference of the outputs from float64.
+"""
+from __future__ import print_function
+
+import os
+import random
+import timeit
+
+import numpy as np
+
+import neat
+from neat.numpy_util import PRECISIONS
+
+
+def make_genome(config, num_hidden, num_mutations):
+    config.genome_config.num_hidden = num_hidden
+    config.genome_config.node_indexer = None
+    g = neat.DefaultGenome(0)
+    g.configure_new(config.genome_config)
+    for _ in range(num_mutations):
+        g.mutate_add_connection(config.genome_config)
+    return g
+
+
+def array_bytes(net):
+    """Returns the number of bytes in the network's parameter and value arrays."""
+    total = net.values.nbytes
+    for layer in net.layers:
+        total += layer.bias.nbytes + layer.response.nbytes + layer.weights.nbytes + layer.weights_t.nbytes
+        total += sum(weights.nbytes for agg_func, rows, src, weights in layer.groups)
+    return total
+
+
+def run(config_file):
+    config = neat.Config(neat.DefaultGenome, neat.DefaultReproduction,
+                         neat.DefaultSpeciesSet, neat.DefaultStagnation,
+                         config_file)
+    config.genome_config.feed_forward = True
+    config.genome_config.activation_default = 'sigmoid'
+    config.genome_config.activation_options = ['sigmoid']
+    random.seed(0)
+    batch = np.random.RandomState(0).uniform(-1.0, 1.0, (1000, len(config.genome_config.input_keys)))
+
+    print("{0:>8} {1:>12} {2:>10} {3:>10} {4:>12} {5:>12}".format(
+        "nodes", "connections", "precision", "time (ms)", "array bytes", "max delta"))
+    for num_hidden in (10, 50, 200):
+        g = make_genome(config, num_hidden, num_hidden * 10)
+        expected = None
+        for precision in PRECISIONS:
+            net = neat.nn.VectorizedFeedForwardNetwork.create(g, config, precision)
+            result = net.activate_batch(batch)
+            if expected is None:
+                expected = result
+            t = min(timeit.repeat(lambda: net.activate_batch(batch), number=1, repeat=5))
+            print("{0:8d} {1:12d} {2:>10} {3:10.2f} {4:12d} {5:12.3g}".format(
+                len(g.nodes), len(g.connections), precision, t * 1000.0, array_bytes(net),
+                abs(result.astype(float) - expected).max()))
+
+
+if __name__ == '__main__':
+    local_dir = os.path.dirname(__file__)
+    run(os.path.join(local_dir, 'config-benchmark'))
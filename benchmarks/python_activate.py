@@ -0,0 +1,61 @@
+"""
+Times activate on small FeedForwardNetwork and RecurrentNetwork phenotypes, with the
+fused accumulation loops used for sum, product, max and min nodes against the general
+path that calls the aggregation function on a list of weighted inputs.
+"""
+from __future__ import print_function
+
+import os
+import random
+import timeit
+
+import neat
+
+
+def make_genome(config, num_hidden, num_mutations):
+    config.genome_config.num_hidden = num_hidden
+    config.genome_config.node_indexer = None
+    g = neat.DefaultGenome(0)
+    g.configure_new(config.genome_config)
+    for _ in range(num_mutations):
+        g.mutate_add_connection(config.genome_config)
+    return g
+
+
+def unfused(net):
+    """Returns a copy of the network whose aggregations are not recognized as fused kinds."""
+    node_evals = [(node, act_func, (lambda x, f=agg_func: f(x)), bias, response, links)
+                  for node, act_func, agg_func, bias, response, links in net.node_evals]
+    return type(net)(net.input_nodes, net.output_nodes, node_evals)
+
+
+def run_steps(net, inputs):
+    for row in inputs:
+        net.activate(row)
+
+
+def run(config_file):
+    config = neat.Config(neat.DefaultGenome, neat.DefaultReproduction,
+                         neat.DefaultSpeciesSet, neat.DefaultStagnation,
+                         config_file)
+    random.seed(0)
+    num_steps = 2000
+    inputs = [[random.uniform(-1.0, 1.0) for _ in config.genome_config.input_keys] for _ in range(num_steps)]
+
+    print("{0:>10} {1:>8} {2:>12} {3:>14} {4:>14} {5:>8}".format(
+        "network", "nodes", "connections", "general (ms)", "fused (ms)", "speedup"))
+    for feed_forward, network_type in ((True, neat.nn.FeedForwardNetwork), (False, neat.nn.RecurrentNetwork)):
+        config.genome_config.feed_forward = feed_forward
+        for num_hidden in (0, 5, 20):
+            g = make_genome(config, num_hidden, num_hidden * 3)
+            net = network_type.create(g, config)
+            general = unfused(net)
+            old = min(timeit.repeat(lambda: run_steps(general, inputs), number=1, repeat=5))
+            new = min(timeit.repeat(lambda: run_steps(net, inputs), number=1, repeat=5))
+            print("{0:>10} {1:8d} {2:12d} {3:14.2f} {4:14.2f} {5:7.1f}x".format(
+                network_type.__name__[:-7], len(g.nodes), len(g.connections), old * 1000.0, new * 1000.0, old / new))
+
+
+if __name__ == '__main__':
+    local_dir = os.path.dirname(__file__)
+    run(os.path.join(local_dir, 'config-benchmark'))
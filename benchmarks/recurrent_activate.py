@@ -0,0 +1,53 @@
+"""
+Times many steps of a recurrent network (as in the memory examples) with the
+pure-Python RecurrentNetwork and the array-backed VectorizedRecurrentNetwork.
+"""
+from __future__ import print_function
+
+import os
+import random
+import timeit
+
+import neat
+
+
+def make_genome(config, num_hidden, num_mutations):
+    config.genome_config.num_hidden = num_hidden
+    config.genome_config.node_indexer = None
+    g = neat.DefaultGenome(0)
+    g.configure_new(config.genome_config)
+    for _ in range(num_mutations):
+        g.mutate_add_connection(config.genome_config)
+    return g
+
+
+def run_steps(net, inputs):
+    net.reset()
+    for row in inputs:
+        net.activate(row)
+
+
+def run(config_file):
+    config = neat.Config(neat.DefaultGenome, neat.DefaultReproduction,
+                         neat.DefaultSpeciesSet, neat.DefaultStagnation,
+                         config_file)
+    config.genome_config.feed_forward = False
+    random.seed(0)
+    num_steps = 500
+    inputs = [[random.uniform(-1.0, 1.0) for _ in config.genome_config.input_keys] for _ in range(num_steps)]
+
+    print("{0:>8} {1:>12} {2:>14} {3:>14} {4:>8}".format(
+        "nodes", "connections", "python (ms)", "arrays (ms)", "speedup"))
+    for num_hidden in (10, 50, 100, 200):
+        g = make_genome(config, num_hidden, num_hidden * 5)
+        net = neat.nn.RecurrentNetwork.create(g, config)
+        vnet = neat.nn.RecurrentNetwork.create(g, config, backend='numpy')
+        old = min(timeit.repeat(lambda: run_steps(net, inputs), number=1, repeat=3))
+        new = min(timeit.repeat(lambda: run_steps(vnet, inputs), number=1, repeat=3))
+        print("{0:8d} {1:12d} {2:14.2f} {3:14.2f} {4:7.1f}x".format(
+            len(g.nodes), len(g.connections), old * 1000.0, new * 1000.0, old / new))
+
+
+if __name__ == '__main__':
+    local_dir = os.path.dirname(__file__)
+    run(os.path.join(local_dir, 'config-benchmark'))
@@ -7,6 +7,7 @@ import neat.distributed as distributed
 from neat.config import Config
 from neat.population import Population, CompleteExtinctionException
 from neat.genome import DefaultGenome
+from neat.array_genome import ArrayGenome
 from neat.reproduction import DefaultReproduction
 from neat.stagnation import DefaultStagnation
 from neat.reporting import StdOutReporter
@@ -16,3 +17,4 @@ from neat.parallel import ParallelEvaluator
 from neat.distributed import DistributedEvaluator, host_is_local
 from neat.threaded import ThreadedEvaluator
 from neat.checkpoint import Checkpointer
+from neat.phenotype_cache import PhenotypeCache
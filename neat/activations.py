@@ -7,6 +7,11 @@ from __future__ import division
 import math
 import types
 
+from neat.numpy_util import HAVE_NUMPY
+
+if HAVE_NUMPY:
+    import numpy as np
+
 
 def sigmoid_activation(z):
     z = max(-60.0, min(60.0, 5.0 * z))
@@ -80,6 +85,102 @@ def cube_activation(z):
     return z ** 3
 
 
+# Array-wise (NumPy) versions of the functions above, with the same clamping ranges and
+# branches.  NumPy's exp, log and tanh may differ from the math module's by an ulp or two.
+
+def _sigmoid_array(z):
+    z = np.clip(5.0 * z, -60.0, 60.0)
+    return 1.0 / (1.0 + np.exp(-z))
+
+
+def _tanh_array(z):
+    return np.tanh(np.clip(2.5 * z, -60.0, 60.0))
+
+
+def _sin_array(z):
+    return np.sin(np.clip(5.0 * z, -60.0, 60.0))
+
+
+def _gauss_array(z):
+    z = np.clip(z, -3.4, 3.4)
+    return np.exp(-5.0 * z ** 2)
+
+
+def _relu_array(z):
+    return np.where(z > 0.0, z, 0.0)
+
+
+def _softplus_array(z):
+    z = np.clip(5.0 * z, -60.0, 60.0)
+    return 0.2 * np.log(1 + np.exp(z))
+
+
+def _identity_array(z):
+    return z
+
+
+def _clamped_array(z):
+    return np.clip(z, -1.0, 1.0)
+
+
+def _inv_array(z):
+    with np.errstate(divide='ignore', over='ignore'):
+        return np.where(z == 0.0, 0.0, 1.0 / z)
+
+
+def _log_array(z):
+    return np.log(np.fmax(1e-7, z))
+
+
+def _exp_array(z):
+    return np.exp(np.clip(z, -60.0, 60.0))
+
+
+def _abs_array(z):
+    return np.abs(z)
+
+
+def _hat_array(z):
+    return np.maximum(0.0, 1 - np.abs(z))
+
+
+def _square_array(z):
+    return z ** 2
+
+
+def _cube_array(z):
+    return z ** 3
+
+
+# Array-wise versions of the built-in activation functions, keyed by the scalar function;
+# empty if NumPy is not available.  Those of other functions are kept by the function set.
+_vectorized_activations = {}
+if HAVE_NUMPY:
+    _vectorized_activations.update({sigmoid_activation: _sigmoid_array,
+                                    tanh_activation: _tanh_array,
+                                    sin_activation: _sin_array,
+                                    gauss_activation: _gauss_array,
+                                    relu_activation: _relu_array,
+                                    softplus_activation: _softplus_array,
+                                    identity_activation: _identity_array,
+                                    clamped_activation: _clamped_array,
+                                    inv_activation: _inv_array,
+                                    log_activation: _log_array,
+                                    exp_activation: _exp_array,
+                                    abs_activation: _abs_array,
+                                    hat_activation: _hat_array,
+                                    square_activation: _square_array,
+                                    cube_activation: _cube_array})
+
+
+def get_vectorized_activation(function):
+    """
+    Returns the array-wise version of a built-in scalar activation function, or None
+    for any other function (see ActivationFunctionSet.get_vectorized).
+    """
+    return _vectorized_activations.get(function)
+
+
 class InvalidActivationFunction(TypeError):
     pass
 
@@ -102,6 +203,7 @@ class ActivationFunctionSet(object):
     """
     def __init__(self):
         self.functions = {}
+        self.vectorized = {}
         self.add('sigmoid', sigmoid_activation)
         self.add('tanh', tanh_activation)
         self.add('sin', sin_activation)
@@ -118,10 +220,26 @@ class ActivationFunctionSet(object):
         self.add('square', square_activation)
         self.add('cube', cube_activation)
 
-    def add(self, name, function):
+    def add(self, name, function, vectorized=None):
+        """
+        Adds an activation function under the given name.  If vectorized is given, it is
+        registered in this set as the function's array-wise version (taking and returning
+        a NumPy array), which array-based networks use instead of calling function per
+        element.
+        """
         validate_activation(function)
+        if vectorized is None:
+            vectorized = get_vectorized_activation(function)
+        elif not callable(vectorized):
+            raise InvalidActivationFunction("The vectorized version must be callable.")
+        if vectorized is not None:
+            self.vectorized[function] = vectorized
         self.functions[name] = function
 
+    def get_vectorized(self, name):
+        """Returns the array-wise version of the named function, or None if it has none."""
+        return self.vectorized.get(self.get(name))
+
     def get(self, name):
         f = self.functions.get(name)
         if f is None:
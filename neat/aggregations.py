@@ -10,10 +10,14 @@ import warnings
 from operator import mul
 
 from neat.math_util import mean, median2
+from neat.numpy_util import HAVE_NUMPY
 
 if sys.version_info[0] > 2:
     from functools import reduce
 
+if HAVE_NUMPY:
+    import numpy as np
+
 def product_aggregation(x): # note: `x` is a list or other iterable
     return reduce(mul, x, 1.0)
 
@@ -35,6 +39,70 @@ def median_aggregation(x):
 def mean_aggregation(x):
     return mean(x)
 
+
+# Array-wise (NumPy) versions of the functions above, called as f(x, axis) to reduce x
+# along the given axis.  Sums and products accumulate left to right, as the scalar
+# functions do, rather than pairwise as numpy.sum does, so that results are identical.
+
+def _sum_array(x, axis):
+    if not x.shape[axis]:
+        return np.sum(x, axis)
+    return np.take(np.cumsum(x, axis), -1, axis)
+
+
+def _product_array(x, axis):
+    if not x.shape[axis]:
+        return np.prod(x, axis)
+    return np.take(np.cumprod(x, axis), -1, axis)
+
+
+def _max_array(x, axis):
+    return np.max(x, axis)
+
+
+def _min_array(x, axis):
+    return np.min(x, axis)
+
+
+def _maxabs_array(x, axis):
+    i = np.expand_dims(np.argmax(np.abs(x), axis=axis), axis)
+    return np.squeeze(np.take_along_axis(x, i, axis=axis), axis)
+
+
+def _median_array(x, axis):
+    n = x.shape[axis]
+    if n <= 2:
+        return _mean_array(x, axis)
+    x = np.sort(x, axis)
+    if n % 2:
+        return np.take(x, n // 2, axis)
+    return (np.take(x, n // 2 - 1, axis) + np.take(x, n // 2, axis)) / 2.0
+
+
+def _mean_array(x, axis):
+    return _sum_array(x, axis) / x.shape[axis]
+
+
+# Array-wise versions of the built-in aggregation functions, keyed by the scalar function;
+# empty if NumPy is not available.  Those of other functions are kept by the function set.
+_vectorized_aggregations = {}
+if HAVE_NUMPY:
+    _vectorized_aggregations.update({product_aggregation: _product_array,
+                                     sum_aggregation: _sum_array,
+                                     max_aggregation: _max_array,
+                                     min_aggregation: _min_array,
+                                     maxabs_aggregation: _maxabs_array,
+                                     median_aggregation: _median_array,
+                                     mean_aggregation: _mean_array})
+
+
+def get_vectorized_aggregation(function):
+    """
+    Returns the array-wise version of a built-in scalar aggregation function, or None
+    for any other function (see AggregationFunctionSet.get_vectorized).
+    """
+    return _vectorized_aggregations.get(function)
+
 class InvalidAggregationFunction(TypeError):
     pass
 
@@ -55,6 +123,7 @@ class AggregationFunctionSet(object):
 
     def __init__(self):
         self.functions = {}
+        self.vectorized = {}
         self.add('product', product_aggregation)
         self.add('sum', sum_aggregation)
         self.add('max', max_aggregation)
@@ -63,10 +132,26 @@ class AggregationFunctionSet(object):
         self.add('median', median_aggregation)
         self.add('mean', mean_aggregation)
 
-    def add(self, name, function):
+    def add(self, name, function, vectorized=None):
+        """
+        Adds an aggregation function under the given name.  If vectorized is given, it is
+        registered in this set as the function's array-wise version, called as
+        vectorized(x, axis) to reduce a NumPy array along an axis, which array-based
+        networks use instead of calling function on each row.
+        """
         validate_aggregation(function)
+        if vectorized is None:
+            vectorized = get_vectorized_aggregation(function)
+        elif not callable(vectorized):
+            raise InvalidAggregationFunction("The vectorized version must be callable.")
+        if vectorized is not None:
+            self.vectorized[function] = vectorized
         self.functions[name] = function
 
+    def get_vectorized(self, name):
+        """Returns the array-wise version of the named function, or None if it has none."""
+        return self.vectorized.get(self.get(name))
+
     def get(self, name):
         f = self.functions.get(name)
         if f is None:
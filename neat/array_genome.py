@@ -0,0 +1,674 @@
+"""
+A genome whose genes are held in parallel NumPy arrays (a struct of arrays).
+
+ArrayGenome has the same genes as DefaultGenome with DefaultNodeGene and
+DefaultConnectionGene, and the same configuration, but instead of one Python
+object per gene it keeps:
+
+* node_keys, bias, response, activation and aggregation (the last two as codes
+  into activation_names and aggregation_names), sorted by node key;
+* conn_in, conn_out, weight and enabled, sorted by (conn_in, conn_out).
+
+Attribute initialization and mutation (by the init_values and mutate_values methods
+of the gene attributes, as bulk mutation of DefaultGenome does), crossover and
+distance then work on whole arrays: matching genes are found by intersecting the
+sorted keys, and each gene's attributes are drawn, inherited or compared with
+masks.  The structural mutations follow DefaultGenome.  Random numbers come from
+numpy.random, so runs are repeated by seeding it (with numpy.random.seed).
+
+The nodes and connections attributes give the genes as dicts of DefaultNodeGene and
+DefaultConnectionGene, as DefaultGenome has them, so that the network types and
+reporters can use an ArrayGenome unchanged; they are built when first used after a
+change, and editing them does not change the genome.
+"""
+from __future__ import division
+
+from neat.genes import DefaultConnectionGene, DefaultNodeGene
+from neat.genome import DefaultGenomeConfig
+from neat.graphs import path_exists
+from neat.numpy_util import HAVE_NUMPY, check_numpy
+from neat.pickle_util import SlotsPickleMixin
+from neat.six_util import iteritems
+
+if HAVE_NUMPY:
+    import numpy as np
+
+
+def _connection_codes(conn_in, conn_out):
+    """Returns one int64 per connection that sorts as its (input key, output key) pair."""
+    return conn_in * (1 << 32) + conn_out
+
+
+# The attributes of the default gene types, by name; their init_values and mutate_values
+# draw the attribute values of all genes at once from numpy.random.
+_ATTRIBUTES = dict((a.name, a) for a in
+                   DefaultNodeGene._gene_attributes + DefaultConnectionGene._gene_attributes)
+
+
+def _init(config, name, n):
+    """Returns n initial values of the float or bool attribute name."""
+    return _ATTRIBUTES[name].init_values(n, config, np.random)
+
+
+def _mutate(config, name, values, options=None):
+    """Mutates the attribute values (or codes, given the codes of the options) in place."""
+    if options is None:
+        values[:] = _ATTRIBUTES[name].mutate_values(values, config, np.random)
+    else:
+        values[:] = _ATTRIBUTES[name].mutate_values(values, config, np.random, options)
+
+
+def _string_names(config, name):
+    """
+    Returns the names that codes of the string attribute name index, and the codes of
+    its options.
+    """
+    options = getattr(config, name + '_options')
+    names = []
+    for option in options:
+        if option not in names:
+            names.append(option)
+    default = getattr(config, name + '_default')
+    if default.lower() not in ('none', 'random') and default not in names:
+        names.append(default)
+    return tuple(names), np.array([names.index(option) for option in options], dtype=np.intp)
+
+
+def _string_init(config, name, names, option_codes, n):
+    """
+    Returns the codes of n initial values of the string attribute name, as
+    StringAttribute.init_value draws them.
+    """
+    default = getattr(config, name + '_default')
+    if default.lower() in ('none', 'random'):
+        return option_codes[np.random.randint(len(option_codes), size=n)]
+    return np.full(n, names.index(default), dtype=np.intp)
+
+
+def _recode(codes, names, target):
+    """
+    Returns the codes (indices into names) as indices into target, extended with any of
+    names that it lacks, and the extended target.
+    """
+    if names == target:
+        return codes, target
+    target = list(target)
+    for name in names:
+        if name not in target:
+            target.append(name)
+    table = np.array([target.index(name) for name in names], dtype=np.intp)
+    return table[codes], tuple(target)
+
+
+def _segments(starts, counts):
+    """Returns the indices starts[j]:starts[j] + counts[j], for every j, concatenated."""
+    offsets = np.cumsum(counts) - counts
+    return np.repeat(starts - offsets, counts) + np.arange(counts.sum())
+
+
+def _inherit(key_columns, value_columns, counts, first, second):
+    """
+    Does crossover for many children at once.  The columns hold the genes of the distinct
+    parents, counts[p] of them for parent p, one after another and each parent's sorted
+    by key (the key_columns, compared in order).  Child j has the genes of parent
+    first[j]; each of the values of a gene also in parent second[j] comes from that parent
+    with probability 0.5.  Returns the key and value columns of all the children's genes,
+    one child after another.
+    """
+    starts = np.cumsum(counts) - counts
+    rows = _segments(starts[first], counts[first])
+    keys = [column[rows] for column in key_columns]
+    values = [column[rows] for column in value_columns]
+    if not len(rows):
+        return keys + values
+
+    # Number the distinct keys in order, so that (parent, key number) is a single
+    # integer that increases through the parents' genes.
+    if len(key_columns) == 1:
+        ignored, key_numbers = np.unique(key_columns[0], return_inverse=True)
+    else:
+        ignored, key_numbers = np.unique(_connection_codes(*key_columns), return_inverse=True)
+    total = len(key_numbers)
+    gene_codes = np.repeat(np.arange(len(counts)), counts) * total + key_numbers
+    wanted = np.repeat(second, counts[first]) * total + key_numbers[rows]
+    found = np.minimum(np.searchsorted(gene_codes, wanted), total - 1)
+    homologous = gene_codes[found] == wanted
+
+    for column, child_column in zip(value_columns, values):
+        take = homologous & (np.random.random(len(rows)) <= 0.5)
+        child_column[take] = column[found[take]]
+    return keys + values
+
+
+def _split(columns, counts):
+    """Returns, for each of the counts, the next that many rows of each of the columns."""
+    ends = np.cumsum(counts).tolist()
+    starts = [0] + ends[:-1]
+    return [[column[start:end] for column in columns] for start, end in zip(starts, ends)]
+
+
+class ArrayGenome(SlotsPickleMixin):
+    """
+    A genome with the genes of DefaultGenome held in NumPy arrays (see the module
+    docstring).  It takes the same configuration as DefaultGenome, with its genes
+    always of the default types, and has the same interface for reproduction and
+    speciation.
+    """
+    __slots__ = ('key', 'node_keys', 'bias', 'response', 'activation', 'aggregation',
+                 'activation_names', 'aggregation_names', 'conn_in', 'conn_out', 'weight',
+                 'enabled', 'fitness', '_genes')
+    _transient_slots = ('_genes',)
+
+    @classmethod
+    def parse_config(cls, param_dict):
+        param_dict['node_gene_type'] = DefaultNodeGene
+        param_dict['connection_gene_type'] = DefaultConnectionGene
+        return DefaultGenomeConfig(param_dict)
+
+    @classmethod
+    def write_config(cls, f, config):
+        config.save(f)
+
+    def __init__(self, key):
+        check_numpy()
+        self.key = key
+
+        self.node_keys = np.zeros(0, dtype=np.int64)
+        self.bias = np.zeros(0)
+        self.response = np.zeros(0)
+        self.activation = np.zeros(0, dtype=np.intp)
+        self.aggregation = np.zeros(0, dtype=np.intp)
+        self.activation_names = ()
+        self.aggregation_names = ()
+
+        self.conn_in = np.zeros(0, dtype=np.int64)
+        self.conn_out = np.zeros(0, dtype=np.int64)
+        self.weight = np.zeros(0)
+        self.enabled = np.zeros(0, dtype=bool)
+
+        self.fitness = None
+
+        # The (nodes, connections) dicts, built on demand; reset by every change.
+        self._genes = None
+
+    def __setstate__(self, state):
+        self._genes = None
+        SlotsPickleMixin.__setstate__(self, state)
+
+    def configure_new(self, config):
+        """Configure a new genome based on the given configuration."""
+        self.activation_names, activation_options = _string_names(config, 'activation')
+        self.aggregation_names, aggregation_options = _string_names(config, 'aggregation')
+
+        node_keys = list(config.output_keys)
+        node_dict = dict.fromkeys(node_keys)
+        for i in range(config.num_hidden):
+            node_key = config.get_new_node_key(node_dict)
+            node_keys.append(node_key)
+            node_dict[node_key] = None
+        self._set_nodes(np.array(node_keys, dtype=np.int64), config,
+                        activation_options, aggregation_options)
+
+        pairs = self._initial_connections(config, node_keys[len(config.output_keys):])
+        if pairs:
+            conn_in, conn_out = np.array(pairs, dtype=np.int64).T
+            self._set_connections(conn_in, conn_out, _init(config, 'weight', len(pairs)),
+                                  _init(config, 'enabled', len(pairs)))
+
+    @staticmethod
+    def _initial_connections(config, hidden):
+        """
+        Returns the (input key, output key) pairs of a new genome's connections, chosen
+        as DefaultGenome chooses them for the configured initial_connection.
+        """
+        output = list(config.output_keys)
+        if 'fs_neat' in config.initial_connection:
+            input_id = config.input_keys[np.random.randint(len(config.input_keys))]
+            if config.initial_connection == 'fs_neat_hidden':
+                return [(input_id, o) for o in output + hidden]
+            return [(input_id, o) for o in output]
+
+        if 'full' in config.initial_connection or 'partial' in config.initial_connection:
+            direct = config.initial_connection in ('full_direct', 'partial_direct')
+            pairs = []
+            if hidden:
+                pairs += [(i, h) for i in config.input_keys for h in hidden]
+                pairs += [(h, o) for h in hidden for o in output]
+            if direct or not hidden:
+                pairs += [(i, o) for i in config.input_keys for o in output]
+            if not config.feed_forward:
+                pairs += [(n, n) for n in output + hidden]
+            if 'partial' in config.initial_connection:
+                num_to_add = int(round(len(pairs) * config.connection_fraction))
+                pairs = [pairs[j] for j in np.random.permutation(len(pairs))[:num_to_add]]
+            return pairs
+
+        return []
+
+    def _set_nodes(self, node_keys, config, activation_options, aggregation_options):
+        """Appends new nodes with the given keys and freshly initialized attributes."""
+        n = len(node_keys)
+        activation = _string_init(config, 'activation', self.activation_names,
+                                  activation_options, n)
+        aggregation = _string_init(config, 'aggregation', self.aggregation_names,
+                                   aggregation_options, n)
+        self._set_node_arrays(np.concatenate([self.node_keys, node_keys]),
+                              np.concatenate([self.bias, _init(config, 'bias', n)]),
+                              np.concatenate([self.response, _init(config, 'response', n)]),
+                              np.concatenate([self.activation, activation]),
+                              np.concatenate([self.aggregation, aggregation]))
+
+    def _set_node_arrays(self, node_keys, bias, response, activation, aggregation):
+        order = np.argsort(node_keys, kind='stable')
+        self.node_keys = node_keys[order]
+        self.bias = bias[order]
+        self.response = response[order]
+        self.activation = activation[order]
+        self.aggregation = aggregation[order]
+        self._genes = None
+
+    def _set_connections(self, conn_in, conn_out, weight, enabled):
+        """Appends the given connections, which must not already be in the genome."""
+        self._set_connection_arrays(np.concatenate([self.conn_in, conn_in]),
+                                    np.concatenate([self.conn_out, conn_out]),
+                                    np.concatenate([self.weight, weight]),
+                                    np.concatenate([self.enabled, enabled]))
+
+    def _set_connection_arrays(self, conn_in, conn_out, weight, enabled):
+        order = np.argsort(_connection_codes(conn_in, conn_out), kind='stable')
+        self.conn_in = conn_in[order]
+        self.conn_out = conn_out[order]
+        self.weight = weight[order]
+        self.enabled = enabled[order]
+        self._genes = None
+
+    def _use_names(self, config):
+        """
+        Recodes activation and aggregation to the names of the current configuration and
+        returns the codes of its options for each.
+        """
+        names, activation_options = _string_names(config, 'activation')
+        self.activation, self.activation_names = _recode(self.activation, self.activation_names,
+                                                         names)
+        names, aggregation_options = _string_names(config, 'aggregation')
+        self.aggregation, self.aggregation_names = _recode(self.aggregation, self.aggregation_names,
+                                                           names)
+        return activation_options, aggregation_options
+
+    def configure_crossover(self, genome1, genome2, config):
+        """ Configure a new genome by crossover from two parent genomes. """
+        assert isinstance(genome1.fitness, (int, float))
+        assert isinstance(genome2.fitness, (int, float))
+        if genome1.fitness > genome2.fitness:
+            parent1, parent2 = genome1, genome2
+        else:
+            parent1, parent2 = genome2, genome1
+
+        # The child has the connections of parent1; each attribute of a homologous gene
+        # comes from either parent with equal probability.
+        codes1 = _connection_codes(parent1.conn_in, parent1.conn_out)
+        codes2 = _connection_codes(parent2.conn_in, parent2.conn_out)
+        common, idx1, idx2 = np.intersect1d(codes1, codes2, assume_unique=True, return_indices=True)
+        weight = parent1.weight.copy()
+        enabled = parent1.enabled.copy()
+        take = np.random.random(len(common)) <= 0.5
+        weight[idx1[take]] = parent2.weight[idx2[take]]
+        take = np.random.random(len(common)) <= 0.5
+        enabled[idx1[take]] = parent2.enabled[idx2[take]]
+        self.conn_in = parent1.conn_in.copy()
+        self.conn_out = parent1.conn_out.copy()
+        self.weight = weight
+        self.enabled = enabled
+
+        # Likewise for the nodes of parent1.
+        self.activation_names = parent1.activation_names
+        self.aggregation_names = parent1.aggregation_names
+        activation2, self.activation_names = _recode(parent2.activation, parent2.activation_names,
+                                                     self.activation_names)
+        aggregation2, self.aggregation_names = _recode(parent2.aggregation,
+                                                       parent2.aggregation_names,
+                                                       self.aggregation_names)
+        common, idx1, idx2 = np.intersect1d(parent1.node_keys, parent2.node_keys,
+                                            assume_unique=True, return_indices=True)
+        self.node_keys = parent1.node_keys.copy()
+        for name, values2 in (('bias', parent2.bias), ('response', parent2.response),
+                              ('activation', activation2), ('aggregation', aggregation2)):
+            values = getattr(parent1, name).copy()
+            take = np.random.random(len(common)) <= 0.5
+            values[idx1[take]] = values2[idx2[take]]
+            setattr(self, name, values)
+        self._genes = None
+
+    @classmethod
+    def create_offspring(cls, keys, parents, config):
+        """
+        Returns the children with the given keys of the given (parent1, parent2) pairs,
+        each as configure_crossover and then mutate would make it, but with the genes of
+        all the children made at once: crossover and attribute mutation are each a few
+        operations over the concatenated genes of every parent or child, and only the
+        structural mutations are made child by child.
+        """
+        check_numpy()
+        n = len(keys)
+
+        # Number the distinct parents, the fitter of each pair (as configure_crossover
+        # takes it) as first[j] and the other as second[j].
+        index = {}
+        unique = []
+        first = np.empty(n, dtype=np.intp)
+        second = np.empty(n, dtype=np.intp)
+        for j, (genome1, genome2) in enumerate(parents):
+            assert isinstance(genome1.fitness, (int, float))
+            assert isinstance(genome2.fitness, (int, float))
+            if genome1.fitness <= genome2.fitness:
+                genome1, genome2 = genome2, genome1
+            for genome, numbers in ((genome1, first), (genome2, second)):
+                i = index.get(id(genome))
+                if i is None:
+                    i = index[id(genome)] = len(unique)
+                    unique.append(genome)
+                numbers[j] = i
+
+        # The children have the genes of their first parents; each attribute of a gene
+        # that the second parent also has comes from either parent with equal probability.
+        conn_counts = np.array([len(g.conn_in) for g in unique], dtype=np.intp)
+        conn_in, conn_out, weight, enabled = _inherit(
+            [np.concatenate([g.conn_in for g in unique]),
+             np.concatenate([g.conn_out for g in unique])],
+            [np.concatenate([g.weight for g in unique]),
+             np.concatenate([g.enabled for g in unique])],
+            conn_counts, first, second)
+
+        activation_names, activation_options = _string_names(config, 'activation')
+        aggregation_names, aggregation_options = _string_names(config, 'aggregation')
+        activation = []
+        aggregation = []
+        for g in unique:
+            codes, activation_names = _recode(g.activation, g.activation_names, activation_names)
+            activation.append(codes)
+            codes, aggregation_names = _recode(g.aggregation, g.aggregation_names,
+                                               aggregation_names)
+            aggregation.append(codes)
+        node_counts = np.array([len(g.node_keys) for g in unique], dtype=np.intp)
+        node_keys, bias, response, activation, aggregation = _inherit(
+            [np.concatenate([g.node_keys for g in unique])],
+            [np.concatenate([g.bias for g in unique]), np.concatenate([g.response for g in unique]),
+             np.concatenate(activation), np.concatenate(aggregation)],
+            node_counts, first, second)
+
+        children = []
+        node_pieces = _split([node_keys, bias, response, activation, aggregation],
+                             node_counts[first])
+        conn_pieces = _split([conn_in, conn_out, weight, enabled], conn_counts[first])
+        for key, node_arrays, conn_arrays in zip(keys, node_pieces, conn_pieces):
+            child = cls.__new__(cls)
+            child.key = key
+            (child.node_keys, child.bias, child.response, child.activation,
+             child.aggregation) = node_arrays
+            child.activation_names = activation_names
+            child.aggregation_names = aggregation_names
+            child.conn_in, child.conn_out, child.weight, child.enabled = conn_arrays
+            child.fitness = None
+            child._genes = None
+            children.append(child)
+
+        # Structural mutations are rare enough to make one child at a time.
+        which = cls._structural_mutations(config, n)
+        for j in np.flatnonzero(which.any(axis=1)):
+            children[j]._mutate_structure(config, which[j])
+
+        # Then mutate the attributes of every child's genes together.
+        genes = cls.__new__(cls)
+        genes.activation_names = activation_names
+        genes.aggregation_names = aggregation_names
+        for name in ('node_keys', 'bias', 'response', 'weight', 'enabled'):
+            setattr(genes, name, np.concatenate([getattr(child, name) for child in children]))
+        for name in ('activation', 'aggregation'):
+            names = getattr(genes, name + '_names')
+            codes = []
+            for child in children:
+                child_codes, names = _recode(getattr(child, name), getattr(child, name + '_names'),
+                                             names)
+                codes.append(child_codes)
+            setattr(genes, name, np.concatenate(codes))
+            setattr(genes, name + '_names', names)
+        genes._mutate_attributes(config)
+
+        node_names = ('bias', 'response', 'activation', 'aggregation')
+        node_pieces = _split([getattr(genes, name) for name in node_names],
+                             [len(child.node_keys) for child in children])
+        conn_pieces = _split([genes.weight, genes.enabled],
+                             [len(child.conn_in) for child in children])
+        for child, node_arrays, conn_arrays in zip(children, node_pieces, conn_pieces):
+            child.bias, child.response, child.activation, child.aggregation = node_arrays
+            child.activation_names = genes.activation_names
+            child.aggregation_names = genes.aggregation_names
+            child.weight, child.enabled = conn_arrays
+            child._genes = None
+
+        return children
+
+    def mutate(self, config):
+        """ Mutates this genome. """
+        self._mutate_structure(config, self._structural_mutations(config, 1)[0])
+        self._mutate_attributes(config)
+
+    @staticmethod
+    def _structural_mutations(config, n):
+        """
+        Returns an (n, 4) array of whether each of n genomes is to have a node added, a
+        node deleted, a connection added and a connection deleted (in that order), drawn
+        with the probabilities DefaultGenome.mutate uses.
+        """
+        probs = np.array([config.node_add_prob, config.node_delete_prob,
+                          config.conn_add_prob, config.conn_delete_prob])
+        if config.single_structural_mutation:
+            bounds = np.cumsum(probs) / max(1, probs.sum())
+            which = np.searchsorted(bounds, np.random.random(n), side='right')
+            return which[:, np.newaxis] == np.arange(4)
+        return np.random.random((n, 4)) < probs
+
+    def _mutate_structure(self, config, which):
+        add_node, delete_node, add_connection, delete_connection = which
+        if add_node:
+            self.mutate_add_node(config)
+        if delete_node:
+            self.mutate_delete_node(config)
+        if add_connection:
+            self.mutate_add_connection(config)
+        if delete_connection:
+            self.mutate_delete_connection()
+
+    def _mutate_attributes(self, config):
+        """Mutates the attributes of all genes at once."""
+        _mutate(config, 'weight', self.weight)
+        _mutate(config, 'enabled', self.enabled)
+        activation_options, aggregation_options = self._use_names(config)
+        _mutate(config, 'bias', self.bias)
+        _mutate(config, 'response', self.response)
+        _mutate(config, 'activation', self.activation, activation_options)
+        _mutate(config, 'aggregation', self.aggregation, aggregation_options)
+        self._genes = None
+
+    def _find_connection(self, input_key, output_key):
+        """
+        Returns the index of the connection (input_key, output_key), or where it would be
+        inserted, and whether it is there.
+        """
+        codes = _connection_codes(self.conn_in, self.conn_out)
+        code = _connection_codes(input_key, output_key)
+        i = int(np.searchsorted(codes, code))
+        return i, i < len(codes) and codes[i] == code
+
+    def mutate_add_node(self, config):
+        if not len(self.conn_in):
+            if config.check_structural_mutation_surer():
+                self.mutate_add_connection(config)
+            return
+
+        # Choose a random connection to split, and join its nodes through a new node instead.
+        split = np.random.randint(len(self.conn_in))
+        i, o = int(self.conn_in[split]), int(self.conn_out[split])
+        new_node_id = config.get_split_node_key(dict.fromkeys(self.node_keys.tolist()), (i, o))
+        activation_options, aggregation_options = self._use_names(config)
+        self._set_nodes(np.array([new_node_id], dtype=np.int64), config,
+                        activation_options, aggregation_options)
+
+        self.enabled[split] = False
+        self._set_connections(np.array([i, new_node_id], dtype=np.int64),
+                              np.array([new_node_id, o], dtype=np.int64),
+                              np.array([1.0, self.weight[split]]), np.ones(2, dtype=bool))
+
+    def mutate_add_connection(self, config):
+        """
+        Attempt to add a new connection, the only restriction being that the output
+        node cannot be one of the network input pins.
+        """
+        possible_outputs = self.node_keys.tolist()
+        out_node = possible_outputs[np.random.randint(len(possible_outputs))]
+        possible_inputs = possible_outputs + config.input_keys
+        in_node = possible_inputs[np.random.randint(len(possible_inputs))]
+
+        # Don't duplicate connections.
+        position, exists = self._find_connection(in_node, out_node)
+        if exists:
+            if config.check_structural_mutation_surer():
+                self.enabled[position] = True
+                self._genes = None
+            return
+
+        # Don't allow connections between two output nodes
+        if in_node in config.output_keys and out_node in config.output_keys:
+            return
+
+        # For feed-forward networks, avoid creating cycles.
+        if config.feed_forward and self._reaches(out_node, in_node):
+            return
+
+        # Insert the connection where it keeps the arrays sorted.
+        for name, value in (('conn_in', [in_node]), ('conn_out', [out_node]),
+                            ('weight', _init(config, 'weight', 1)),
+                            ('enabled', _init(config, 'enabled', 1))):
+            values = getattr(self, name)
+            inserted = np.concatenate([values[:position], value, values[position:]])
+            setattr(self, name, inserted.astype(values.dtype))
+        self._genes = None
+
+    def _reaches(self, start, end):
+        """Returns true if end can be reached from start along the connections (enabled or not)."""
+        # Genomes are small enough that a search over a dict beats array operations.
+        outgoing = {}
+        for i, o in zip(self.conn_in.tolist(), self.conn_out.tolist()):
+            outgoing.setdefault(i, []).append(o)
+        return path_exists(outgoing, start, end)
+
+    def mutate_delete_node(self, config):
+        # Do nothing if there are no non-output nodes.
+        output_keys = set(config.output_keys)
+        available = [k for k in self.node_keys.tolist() if k not in output_keys]
+        if not available:
+            return -1
+
+        del_key = available[np.random.randint(len(available))]
+        self._keep_connections((self.conn_in != del_key) & (self.conn_out != del_key))
+        keep = self.node_keys != del_key
+        for name in ('node_keys', 'bias', 'response', 'activation', 'aggregation'):
+            setattr(self, name, getattr(self, name)[keep])
+
+        return del_key
+
+    def mutate_delete_connection(self):
+        if len(self.conn_in):
+            keep = np.ones(len(self.conn_in), dtype=bool)
+            keep[np.random.randint(len(self.conn_in))] = False
+            self._keep_connections(keep)
+
+    def _keep_connections(self, keep):
+        """Deletes the connections where keep is false (which leaves the rest sorted)."""
+        for name in ('conn_in', 'conn_out', 'weight', 'enabled'):
+            setattr(self, name, getattr(self, name)[keep])
+        self._genes = None
+
+    def distance(self, other, config):
+        """
+        Returns the genetic distance between this genome and the other, computed as
+        DefaultGenome.distance computes it.
+        """
+        node_distance = 0.0
+        if len(self.node_keys) or len(other.node_keys):
+            common, idx1, idx2 = np.intersect1d(self.node_keys, other.node_keys,
+                                                assume_unique=True, return_indices=True)
+            activation2, ignored_names = _recode(other.activation, other.activation_names,
+                                                 self.activation_names)
+            aggregation2, ignored_names = _recode(other.aggregation, other.aggregation_names,
+                                                  self.aggregation_names)
+            d = (np.abs(self.bias[idx1] - other.bias[idx2]) +
+                 np.abs(self.response[idx1] - other.response[idx2]) +
+                 (self.activation[idx1] != activation2[idx2]) +
+                 (self.aggregation[idx1] != aggregation2[idx2]))
+            disjoint = len(self.node_keys) + len(other.node_keys) - 2 * len(common)
+            node_distance = ((d.sum() * config.compatibility_weight_coefficient +
+                              config.compatibility_disjoint_coefficient * disjoint) /
+                             max(len(self.node_keys), len(other.node_keys)))
+
+        connection_distance = 0.0
+        if len(self.conn_in) or len(other.conn_in):
+            common, idx1, idx2 = np.intersect1d(_connection_codes(self.conn_in, self.conn_out),
+                                                _connection_codes(other.conn_in, other.conn_out),
+                                                assume_unique=True, return_indices=True)
+            d = (np.abs(self.weight[idx1] - other.weight[idx2]) +
+                 (self.enabled[idx1] != other.enabled[idx2]))
+            disjoint = len(self.conn_in) + len(other.conn_in) - 2 * len(common)
+            connection_distance = ((d.sum() * config.compatibility_weight_coefficient +
+                                    config.compatibility_disjoint_coefficient * disjoint) /
+                                   max(len(self.conn_in), len(other.conn_in)))
+
+        return float(node_distance + connection_distance)
+
+    def size(self):
+        """
+        Returns genome 'complexity', taken to be
+        (number of nodes, number of enabled connections)
+        """
+        return len(self.node_keys), int(np.count_nonzero(self.enabled))
+
+    def _build_genes(self):
+        if self._genes is None:
+            nodes = {}
+            for key, bias, response, activation, aggregation in zip(
+                    self.node_keys.tolist(), self.bias.tolist(), self.response.tolist(),
+                    self.activation.tolist(), self.aggregation.tolist()):
+                ng = DefaultNodeGene(key)
+                ng.bias = bias
+                ng.response = response
+                ng.activation = self.activation_names[activation]
+                ng.aggregation = self.aggregation_names[aggregation]
+                nodes[key] = ng
+            connections = {}
+            for i, o, weight, enabled in zip(self.conn_in.tolist(), self.conn_out.tolist(),
+                                             self.weight.tolist(), self.enabled.tolist()):
+                cg = DefaultConnectionGene((i, o))
+                cg.weight = weight
+                cg.enabled = enabled
+                connections[(i, o)] = cg
+            self._genes = (nodes, connections)
+        return self._genes
+
+    @property
+    def nodes(self):
+        """The node genes, as a dict from node key to DefaultNodeGene (a copy)."""
+        return self._build_genes()[0]
+
+    @property
+    def connections(self):
+        """The connection genes, as a dict from connection key to DefaultConnectionGene (a copy)."""
+        return self._build_genes()[1]
+
+    def __str__(self):
+        s = "Key: {0}\nFitness: {1}\nNodes:".format(self.key, self.fitness)
+        for k, ng in iteritems(self.nodes):
+            s += "\n\t{0} {1!s}".format(k, ng)
+        s += "\nConnections:"
+        for key in sorted(self.connections):
+            s += "\n\t" + str(self.connections[key])
+        return s
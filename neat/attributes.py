@@ -1,8 +1,12 @@
 """Deals with the attributes (variable parameters) of genes"""
 from random import choice, gauss, random, uniform
 from neat.config import ConfigParameter
+from neat.numpy_util import HAVE_NUMPY
 from neat.six_util import iterkeys, iteritems
 
+if HAVE_NUMPY:
+    import numpy as np
+
 # TODO: There is probably a lot of room for simplification of these classes using metaprogramming.
 
 
@@ -10,6 +14,8 @@ class BaseAttribute(object):
     """Superclass for the type-specialized attribute subclasses, used by genes."""
     def __init__(self, name, **default_dict):
         self.name = name
+        # Copy the class-level defaults so that those given here only apply to this attribute.
+        self._config_items = dict((n, list(v)) for n, v in iteritems(self._config_items))
         for n, default in iteritems(default_dict):
             self._config_items[n] = [self._config_items[n][0], default]
         for n in iterkeys(self._config_items):
@@ -79,6 +85,54 @@ class FloatAttribute(BaseAttribute):
 
         return value
 
+    def init_values(self, n, config, rng):
+        """As init_value, for n values at once drawn from rng; returns a NumPy array."""
+        mean = getattr(config, self.init_mean_name)
+        stdev = getattr(config, self.init_stdev_name)
+        init_type = getattr(config, self.init_type_name).lower()
+
+        if ('gauss' in init_type) or ('normal' in init_type):
+            return self.clamp_values(rng.normal(mean, stdev, n), config)
+
+        if 'uniform' in init_type:
+            min_value = max(getattr(config, self.min_value_name),
+                            (mean-(2*stdev)))
+            max_value = min(getattr(config, self.max_value_name),
+                            (mean+(2*stdev)))
+            return rng.uniform(min_value, max_value, n)
+
+        raise RuntimeError("Unknown init_type {!r} for {!s}".format(getattr(config,
+                                                                            self.init_type_name),
+                                                                    self.init_type_name))
+
+    def clamp_values(self, values, config):
+        # Same order as clamp, so that the result is the same even if min_value > max_value.
+        return np.maximum(np.minimum(values, getattr(config, self.max_value_name)),
+                          getattr(config, self.min_value_name))
+
+    def mutate_values(self, values, config, rng):
+        """
+        Returns a list of mutate_value applied to each of the values, with the random
+        numbers for all of them drawn at once from rng (a numpy.random.RandomState).
+        """
+        values = np.array(values, dtype=float)
+        mutate_rate = getattr(config, self.mutate_rate_name)
+        replace_rate = getattr(config, self.replace_rate_name)
+        r = rng.random_sample(len(values))
+
+        mutate = r < mutate_rate
+        count = np.count_nonzero(mutate)
+        if count:
+            mutate_power = getattr(config, self.mutate_power_name)
+            values[mutate] = self.clamp_values(values[mutate] + rng.normal(0.0, mutate_power, count), config)
+
+        replace = (r >= mutate_rate) & (r < replace_rate + mutate_rate)
+        count = np.count_nonzero(replace)
+        if count:
+            values[replace] = self.init_values(count, config, rng)
+
+        return values.tolist()
+
     def validate(self, config): # pragma: no cover
         pass
 
@@ -122,6 +176,36 @@ class BoolAttribute(BaseAttribute):
 
         return value
 
+    def init_values(self, n, config, rng):
+        """As init_value, for n values at once drawn from rng; returns a NumPy array."""
+        default = str(getattr(config, self.default_name)).lower()
+
+        if default in ('1', 'on', 'yes', 'true'):
+            return np.ones(n, dtype=bool)
+        elif default in ('0', 'off', 'no', 'false'):
+            return np.zeros(n, dtype=bool)
+        elif default in ('random', 'none'):
+            return rng.random_sample(n) < 0.5
+
+        raise RuntimeError("Unknown default value {!r} for {!s}".format(default,
+                                                                        self.name))
+
+    def mutate_values(self, values, config, rng):
+        """
+        Returns a list of mutate_value applied to each of the values, with the random
+        numbers for all of them drawn at once from rng (a numpy.random.RandomState).
+        """
+        values = np.array(values, dtype=bool)
+        mutate_rate = (getattr(config, self.mutate_rate_name) +
+                       np.where(values, getattr(config, self.rate_to_false_add_name),
+                                getattr(config, self.rate_to_true_add_name)))
+        mutate = rng.random_sample(len(values)) < mutate_rate
+        count = np.count_nonzero(mutate)
+        if count:
+            values[mutate] = rng.random_sample(count) < 0.5
+
+        return values.tolist()
+
     def validate(self, config): # pragma: no cover
         pass
 
@@ -155,5 +239,24 @@ class StringAttribute(BaseAttribute):
 
         return value
 
+    def mutate_values(self, values, config, rng, options=None):
+        """
+        Returns a list of mutate_value applied to each of the values, with the random
+        numbers for all of them drawn at once from rng (a numpy.random.RandomState).
+        If given, options replaces the configured options, so that values held as
+        codes can be mutated to the codes of the options.
+        """
+        values = list(values)
+        mutate_rate = getattr(config, self.mutate_rate_name)
+
+        if mutate_rate > 0:
+            if options is None:
+                options = getattr(config, self.options_name)
+            mutate = np.flatnonzero(rng.random_sample(len(values)) < mutate_rate)
+            for i, j in zip(mutate.tolist(), rng.randint(len(options), size=len(mutate)).tolist()):
+                values[i] = options[j]
+
+        return values
+
     def validate(self, config): # pragma: no cover
         pass
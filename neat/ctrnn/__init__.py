@@ -1,9 +1,97 @@
 """Handles the continuous-time recurrent neural network implementation."""
 from __future__ import division
 
+import math
+import warnings
+
+from neat.activations import (sigmoid_activation, tanh_activation, sin_activation, gauss_activation,
+                              relu_activation, softplus_activation, identity_activation,
+                              clamped_activation, abs_activation, hat_activation)
+from neat.aggregations import max_aggregation, min_aggregation, median_aggregation, mean_aggregation
 from neat.graphs import required_for_output
+from neat.numpy_util import check_numpy, input_schedule, trace_buffer
 from neat.six_util import itervalues, iteritems
 
+# Largest absolute slope of the built-in activation functions with bounded derivatives.
+# The slope of any other activation is estimated at the node's current input.
+MAX_ACTIVATION_SLOPES = {sigmoid_activation: 1.25,
+                         tanh_activation: 2.5,
+                         sin_activation: 5.0,
+                         gauss_activation: math.sqrt(10.0) * math.exp(-0.5),
+                         relu_activation: 1.0,
+                         softplus_activation: 1.0,
+                         identity_activation: 1.0,
+                         clamped_activation: 1.0,
+                         abs_activation: 1.0,
+                         hat_activation: 1.0}
+
+# Length of the stability interval of each explicit one-step method on the negative real axis.
+_STABILITY_INTERVALS = {'forward_euler': 2.0, 'rk4': 2.785}
+
+INTEGRATION_METHODS = ('euler', 'forward_euler', 'rk4', 'exponential')
+
+
+def local_slope(activation, z, h=1e-4):
+    """Estimates the absolute slope of an activation function at z by central differences."""
+    return abs(activation(z + h) - activation(z - h)) / (2.0 * h)
+
+
+def input_gain(aggregation, weights):
+    """
+    Returns how much the aggregated input of a node can change, at most, per unit change
+    in the values of its inputs: the largest absolute weight for max, min and median,
+    the mean absolute weight for mean, and otherwise the sum of the absolute weights.
+    The last is exact for sum, but only a heuristic for product, maxabs and other
+    functions, whose rate of change is not bounded by the weights alone.
+    """
+    abs_weights = [abs(w) for w in weights]
+    if not abs_weights:
+        return 0.0
+    if aggregation in (max_aggregation, max, min_aggregation, min, median_aggregation):
+        return max(abs_weights)
+    if aggregation is mean_aggregation:
+        return sum(abs_weights) / len(abs_weights)
+    return sum(abs_weights)
+
+
+def max_time_step(time_constant, gain, method='euler'):
+    """
+    Returns a heuristic bound on the largest time step for which the given integration
+    method is stable for a node with the given time constant and gain (the largest slope
+    of its activation function, times its response, times its input_gain).  It is derived
+    from a linearization of each node on its own, so it is not a guarantee for the whole
+    nonlinear network, whose nodes are coupled.
+
+    Linearizing the node around any state, its input term is g * y for some (possibly
+    complex) coupling |g| <= gain.  'euler' is the double-buffered scheme of
+    CTRNN.advance, which with h = dt / time_constant computes each step as
+    y[n+1] = y[n-1] + h * (g * y[n] - y[n-1]).  The roots of r**2 - h*g*r - (1 - h)
+    lie within the unit circle for every such g exactly when gain < 1 and
+    h < 2 / (1 + gain).  With gain >= 1 no step is stable, so a RuntimeWarning is
+    issued; time_constant is still returned, as for h <= 1 the roots are at most
+    1 + h * (gain - 1) in magnitude, growing no faster than the network's own fastest
+    mode does under forward Euler.
+
+    For the one-step methods, the decay rate lies between (1 - gain) / time_constant
+    and (1 + gain) / time_constant; the step must keep the fastest decay within the
+    method's stability interval.  Exponential Euler integrates the decay exactly, so it
+    is only limited by the coupling term when gain > 1.
+    """
+    if method == 'euler':
+        if gain >= 1.0:
+            # The message does not include the gain, so that it is only shown once.
+            warnings.warn("No time step is stable for the 'euler' method with a node gain >= 1;"
+                          " using the time constant", RuntimeWarning)
+            return time_constant
+        return 2.0 * time_constant / (1.0 + gain)
+
+    if method == 'exponential':
+        if gain <= 1.0:
+            return float('inf')
+        return time_constant * math.log((gain + 1.0) / (gain - 1.0))
+
+    return _STABILITY_INTERVALS[method] * time_constant / (1.0 + gain)
+
 
 class CTRNNNodeEval(object):
     def __init__(self, time_constant, activation, aggregation, bias, response, links):
@@ -44,11 +132,24 @@ class CTRNN(object):
         for v in self.values:
             v[node_key] = value
 
-    def get_max_time_step(self): # pragma: no cover
-        # TODO: Compute max time step that is known to be numerically stable for
-        # the current network configuration.
-        # pylint: disable=no-self-use
-        raise NotImplementedError()
+    def get_max_time_step(self):
+        """
+        Returns a heuristic bound on the largest time step that is numerically stable for
+        the current network configuration with the double-buffered update of advance
+        (see max_time_step).
+        """
+        values = self.values[1 - self.active]
+        result = float('inf')
+        for ne in itervalues(self.node_evals):
+            slope = MAX_ACTIVATION_SLOPES.get(ne.activation)
+            if slope is None:
+                s = ne.aggregation([values[i] * w for i, w in ne.links])
+                slope = local_slope(ne.activation, ne.bias + ne.response * s)
+            gain = slope * abs(ne.response) * input_gain(ne.aggregation,
+                                                         [w for i, w in ne.links])
+            result = min(result, max_time_step(ne.time_constant, gain))
+
+        return result
 
     def advance(self, inputs, advance_time, time_step=None):
         """
@@ -58,7 +159,7 @@ class CTRNN(object):
         final_time_seconds = self.time_seconds + advance_time
 
         # Use half of the max allowed time step if none is given.
-        if time_step is None: # pragma: no cover
+        if time_step is None:
             time_step = 0.5 * self.get_max_time_step()
 
         if len(self.input_nodes) != len(inputs):
@@ -86,9 +187,39 @@ class CTRNN(object):
         ovalues = self.values[1 - self.active]
         return [ovalues[i] for i in self.output_nodes]
 
+    def advance_many(self, n_steps, inputs, advance_time, time_step=None, outputs=None, state=None):
+        """
+        Calls advance n_steps times, with inputs either held constant or given per step as
+        an (n_steps, num_inputs) schedule.  Returns an (n_steps, num_outputs) NumPy array of
+        the outputs after each step, written into outputs if given.  If given, state is
+        filled with the (n_steps, num_nodes) node values, in the order of self.node_evals.
+        """
+        check_numpy()
+        schedule = input_schedule(inputs, n_steps, len(self.input_nodes))
+        outputs = trace_buffer(outputs, (n_steps, len(self.output_nodes)))
+        if state is not None:
+            state = trace_buffer(state, (n_steps, len(self.node_evals)))
+
+        for t in range(n_steps):
+            outputs[t] = self.advance(schedule[t].tolist(), advance_time, time_step)
+            if state is not None:
+                ovalues = self.values[1 - self.active]
+                state[t] = [ovalues[k] for k in self.node_evals]
+
+        return outputs
+
     @staticmethod
-    def create(genome, config, time_constant):
-        """ Receives a genome and returns its phenotype (a CTRNN). """
+    def create(genome, config, time_constant, backend='python'):
+        """
+        Receives a genome and returns its phenotype (a CTRNN).
+        If backend is 'numpy', an array-based VectorizedCTRNN is returned instead.
+        """
+        if backend == 'numpy':
+            from neat.ctrnn.vectorized import VectorizedCTRNN
+            return VectorizedCTRNN.create(genome, config, time_constant)
+        elif backend != 'python':
+            raise RuntimeError("Unknown CTRNN backend {!r}".format(backend))
+
         genome_config = config.genome_config
         required = required_for_output(genome_config.input_keys, genome_config.output_keys, genome.connections)
 
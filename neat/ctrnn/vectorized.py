@@ -0,0 +1,212 @@
+"""
+Array-based (NumPy) continuous-time recurrent neural network with selectable
+integration schemes.
+
+Each node i follows
+
+    tau_i * dy_i/dt = -y_i + f_i(bias_i + response_i * sum_j(w_ij * y_j)),
+
+with the state of every node held in one flat array, the weights in a sparse
+edge list and the time constants in a vector, so that each integration step is a
+handful of array operations regardless of the network size.
+"""
+from __future__ import division
+
+from neat.ctrnn import (MAX_ACTIVATION_SLOPES, INTEGRATION_METHODS, CTRNN,
+                        input_gain, max_time_step)
+from neat.nn.vectorized import SparseLayerEval, vectorize_activation
+from neat.numpy_util import HAVE_NUMPY, check_numpy, input_schedule, precision_dtype, trace_buffer
+from neat.six_util import iteritems
+
+if HAVE_NUMPY:
+    import numpy as np
+
+
+class VectorizedCTRNN(object):
+    """
+    A CTRNN evaluated with NumPy, taking the same arguments as :py:class:`CTRNN`
+    plus the integration method: 'euler' (the double-buffered update of CTRNN.advance,
+    giving the same outputs), 'forward_euler' (the standard explicit Euler method),
+    'rk4' (classic fourth-order Runge-Kutta) or 'exponential' (exponential Euler,
+    which integrates each node's decay exactly and is stable with much larger steps).
+    The weights, time constants and state are stored with the given precision, and the
+    function sets are used as by :py:class:`VectorizedFeedForwardNetwork`.
+    """
+    def __init__(self, inputs, outputs, node_evals, method='euler', precision='float64',
+                 activation_defs=None, aggregation_defs=None):
+        check_numpy()
+        if method not in INTEGRATION_METHODS:
+            raise RuntimeError("Unknown integration method {!r}".format(method))
+
+        self.input_nodes = inputs
+        self.output_nodes = outputs
+        self.node_evals = node_evals
+        self.method = method
+        self.precision = precision
+        self.dtype = precision_dtype(precision)
+
+        self.node_index = {}
+        for key in inputs:
+            self.node_index[key] = len(self.node_index)
+        for node in node_evals:
+            self.node_index[node] = len(self.node_index)
+        for ne in node_evals.values():
+            for i, w in ne.links:
+                if i not in self.node_index:
+                    self.node_index[i] = len(self.node_index)
+        for key in outputs:
+            if key not in self.node_index:
+                self.node_index[key] = len(self.node_index)
+
+        index = self.node_index
+        evals = [(index[node], ne.activation, ne.aggregation, ne.bias, ne.response,
+                  [(index[i], w) for i, w in ne.links]) for node, ne in iteritems(node_evals)]
+        self.nodes = SparseLayerEval(evals, self.dtype, activation_defs, aggregation_defs)
+        self.node_rows = self.nodes.dst
+        self.time_constants = np.array([ne.time_constant for ne in node_evals.values()], dtype=self.dtype)
+        self.input_index = np.array([index[k] for k in inputs], dtype=np.intp)
+        self.output_index = np.array([index[k] for k in outputs], dtype=np.intp)
+
+        # Per-node gain used for the stability bound; activations without a known
+        # maximum slope are handled in get_max_time_step.
+        self.input_gains = np.array([abs(ne.response) * input_gain(ne.aggregation,
+                                                                   [w for i, w in ne.links])
+                                     for ne in node_evals.values()], dtype=float)
+        self.max_slopes = np.array([MAX_ACTIVATION_SLOPES.get(ne.activation, np.nan)
+                                    for ne in node_evals.values()], dtype=float)
+        unknown = {}
+        for row, ne in enumerate(node_evals.values()):
+            if ne.activation not in MAX_ACTIVATION_SLOPES:
+                unknown.setdefault(ne.activation, []).append(row)
+        self.unknown_slopes = [(vectorize_activation(f, activation_defs),
+                                np.array(rows, dtype=np.intp))
+                               for f, rows in iteritems(unknown)]
+
+        # The 'euler' method, like CTRNN, keeps a second buffer that runs one step ahead
+        # of the values it returns.
+        self.values = np.zeros(len(index), dtype=self.dtype)
+        self.next_values = np.zeros(len(index), dtype=self.dtype)
+        self.scratch = np.zeros(len(index), dtype=self.dtype)
+        self.time_seconds = 0.0
+
+    def reset(self):
+        self.values.fill(0.0)
+        self.next_values.fill(0.0)
+        self.time_seconds = 0.0
+
+    def set_node_value(self, node_key, value):
+        self.values[self.node_index[node_key]] = value
+        self.next_values[self.node_index[node_key]] = value
+
+    def get_max_time_step(self, method=None):
+        """
+        Returns a heuristic bound on the largest time step that is numerically stable for
+        the current network configuration with the given integration method (by default,
+        the network's own); see max_time_step.
+        """
+        if method is None:
+            method = self.method
+
+        slopes = self.max_slopes.copy()
+        if self.unknown_slopes:
+            h = 1e-4
+            z = self.nodes.net_input(self.values)
+            for act_func, rows in self.unknown_slopes:
+                slopes[rows] = np.abs(act_func(z[rows] + h) - act_func(z[rows] - h)) / (2.0 * h)
+
+        gains = slopes * self.input_gains
+        return min([max_time_step(tc, gain, method) for tc, gain in zip(self.time_constants, gains)]
+                   + [float('inf')])
+
+    def _activations(self, values):
+        """Returns the activation of each node for the given state."""
+        self.nodes.evaluate(values, self.scratch)
+        return self.scratch[self.node_rows]
+
+    def _derivative(self, values):
+        return (self._activations(values) - values[self.node_rows]) / self.time_constants
+
+    def _step_euler(self, dt):
+        # As in CTRNN.advance, the values returned are overwritten with the values one
+        # step beyond next_values, using the activations of next_values, and the two
+        # buffers are swapped.
+        rows = self.node_rows
+        z = self._activations(self.next_values)
+        self.values[rows] += dt / self.time_constants * (z - self.values[rows])
+        self.values, self.next_values = self.next_values, self.values
+
+    def _step_forward_euler(self, dt):
+        self.values[self.node_rows] += dt * self._derivative(self.values)
+
+    def _step_exponential(self, dt):
+        y = self.values[self.node_rows]
+        z = self._activations(self.values)
+        self.values[self.node_rows] = z + (y - z) * np.exp(-dt / self.time_constants)
+
+    def _step_rk4(self, dt):
+        rows = self.node_rows
+        values = self.values
+        y = values[rows]
+        k1 = self._derivative(values)
+        stage = values.copy()
+        stage[rows] = y + 0.5 * dt * k1
+        k2 = self._derivative(stage)
+        stage[rows] = y + 0.5 * dt * k2
+        k3 = self._derivative(stage)
+        stage[rows] = y + dt * k3
+        k4 = self._derivative(stage)
+        values[rows] = y + dt / 6.0 * (k1 + 2.0 * (k2 + k3) + k4)
+
+    def advance(self, inputs, advance_time, time_step=None):
+        """
+        Advance the simulation by the given amount of time, assuming that inputs are
+        constant at the given values during the simulated time.
+        """
+        if len(self.input_nodes) != len(inputs):
+            raise RuntimeError("Expected {0} inputs, got {1}".format(len(self.input_nodes), len(inputs)))
+
+        self.values[self.input_index] = inputs
+        self.next_values[self.input_index] = inputs
+        self._advance(advance_time, time_step)
+        return self.values[self.output_index].tolist()
+
+    def advance_many(self, n_steps, inputs, advance_time, time_step=None, outputs=None, state=None):
+        """
+        Calls advance n_steps times, recording into NumPy buffers without returning to the
+        caller between steps; see CTRNN.advance_many for the arguments.
+        """
+        schedule = input_schedule(inputs, n_steps, len(self.input_nodes), self.dtype)
+        outputs = trace_buffer(outputs, (n_steps, len(self.output_nodes)), self.dtype)
+        if state is not None:
+            state = trace_buffer(state, (n_steps, len(self.node_rows)), self.dtype)
+
+        for t in range(n_steps):
+            self.values[self.input_index] = schedule[t]
+            self.next_values[self.input_index] = schedule[t]
+            self._advance(advance_time, time_step)
+            outputs[t] = self.values[self.output_index]
+            if state is not None:
+                state[t] = self.values[self.node_rows]
+
+        return outputs
+
+    def _advance(self, advance_time, time_step):
+        final_time_seconds = self.time_seconds + advance_time
+
+        # Use half of the max allowed time step if none is given.
+        if time_step is None:
+            time_step = 0.5 * self.get_max_time_step()
+
+        step = getattr(self, '_step_' + self.method)
+        while self.time_seconds < final_time_seconds:
+            dt = min(time_step, final_time_seconds - self.time_seconds)
+            step(dt)
+            self.time_seconds += dt
+
+    @staticmethod
+    def create(genome, config, time_constant, method='euler', precision='float64'):
+        """ Receives a genome and returns its phenotype (a VectorizedCTRNN). """
+        net = CTRNN.create(genome, config, time_constant)
+        genome_config = config.genome_config
+        return VectorizedCTRNN(net.input_nodes, net.output_nodes, net.node_evals, method, precision,
+                               genome_config.activation_defs, genome_config.aggregation_defs)
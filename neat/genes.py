@@ -2,16 +2,18 @@
 import warnings
 from random import random
 from neat.attributes import FloatAttribute, BoolAttribute, StringAttribute
+from neat.pickle_util import SlotsPickleMixin
 
 # TODO: There is probably a lot of room for simplification of these classes using metaprogramming.
-# TODO: Evaluate using __slots__ for performance/memory usage improvement.
 
 
-class BaseGene(object):
+class BaseGene(SlotsPickleMixin):
     """
     Handles functions shared by multiple types of genes (both node and connection),
     including crossover and calling mutation methods.
     """
+    __slots__ = ('key',)
+
     def __init__(self, key):
         self.key = key
 
@@ -50,6 +52,27 @@ class BaseGene(object):
             v = getattr(self, a.name)
             setattr(self, a.name, a.mutate_value(v, config))
 
+    @classmethod
+    def mutate_all(cls, genes, config, rng):
+        """
+        Mutates each of the genes (instances of this class) as mutate does, but one
+        attribute at a time for all of them, using the attribute's mutate_values to draw
+        the random numbers in bulk from rng (a numpy.random.RandomState).  Attributes
+        without mutate_values are mutated one value at a time.
+        """
+        for a in cls._gene_attributes:
+            old = [getattr(g, a.name) for g in genes]
+            if hasattr(a, 'mutate_values'):
+                new = a.mutate_values(old, config, rng)
+            else:
+                new = [a.mutate_value(v, config) for v in old]
+            for g, value in zip(genes, new):
+                setattr(g, a.name, value)
+
+    def attribute_hash(self):
+        """Returns a hash of the gene's attribute values (not including its key)."""
+        return hash(tuple([getattr(self, a.name) for a in self._gene_attributes]))
+
     def copy(self):
         new_gene = self.__class__(self.key)
         for a in self._gene_attributes:
@@ -77,6 +100,7 @@ class BaseGene(object):
 
 
 class DefaultNodeGene(BaseGene):
+    __slots__ = ('bias', 'response', 'activation', 'aggregation')
     _gene_attributes = [FloatAttribute('bias'),
                         FloatAttribute('response'),
                         StringAttribute('activation', options='sigmoid'),
@@ -102,6 +126,7 @@ class DefaultNodeGene(BaseGene):
 # `product` aggregation function is rather more important than one giving
 # an output of 1 from the connection, for instance!)
 class DefaultConnectionGene(BaseGene):
+    __slots__ = ('weight', 'enabled')
     _gene_attributes = [FloatAttribute('weight'),
                         BoolAttribute('enabled')]
 
@@ -3,7 +3,7 @@ from __future__ import division, print_function
 
 
 from itertools import count
-from random import choice, random, shuffle
+from random import choice, getrandbits, random, shuffle
 
 import sys
 
@@ -11,9 +11,14 @@ from neat.activations import ActivationFunctionSet
 from neat.aggregations import AggregationFunctionSet
 from neat.config import ConfigParameter, write_pretty_params
 from neat.genes import DefaultConnectionGene, DefaultNodeGene
-from neat.graphs import creates_cycle
+from neat.graphs import path_exists, TopologicalOrder
+from neat.numpy_util import HAVE_NUMPY
+from neat.pickle_util import SlotsPickleMixin
 from neat.six_util import iteritems, iterkeys
 
+if HAVE_NUMPY:
+    import numpy as np
+
 
 class DefaultGenomeConfig(object):
     """Sets up and holds configuration information for the DefaultGenome class."""
@@ -40,6 +45,8 @@ class DefaultGenomeConfig(object):
                         ConfigParameter('node_delete_prob', float),
                         ConfigParameter('single_structural_mutation', bool, False),
                         ConfigParameter('structural_mutation_surer', str, 'default'),
+                        ConfigParameter('bulk_mutation', bool, False),
+                        ConfigParameter('innovation_tracking', bool, False),
                         ConfigParameter('initial_connection', str, 'unconnected')]
 
         # Gather configuration data from the gene classes.
@@ -84,13 +91,32 @@ class DefaultGenomeConfig(object):
                 self.structural_mutation_surer)
             raise RuntimeError(error_string)
 
+        if self.bulk_mutation and not HAVE_NUMPY: # pragma: no cover
+            raise RuntimeError("bulk_mutation requires NumPy")
+
         self.node_indexer = None
+        self._bulk_rng = None
+
+        # Connection key -> key of the node added by splitting it, for the splits made
+        # in the current generation (used if innovation_tracking is on).
+        self.node_innovations = {}
+
+    def get_bulk_rng(self):
+        """
+        Returns the numpy.random.RandomState used for bulk mutation.  It is created on
+        first use, seeded from the random module so that runs are repeated by seeding that
+        alone, and then kept for the life of the config (like node_indexer, a new run with
+        the same config sets _bulk_rng to None to start again).
+        """
+        if self._bulk_rng is None:
+            self._bulk_rng = np.random.RandomState(getrandbits(32))
+        return self._bulk_rng
 
-    def add_activation(self, name, func):
-        self.activation_defs.add(name, func)
+    def add_activation(self, name, func, vectorized=None):
+        self.activation_defs.add(name, func, vectorized)
 
-    def add_aggregation(self, name, func):
-        self.aggregation_function_defs.add(name, func)
+    def add_aggregation(self, name, func, vectorized=None):
+        self.aggregation_function_defs.add(name, func, vectorized)
 
     def save(self, f):
         if 'partial' in self.initial_connection:
@@ -117,6 +143,26 @@ class DefaultGenomeConfig(object):
 
         return new_id
 
+    def get_split_node_key(self, node_dict, connection_key):
+        """
+        Returns the key for the node added by splitting the given connection.  With
+        innovation_tracking, all the genomes that split the same connection in a
+        generation are given the same key (unless they already have a node with it).
+        """
+        if not self.innovation_tracking:
+            return self.get_new_node_key(node_dict)
+
+        node_key = self.node_innovations.get(connection_key)
+        if node_key is None:
+            node_key = self.node_innovations[connection_key] = self.get_new_node_key(node_dict)
+        elif node_key in node_dict:
+            node_key = self.get_new_node_key(node_dict)
+        return node_key
+
+    def reset_innovations(self):
+        """Forgets the splits made so far; called at the start of each generation."""
+        self.node_innovations = {}
+
     def check_structural_mutation_surer(self):
         if self.structural_mutation_surer == 'true':
             return True
@@ -129,7 +175,7 @@ class DefaultGenomeConfig(object):
                 self.structural_mutation_surer)
             raise RuntimeError(error_string)
 
-class DefaultGenome(object):
+class DefaultGenome(SlotsPickleMixin):
     """
     A genome for generalized neural networks.
 
@@ -150,6 +196,11 @@ class DefaultGenome(object):
         3. Output neurons can be modified but not deleted.
         4. The input values are applied to the input pins unmodified.
     """
+    __slots__ = ('key', 'connections', 'nodes', 'incoming', 'outgoing', 'node_order',
+                 '_hashes', 'fitness')
+    # The adjacency index and topological order are rebuilt from the connections when a
+    # genome is unpickled, which keeps pickles (checkpoints, worker messages) smaller.
+    _transient_slots = ('incoming', 'outgoing', 'node_order', '_hashes')
 
     @classmethod
     def parse_config(cls, param_dict):
@@ -169,23 +220,68 @@ class DefaultGenome(object):
         self.connections = {}
         self.nodes = {}
 
+        # Adjacency index over all connection keys (enabled or not): node key -> set
+        # of node keys.  Kept up to date by add_connection_gene/remove_connection_gene.
+        self.incoming = {}
+        self.outgoing = {}
+
+        # Topological order of the connection graph, or None once a connection has
+        # closed a cycle (as recurrent genomes may).
+        self.node_order = TopologicalOrder()
+
+        # Cached (structure_hash, parameter_hash), or None if the genes have changed since
+        # they were last computed.  The methods below that change genes reset it, and the
+        # next lookup recomputes both from every gene.
+        self._hashes = None
+
         # Fitness results.
         self.fitness = None
 
+    def __setstate__(self, state):
+        # Older pickles may also hold the hashes, adjacency index or topological order.
+        ignored = ('structure_hash', 'parameter_hash') + self._transient_slots
+        SlotsPickleMixin.__setstate__(self, dict((name, value) for name, value in iteritems(state)
+                                                 if name not in ignored))
+        self.rebuild_index()
+
+        # Python's string hashes differ between processes, so the hashes of a genome
+        # unpickled from a checkpoint or sent to a worker process are recomputed.
+        self._hashes = None
+
+    @property
+    def structure_hash(self):
+        """
+        A hash of the node keys and the keys of enabled connections.  This is a cached
+        full hash, not an incrementally updated one: the first lookup after the genes
+        change recomputes it from every gene, so only repeated lookups are O(1).
+        """
+        if self._hashes is None:
+            self._hashes = self.compute_hashes()
+        return self._hashes[0]
+
+    @property
+    def parameter_hash(self):
+        """
+        A hash of the keys and attribute values of every gene, cached (and recomputed
+        from every gene after a change) as structure_hash is.
+        """
+        if self._hashes is None:
+            self._hashes = self.compute_hashes()
+        return self._hashes[1]
+
     def configure_new(self, config):
         """Configure a new genome based on the given configuration."""
 
         # Create node genes for the output pins.
         for node_key in config.output_keys:
-            self.nodes[node_key] = self.create_node(config, node_key)
+            self.add_node_gene(self.create_node(config, node_key))
 
         # Add hidden nodes if requested.
         if config.num_hidden > 0:
             for i in range(config.num_hidden):
                 node_key = config.get_new_node_key(self.nodes)
                 assert node_key not in self.nodes
-                node = self.create_node(config, node_key)
-                self.nodes[node_key] = node
+                self.add_node_gene(self.create_node(config, node_key))
 
         # Add connections based on initial connectivity type.
 
@@ -240,32 +336,44 @@ class DefaultGenome(object):
         else:
             parent1, parent2 = genome2, genome1
 
-        # Inherit connection genes
+        # Inherit connection genes.  They are stored directly, and the adjacency index is
+        # built once below rather than updated for each gene.
+        connections = self.connections
         for key, cg1 in iteritems(parent1.connections):
             cg2 = parent2.connections.get(key)
             if cg2 is None:
                 # Excess or disjoint gene: copy from the fittest parent.
-                self.connections[key] = cg1.copy()
+                connections[key] = cg1.copy()
             else:
                 # Homologous gene: combine genes from both parents.
-                self.connections[key] = cg1.crossover(cg2)
+                connections[key] = cg1.crossover(cg2)
 
         # Inherit node genes
         parent1_set = parent1.nodes
         parent2_set = parent2.nodes
 
+        nodes = self.nodes
         for key, ng1 in iteritems(parent1_set):
             ng2 = parent2_set.get(key)
-            assert key not in self.nodes
+            assert key not in nodes
             if ng2 is None:
                 # Extra gene: copy from the fittest parent
-                self.nodes[key] = ng1.copy()
+                nodes[key] = ng1.copy()
             else:
                 # Homologous gene: combine genes from both parents.
-                self.nodes[key] = ng1.crossover(ng2)
+                nodes[key] = ng1.crossover(ng2)
+
+        # The child has exactly the connection keys of parent1, so its order still applies.
+        self._build_adjacency()
+        if parent1.node_order is None:
+            self.node_order = None
+        else:
+            self.node_order = parent1.node_order.copy()
+        self._hashes = None
 
     def mutate(self, config):
         """ Mutates this genome. """
+        self._hashes = None
 
         if config.single_structural_mutation:
             div = max(1,(config.node_add_prob + config.node_delete_prob +
@@ -294,6 +402,15 @@ class DefaultGenome(object):
             if random() < config.conn_delete_prob:
                 self.mutate_delete_connection()
 
+        if config.bulk_mutation:
+            # Mutate each attribute of all the genes at once.
+            rng = config.get_bulk_rng()
+            if self.connections:
+                config.connection_gene_type.mutate_all(list(self.connections.values()), config, rng)
+            if self.nodes:
+                config.node_gene_type.mutate_all(list(self.nodes.values()), config, rng)
+            return
+
         # Mutate connection genes.
         for cg in self.connections.values():
             cg.mutate(config)
@@ -310,14 +427,14 @@ class DefaultGenome(object):
 
         # Choose a random connection to split
         conn_to_split = choice(list(self.connections.values()))
-        new_node_id = config.get_new_node_key(self.nodes)
-        ng = self.create_node(config, new_node_id)
-        self.nodes[new_node_id] = ng
+        new_node_id = config.get_split_node_key(self.nodes, conn_to_split.key)
+        self.add_node_gene(self.create_node(config, new_node_id))
 
         # Disable this connection and create two new connections joining its nodes via
         # the given node.  The new node+connections have roughly the same behavior as
         # the original connection (depending on the activation function of the new node).
         conn_to_split.enabled = False
+        self._hashes = None
 
         i, o = conn_to_split.key
         self.add_connection(config, i, new_node_id, 1.0, True)
@@ -334,7 +451,99 @@ class DefaultGenome(object):
         connection.init_attributes(config)
         connection.weight = weight
         connection.enabled = enabled
-        self.connections[key] = connection
+        self.add_connection_gene(connection)
+
+    def add_connection_gene(self, connection):
+        """
+        Adds (or replaces) a connection gene, keeping the adjacency index and the
+        topological order up to date and discarding the genome's cached hashes.
+        """
+        i, o = connection.key
+        if connection.key not in self.connections:
+            if self.node_order is not None:
+                if not self.node_order.add_connection(self.outgoing, self.incoming, i, o):
+                    self.node_order = None
+            if i not in self.outgoing:
+                self.outgoing[i] = {o}
+            else:
+                self.outgoing[i].add(o)
+            if o not in self.incoming:
+                self.incoming[o] = {i}
+            else:
+                self.incoming[o].add(i)
+        self.connections[connection.key] = connection
+        self._hashes = None
+
+    def _build_adjacency(self):
+        incoming = {}
+        outgoing = {}
+        for i, o in iterkeys(self.connections):
+            if i not in outgoing:
+                outgoing[i] = {o}
+            else:
+                outgoing[i].add(o)
+            if o not in incoming:
+                incoming[o] = {i}
+            else:
+                incoming[o].add(i)
+        self.incoming = incoming
+        self.outgoing = outgoing
+
+    def rebuild_index(self):
+        """
+        Rebuilds the adjacency index and topological order from the connections, as is
+        needed after connection genes have been added or removed directly.
+        """
+        self._build_adjacency()
+        self.node_order = TopologicalOrder.from_adjacency(self.outgoing, self.incoming)
+
+    def remove_connection_gene(self, key):
+        """
+        Deletes a connection gene, keeping the adjacency index up to date and discarding
+        the genome's cached hashes.
+        """
+        del self.connections[key]
+        self._hashes = None
+        i, o = key
+        self.outgoing[i].discard(o)
+        if not self.outgoing[i]:
+            del self.outgoing[i]
+        self.incoming[o].discard(i)
+        if not self.incoming[o]:
+            del self.incoming[o]
+
+    def add_node_gene(self, node):
+        """Adds (or replaces) a node gene, discarding the genome's cached hashes."""
+        self.nodes[node.key] = node
+        self._hashes = None
+
+    def remove_node_gene(self, key):
+        """
+        Deletes a node gene, keeping the topological order up to date and discarding the
+        genome's cached hashes.
+        Its connections must have been removed first.
+        """
+        del self.nodes[key]
+        self._hashes = None
+        if self.node_order is not None:
+            self.node_order.remove_node(key)
+
+    def compute_hashes(self):
+        """
+        Returns (structure_hash, parameter_hash) computed from the genes.  Each is the XOR
+        of one term per gene, so it does not depend on the order the genes were added in.
+        Unlike the properties, this also reflects genes that have been edited directly.
+        """
+        structure_hash = 0
+        parameter_hash = 0
+        for key, ng in iteritems(self.nodes):
+            structure_hash ^= hash((0, key))
+            parameter_hash ^= hash((0, key, ng.attribute_hash()))
+        for key, cg in iteritems(self.connections):
+            if cg.enabled:
+                structure_hash ^= hash((1, key))
+            parameter_hash ^= hash((1, key, cg.attribute_hash()))
+        return structure_hash, parameter_hash
 
     def mutate_add_connection(self, config):
         """
@@ -353,6 +562,7 @@ class DefaultGenome(object):
             # TODO: Should this be using mutation to/from rates? Hairy to configure...
             if config.check_structural_mutation_surer():
                 self.connections[key].enabled = True
+                self._hashes = None
             return
 
         # Don't allow connections between two output nodes
@@ -362,12 +572,17 @@ class DefaultGenome(object):
         # No need to check for connections between input nodes:
         # they cannot be the output end of a connection (see above).
 
-        # For feed-forward networks, avoid creating cycles.
-        if config.feed_forward and creates_cycle(list(iterkeys(self.connections)), key):
-            return
+        # For feed-forward networks, avoid creating cycles: the new connection closes
+        # a cycle exactly when in_node is already reachable from out_node.
+        if config.feed_forward:
+            if self.node_order is not None:
+                if self.node_order.creates_cycle(self.outgoing, in_node, out_node):
+                    return
+            elif path_exists(self.outgoing, out_node, in_node):
+                return
 
         cg = self.create_connection(config, in_node, out_node)
-        self.connections[cg.key] = cg
+        self.add_connection_gene(cg)
 
     def mutate_delete_node(self, config):
         # Do nothing if there are no non-output nodes.
@@ -377,22 +592,24 @@ class DefaultGenome(object):
 
         del_key = choice(available_nodes)
 
+        # Only the connections incident to the deleted node need to be visited.
         connections_to_delete = set()
-        for k, v in iteritems(self.connections):
-            if del_key in v.key:
-                connections_to_delete.add(v.key)
+        for i in self.incoming.get(del_key, ()):
+            connections_to_delete.add((i, del_key))
+        for o in self.outgoing.get(del_key, ()):
+            connections_to_delete.add((del_key, o))
 
         for key in connections_to_delete:
-            del self.connections[key]
+            self.remove_connection_gene(key)
 
-        del self.nodes[del_key]
+        self.remove_node_gene(del_key)
 
         return del_key
 
     def mutate_delete_connection(self):
         if self.connections:
             key = choice(list(self.connections.keys()))
-            del self.connections[key]
+            self.remove_connection_gene(key)
 
     def distance(self, other, config):
         """
@@ -485,7 +702,7 @@ class DefaultGenome(object):
         input_id = choice(config.input_keys)
         for output_id in config.output_keys:
             connection = self.create_connection(config, input_id, output_id)
-            self.connections[connection.key] = connection
+            self.add_connection_gene(connection)
 
     def connect_fs_neat_hidden(self, config):
         """
@@ -496,7 +713,7 @@ class DefaultGenome(object):
         others = [i for i in iterkeys(self.nodes) if i not in config.input_keys]
         for output_id in others:
             connection = self.create_connection(config, input_id, output_id)
-            self.connections[connection.key] = connection
+            self.add_connection_gene(connection)
 
     def compute_full_connections(self, config, direct):
         """
@@ -536,13 +753,13 @@ class DefaultGenome(object):
         """
         for input_id, output_id in self.compute_full_connections(config, False):
             connection = self.create_connection(config, input_id, output_id)
-            self.connections[connection.key] = connection
+            self.add_connection_gene(connection)
 
     def connect_full_direct(self, config):
         """ Create a fully-connected genome, including direct input-output connections. """
         for input_id, output_id in self.compute_full_connections(config, True):
             connection = self.create_connection(config, input_id, output_id)
-            self.connections[connection.key] = connection
+            self.add_connection_gene(connection)
 
     def connect_partial_nodirect(self, config):
         """
@@ -554,7 +771,7 @@ class DefaultGenome(object):
         num_to_add = int(round(len(all_connections) * config.connection_fraction))
         for input_id, output_id in all_connections[:num_to_add]:
             connection = self.create_connection(config, input_id, output_id)
-            self.connections[connection.key] = connection
+            self.add_connection_gene(connection)
 
     def connect_partial_direct(self, config):
         """
@@ -567,4 +784,4 @@ class DefaultGenome(object):
         num_to_add = int(round(len(all_connections) * config.connection_fraction))
         for input_id, output_id in all_connections[:num_to_add]:
             connection = self.create_connection(config, input_id, output_id)
-            self.connections[connection.key] = connection
+            self.add_connection_gene(connection)
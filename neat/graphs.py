@@ -24,6 +24,29 @@ def creates_cycle(connections, test):
             return False
 
 
+def path_exists(outgoing, start, end):
+    """
+    Returns true if 'end' can be reached from 'start' by following the adjacency
+    map 'outgoing' (node -> iterable of successor nodes), using a depth-first
+    search that only visits nodes downstream of 'start'.
+    """
+    if start == end:
+        return True
+
+    visited = {start}
+    stack = [start]
+    while stack:
+        node = stack.pop()
+        for b in outgoing.get(node, ()):
+            if b == end:
+                return True
+            if b not in visited:
+                visited.add(b)
+                stack.append(b)
+
+    return False
+
+
 def required_for_output(inputs, outputs, connections):
     """
     Collect the nodes whose state is required to compute the final network output(s).
@@ -35,12 +58,23 @@ def required_for_output(inputs, outputs, connections):
 
     Returns a set of identifiers of required nodes.
     """
+    inputs = set(inputs)
+
+    # Map each node to the nodes feeding it, so that each level of the reverse
+    # breadth-first search only looks at the connections into the previous level.
+    incoming = {}
+    for a, b in connections:
+        if b not in incoming:
+            incoming[b] = [a]
+        else:
+            incoming[b].append(a)
 
     required = set(outputs)
     s = set(outputs)
+    frontier = s
     while 1:
-        # Find nodes not in S whose output is consumed by a node in s.
-        t = set(a for (a, b) in connections if b in s and a not in s)
+        # Find nodes not in S whose output is consumed by a node in the frontier.
+        t = set(a for b in frontier for a in incoming.get(b, ()) if a not in s)
 
         if not t:
             break
@@ -49,8 +83,9 @@ def required_for_output(inputs, outputs, connections):
         if not layer_nodes:
             break
 
-        required = required.union(layer_nodes)
-        s = s.union(t)
+        required.update(layer_nodes)
+        s.update(t)
+        frontier = t
 
     return required
 
@@ -69,24 +104,210 @@ def feed_forward_layers(inputs, outputs, connections):
 
     required = required_for_output(inputs, outputs, connections)
 
-    layers = []
+    # Kahn-style layering: count the connections into each node that come from
+    # nodes not yet placed, and release a node once that count drops to zero.
     s = set(inputs)
+    outgoing = {}
+    pending = {}
+    c = set()
+    for a, b in connections:
+        if b in s:
+            continue
+        if a in s:
+            c.add(b)
+        else:
+            pending[b] = pending.get(b, 0) + 1
+            if a not in outgoing:
+                outgoing[a] = [b]
+            else:
+                outgoing[a].append(b)
+
+    layers = []
     while 1:
-        # Find candidate nodes c for the next layer.  These nodes should connect
-        # a node in s to a node not in s.
-        c = set(b for (a, b) in connections if a in s and b not in s)
-        # Keep only the used nodes whose entire input set is contained in s.
-        t = set()
-        for n in c:
-            if n in required and all(a in s for (a, b) in connections if b == n):
-                t.add(n)
+        # Keep only the used candidate nodes whose entire input set is contained in s.
+        t = set(n for n in c if n in required and not pending.get(n))
 
         if not t:
             break
 
         layers.append(t)
-        s = s.union(t)
+        s.update(t)
+
+        c = set()
+        for a in t:
+            for b in outgoing.get(a, ()):
+                pending[b] -= 1
+                if b not in s:
+                    c.add(b)
 
     return layers
 
 
+def feed_forward_sequence(inputs, outputs, connections, rank):
+    """
+    Collect the same nodes as feed_forward_layers, but as a single evaluation sequence
+    sorted by an existing topological order instead of being re-layered.
+    :param inputs: list of the network input nodes
+    :param outputs: list of the output node identifiers
+    :param connections: list of (input, output) connections in the network.
+    :param rank: dict mapping each node that has connections to its position in a
+                 topological order of the network (such as TopologicalOrder.rank).
+
+    Returns a list of node identifiers.  If rank is missing a node, or does not order
+    some connection (for instance, because the connections were changed without
+    updating it), the sequence is taken from feed_forward_layers instead.
+    """
+    input_set = set(inputs)
+    incoming = {}
+    for a, b in connections:
+        if b in input_set:
+            continue
+        ra = rank.get(a)
+        rb = rank.get(b)
+        if rb is None or (a not in input_set and (ra is None or ra >= rb)):
+            return [n for layer in feed_forward_layers(inputs, outputs, connections) for n in layer]
+        if b not in incoming:
+            incoming[b] = [a]
+        else:
+            incoming[b].append(a)
+
+    required = required_for_output(inputs, outputs, connections)
+
+    # A node can be evaluated once all of its inputs are network inputs or evaluated nodes.
+    sequence = []
+    placed = input_set
+    for n in sorted((n for n in required if n in incoming), key=rank.__getitem__):
+        if all(a in placed for a in incoming[n]):
+            sequence.append(n)
+            placed.add(n)
+
+    return sequence
+
+
+class TopologicalOrder(object):
+    """
+    A topological order of a directed acyclic graph that is updated incrementally as
+    connections are added, using the dynamic algorithm of Pearce and Kelly (2006).
+
+    Each node that has connections is given an integer rank, with rank[a] < rank[b] for
+    every connection (a, b).  The graph itself is not stored; methods that need it take
+    the same outgoing/incoming adjacency maps (node -> iterable of nodes) kept by the genome.
+    """
+    def __init__(self):
+        self.rank = {}
+        self.low = 0
+        self.high = -1
+
+    def copy(self):
+        new_order = TopologicalOrder()
+        new_order.rank = dict(self.rank)
+        new_order.low = self.low
+        new_order.high = self.high
+        return new_order
+
+    @classmethod
+    def from_adjacency(cls, outgoing, incoming):
+        """
+        Returns a TopologicalOrder of the graph given by the adjacency maps, or None if
+        the graph has a cycle.
+        """
+        pending = dict((n, len(a)) for n, a in incoming.items())
+        ready = [n for n in outgoing if not pending.get(n)]
+        order = cls()
+        rank = order.rank
+        while ready:
+            node = ready.pop()
+            rank[node] = len(rank)
+            for b in outgoing.get(node, ()):
+                pending[b] -= 1
+                if not pending[b]:
+                    ready.append(b)
+
+        if len(rank) < len(pending) + sum(1 for n in outgoing if n not in pending):
+            return None
+
+        order.high = len(rank) - 1
+        return order
+
+    def remove_node(self, node):
+        self.rank.pop(node, None)
+
+    def _reachable(self, outgoing, start, upper, target):
+        """
+        Returns the nodes reachable from start through nodes ranked below upper,
+        or None if target is reached.
+        """
+        rank = self.rank
+        visited = {start}
+        stack = [start]
+        while stack:
+            node = stack.pop()
+            for b in outgoing.get(node, ()):
+                if b == target:
+                    return None
+                if b not in visited and rank[b] < upper:
+                    visited.add(b)
+                    stack.append(b)
+        return visited
+
+    def creates_cycle(self, outgoing, i, o):
+        """
+        Returns true if adding the connection (i, o) would create a cycle.  In most
+        cases this is decided by comparing ranks; otherwise only the nodes ranked
+        between o and i are searched.
+        """
+        if i == o:
+            return True
+
+        ri = self.rank.get(i)
+        ro = self.rank.get(o)
+        if ri is None or ro is None or ri < ro:
+            return False
+
+        return self._reachable(outgoing, o, ri, i) is None
+
+    def add_connection(self, outgoing, incoming, i, o):
+        """
+        Updates the order for a new connection (i, o) that has not yet been added to the
+        adjacency maps.  Returns false, leaving the order unchanged, if the connection
+        would create a cycle.
+        """
+        if i == o:
+            return False
+
+        # A node without connections can be placed first (or last) in the order.
+        rank = self.rank
+        if i not in rank:
+            self.low -= 1
+            rank[i] = self.low
+        if o not in rank:
+            self.high += 1
+            rank[o] = self.high
+
+        ri = rank[i]
+        ro = rank[o]
+        if ri < ro:
+            return True
+
+        # Find the nodes between o and i that must be shifted: those reachable from o
+        # and those that reach i.
+        forward = self._reachable(outgoing, o, ri, i)
+        if forward is None:
+            return False
+
+        backward = {i}
+        stack = [i]
+        while stack:
+            node = stack.pop()
+            for a in incoming.get(node, ()):
+                if a not in backward and rank[a] > ro:
+                    backward.add(a)
+                    stack.append(a)
+
+        # Reuse the affected ranks, placing everything that reaches i before
+        # everything reachable from o.
+        nodes = sorted(backward, key=rank.__getitem__) + sorted(forward, key=rank.__getitem__)
+        for n, r in zip(nodes, sorted(rank[n] for n in nodes)):
+            rank[n] = r
+
+        return True
@@ -9,11 +9,12 @@ IEEE TRANSACTIONS ON NEURAL NETWORKS, VOL. 14, NO. 6, NOVEMBER 2003
 http://www.izhikevich.org/publications/spikes.pdf
 """
 
-from neat.attributes import FloatAttribute
+from neat.attributes import FloatAttribute, BoolAttribute
 from neat.genes import BaseGene, DefaultConnectionGene
 from neat.genome import DefaultGenomeConfig, DefaultGenome
 from neat.graphs import required_for_output
-from neat.six_util import itervalues
+from neat.numpy_util import check_numpy, input_schedule, trace_buffer
+from neat.six_util import iteritems, itervalues
 
 # a, b, c, d are the parameters of the Izhikevich model.
 # a: the time scale of the recovery variable
@@ -31,11 +32,9 @@ RESONATOR_PARAMS              = {'a': 0.10, 'b': 0.25, 'c': -65.0, 'd': 2.00}
 LOW_THRESHOLD_SPIKING_PARAMS  = {'a': 0.02, 'b': 0.25, 'c': -65.0, 'd': 2.00}
 
 
-# TODO: Add mechanisms analogous to axon & dendrite propagation delay.
-
-
 class IZNodeGene(BaseGene):
     """Contains attributes for the iznn node genes and determines genomic distances."""
+    __slots__ = ('bias', 'a', 'b', 'c', 'd')
 
     _gene_attributes = [FloatAttribute('bias'),
                            FloatAttribute('a'),
@@ -49,11 +48,35 @@ class IZNodeGene(BaseGene):
         return s * config.compatibility_weight_coefficient
 
 
+class IZConnectionGene(DefaultConnectionGene):
+    """
+    Adds an evolvable propagation delay (in milliseconds) to the default connection gene,
+    modeling the combined axon and dendrite delay of the connection.  By default the delay
+    is fixed at zero, so that configurations without delay_* items behave as before
+    (apart from a DeprecationWarning for each missing item).
+    """
+    __slots__ = ('delay',)
+
+    _gene_attributes = [FloatAttribute('weight'),
+                        BoolAttribute('enabled'),
+                        FloatAttribute('delay', init_mean=0.0, init_stdev=0.0, replace_rate=0.0,
+                                       mutate_rate=0.0, mutate_power=0.0,
+                                       max_value=0.0, min_value=0.0)]
+
+    def distance(self, other, config):
+        d = abs(self.weight - other.weight) + abs(self.delay - other.delay)
+        if self.enabled != other.enabled:
+            d += 1.0
+        return d * config.compatibility_weight_coefficient
+
+
 class IZGenome(DefaultGenome):
+    __slots__ = ()
+
     @classmethod
     def parse_config(cls, param_dict):
         param_dict['node_gene_type'] = IZNodeGene
-        param_dict['connection_gene_type'] = DefaultConnectionGene
+        param_dict['connection_gene_type'] = IZConnectionGene
         return DefaultGenomeConfig(param_dict)
 
 
@@ -125,13 +148,54 @@ class IZNeuron(object):
         self.current = self.bias
 
 
+def delay_steps(delay_msec, dt_msec):
+    """Returns the number of whole time steps of dt_msec closest to the given delay."""
+    return max(0, int(round(delay_msec / dt_msec)))
+
+
 class IZNN(object):
-    """Basic iznn network object."""
-    def __init__(self, neurons, inputs, outputs):
+    """
+    Basic iznn network object.  If given, delays maps (input neuron, output neuron) keys to
+    the propagation delay of the connection in milliseconds; spikes on a connection with a
+    delay of k time steps arrive k steps later than on an undelayed one.  Delays only apply
+    to connections between neurons, as the network inputs are not spikes.
+    """
+    def __init__(self, neurons, inputs, outputs, delays=None):
         self.neurons = neurons
         self.inputs = inputs
         self.outputs = outputs
         self.input_values = {}
+        self.delays = delays if delays is not None else {}
+        self.delay_dt = None
+
+    def _configure_delays(self, dt_msec):
+        """
+        Converts the delays to time steps of dt_msec and sets up the ring of pending input
+        currents: pending[(step + k) % len(pending)] accumulates the currents that arrive
+        k steps from now, so queueing a delayed spike costs the same as an undelayed one.
+        Any spikes still in transit are dropped.
+        """
+        self.delay_dt = dt_msec
+        self.immediate_inputs = {}
+        self.delayed_links = {}
+        max_steps = 0
+        for key, n in iteritems(self.neurons):
+            immediate = []
+            for i, w in n.inputs:
+                steps = 0
+                if i in self.neurons:
+                    steps = delay_steps(self.delays.get((i, key), 0.0), dt_msec)
+                if steps:
+                    self.delayed_links.setdefault(i, []).append((key, w, steps))
+                    max_steps = max(max_steps, steps)
+                else:
+                    immediate.append((i, w))
+            self.immediate_inputs[key] = immediate
+
+        self.pending = None
+        if max_steps:
+            self.pending = [dict((key, 0.0) for key in self.neurons) for _ in range(max_steps + 1)]
+        self.step_count = 0
 
     def set_inputs(self, inputs):
         """Assign input voltages."""
@@ -146,6 +210,7 @@ class IZNN(object):
         """Reset all neurons to their default state."""
         for n in itervalues(self.neurons):
             n.reset()
+        self.delay_dt = None
 
     def get_time_step_msec(self):
         # pylint: disable=no-self-use
@@ -154,9 +219,25 @@ class IZNN(object):
         return 0.05
 
     def advance(self, dt_msec):
-        for n in itervalues(self.neurons):
+        if dt_msec != self.delay_dt:
+            self._configure_delays(dt_msec)
+
+        arrivals = None
+        if self.pending is not None:
+            # Queue the spikes of the last step on the delayed connections.
+            size = len(self.pending)
+            slot = self.step_count % size
+            for key, links in iteritems(self.delayed_links):
+                fired = self.neurons[key].fired
+                if fired:
+                    for o, w, steps in links:
+                        self.pending[(slot + steps) % size][o] += fired * w
+            arrivals = self.pending[slot]
+            self.step_count += 1
+
+        for key, n in iteritems(self.neurons):
             n.current = n.bias
-            for i, w in n.inputs:
+            for i, w in self.immediate_inputs[key]:
                 ineuron = self.neurons.get(i)
                 if ineuron is not None:
                     ivalue = ineuron.fired
@@ -165,19 +246,65 @@ class IZNN(object):
 
                 n.current += ivalue * w
 
+            if arrivals is not None:
+                n.current += arrivals[key]
+                arrivals[key] = 0.0
+
         for n in itervalues(self.neurons):
             n.advance(dt_msec)
 
         return [self.neurons[i].fired for i in self.outputs]
 
+    def advance_many(self, n_steps, inputs, dt_msec=None, outputs=None, spikes=None, state=None):
+        """
+        Advances the network by n_steps time steps of dt_msec milliseconds (by default,
+        get_time_step_msec()), with inputs either held constant or given per step as an
+        (n_steps, num_inputs) schedule.  Returns an (n_steps, num_outputs) NumPy array of
+        the output spikes, written into outputs if given.  If given, spikes is filled with
+        the (n_steps, num_neurons) spike raster and state with the (n_steps, 2, num_neurons)
+        values of v and u after each step, with neurons in the order of self.neurons.
+        """
+        check_numpy()
+        if dt_msec is None:
+            dt_msec = self.get_time_step_msec()
+
+        neurons = list(itervalues(self.neurons))
+        schedule = input_schedule(inputs, n_steps, len(self.inputs))
+        outputs = trace_buffer(outputs, (n_steps, len(self.outputs)))
+        if spikes is not None:
+            spikes = trace_buffer(spikes, (n_steps, len(neurons)))
+        if state is not None:
+            state = trace_buffer(state, (n_steps, 2, len(neurons)))
+
+        for t in range(n_steps):
+            self.set_inputs(schedule[t].tolist())
+            outputs[t] = self.advance(dt_msec)
+            if spikes is not None:
+                spikes[t] = [n.fired for n in neurons]
+            if state is not None:
+                state[t, 0] = [n.v for n in neurons]
+                state[t, 1] = [n.u for n in neurons]
+
+        return outputs
+
     @staticmethod
-    def create(genome, config):
-        """ Receives a genome and returns its phenotype (a neural network). """
+    def create(genome, config, backend='python'):
+        """
+        Receives a genome and returns its phenotype (a neural network).
+        If backend is 'numpy', an array-based VectorizedIZNN is returned instead.
+        """
+        if backend == 'numpy':
+            from neat.iznn.vectorized import VectorizedIZNN
+            return VectorizedIZNN.create(genome, config)
+        elif backend != 'python':
+            raise RuntimeError("Unknown IZNN backend {!r}".format(backend))
+
         genome_config = config.genome_config
         required = required_for_output(genome_config.input_keys, genome_config.output_keys, genome.connections)
 
         # Gather inputs and expressed connections.
         node_inputs = {}
+        delays = {}
         for cg in itervalues(genome.connections):
             if not cg.enabled:
                 continue
@@ -186,6 +313,10 @@ class IZNN(object):
             if o not in required and i not in required:
                 continue
 
+            delay = getattr(cg, 'delay', 0.0)
+            if delay:
+                delays[cg.key] = delay
+
             if o not in node_inputs:
                 node_inputs[o] = [(i, cg.weight)]
             else:
@@ -198,4 +329,4 @@ class IZNN(object):
             neurons[node_key] = IZNeuron(ng.bias, ng.a, ng.b, ng.c, ng.d, inputs)
 
         genome_config = config.genome_config
-        return IZNN(neurons, genome_config.input_keys, genome_config.output_keys)
+        return IZNN(neurons, genome_config.input_keys, genome_config.output_keys, delays)
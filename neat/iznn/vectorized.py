@@ -0,0 +1,275 @@
+"""
+Array-based (NumPy) simulation of a spiking network of Izhikevich neurons.
+
+The state and parameters of every neuron (v, u, a, b, c, d, bias, fired) are
+kept as vectors, the input current of all neurons is computed with one sparse
+matrix-vector product over the spikes and network inputs, and spikes are reset
+with masks.  The arithmetic is done in the same order as in IZNeuron, so the
+spike trains are the same as those of the object model (except that NumPy
+squares v exactly, where the C library's pow may differ in the last bit).
+
+In event-driven mode the input currents are instead kept in a running
+accumulator, and each step only propagates changes along the outgoing links of
+the neurons whose output changed (those that fired in this step or the previous
+one) and of the inputs that were changed, so the cost of computing the currents
+scales with the number of spikes rather than the number of connections.  So that
+rounding errors do not build up in the accumulator, it is recomputed from the
+source values on reset and every sync_interval steps.
+
+Spikes sent along connections with a propagation delay are instead added into a
+ring of pending input currents, with one row per time step up to the longest
+delay; each step adds in and clears the row that is due.
+"""
+from neat.iznn import IZNN, delay_steps
+from neat.numpy_util import HAVE_NUMPY, check_numpy, input_schedule, precision_dtype, trace_buffer
+
+if HAVE_NUMPY:
+    import numpy as np
+
+
+def _outgoing_links(start, sources):
+    """
+    Returns the indices of all the links of the given sources, in a compressed sparse rows
+    layout where the links of source s are start[s] to start[s + 1], and their counts per source.
+    """
+    starts = start[sources]
+    counts = start[sources + 1] - starts
+    ends = np.cumsum(counts)
+    total = ends[-1] if len(ends) else 0
+    return np.arange(total) + np.repeat(starts - (ends - counts), counts), counts
+
+
+class VectorizedIZNN(object):
+    """
+    A spiking network taking the same arguments as :py:class:`IZNN`, with the
+    neurons' current state and parameters copied into arrays.  If event_driven is
+    true, input currents are updated incrementally from spikes (see above); they
+    then match the dense computation up to floating-point rounding, and exactly
+    after each resynchronization (every sync_interval steps).  Propagation
+    delays are given and applied as for IZNN.  The parameters, weights and state
+    are stored with the given precision.
+    """
+    def __init__(self, neurons, inputs, outputs, event_driven=False, delays=None, precision='float64',
+                 sync_interval=1000):
+        check_numpy()
+        self.neurons = neurons
+        self.inputs = inputs
+        self.outputs = outputs
+        self.event_driven = event_driven
+        self.sync_interval = sync_interval
+        self.delays = delays if delays is not None else {}
+        self.precision = precision
+        self.dtype = dtype = precision_dtype(precision)
+
+        # Source values are laid out as the neurons' fired flags, then the network
+        # inputs, then a constant 1.0 used to add each neuron's bias.
+        self.neuron_keys = list(neurons)
+        self.neuron_index = dict((key, n) for n, key in enumerate(self.neuron_keys))
+        num_neurons = len(self.neuron_keys)
+        input_index = dict((key, num_neurons + n) for n, key in enumerate(inputs))
+        one = num_neurons + len(inputs)
+
+        ns = [neurons[key] for key in self.neuron_keys]
+        self.a = np.array([n.a for n in ns], dtype=dtype)
+        self.b = np.array([n.b for n in ns], dtype=dtype)
+        self.c = np.array([n.c for n in ns], dtype=dtype)
+        self.d = np.array([n.d for n in ns], dtype=dtype)
+        self.bias = np.array([n.bias for n in ns], dtype=dtype)
+        self.v = np.array([n.v for n in ns], dtype=dtype)
+        self.u = np.array([n.u for n in ns], dtype=dtype)
+        self.current = np.array([n.current for n in ns], dtype=dtype)
+
+        # Each neuron's bias comes first, followed by its links in order, so that the
+        # current is summed exactly as in IZNN.advance.
+        edge_dst = []
+        edge_src = []
+        edge_weights = []
+        edge_delays = []
+        for row, (key, n) in enumerate(zip(self.neuron_keys, ns)):
+            edge_dst.append(row)
+            edge_src.append(one)
+            edge_weights.append(n.bias)
+            edge_delays.append(0.0)
+            for i, w in n.inputs:
+                edge_dst.append(row)
+                if i in self.neuron_index:
+                    edge_src.append(self.neuron_index[i])
+                    edge_delays.append(self.delays.get((i, key), 0.0))
+                else:
+                    edge_src.append(input_index[i])
+                    edge_delays.append(0.0)
+                edge_weights.append(w)
+        self.edge_dst = np.array(edge_dst, dtype=np.intp)
+        self.edge_src = np.array(edge_src, dtype=np.intp)
+        self.edge_weights = np.array(edge_weights, dtype=dtype)
+        self.edge_delays = edge_delays
+
+        self.values = np.zeros(one + 1, dtype=dtype)
+        self.values[one] = 1.0
+        self.fired = self.values[:num_neurons]
+        self.fired[:] = [n.fired for n in ns]
+        self.input_values = self.values[num_neurons:one]
+        self.output_index = np.array([self.neuron_index[k] for k in outputs], dtype=np.intp)
+
+        self._configure_delays(self.get_time_step_msec())
+
+    def _configure_delays(self, dt_msec):
+        """
+        Splits the links into undelayed ones and ones delayed by a whole number of time steps
+        of dt_msec, and sets up the ring of pending input currents (see IZNN._configure_delays).
+        Any spikes still in transit are dropped.
+        """
+        self.delay_dt = dt_msec
+        steps = np.array([delay_steps(d, dt_msec) for d in self.edge_delays], dtype=np.intp)
+        immediate = steps == 0
+        self.dst = self.edge_dst[immediate]
+        self.src = self.edge_src[immediate]
+        self.weights = self.edge_weights[immediate]
+
+        # Delayed links grouped by source neuron (compressed sparse rows).
+        delayed = np.flatnonzero(~immediate)
+        order = delayed[np.argsort(self.edge_src[delayed], kind='stable')]
+        self.delayed_dst = self.edge_dst[order]
+        self.delayed_weights = self.edge_weights[order]
+        self.delayed_steps = steps[order]
+        self.delayed_start = np.searchsorted(self.edge_src[order], np.arange(len(self.fired) + 1))
+
+        self.pending = None
+        if len(order):
+            self.pending = np.zeros((self.delayed_steps.max() + 1, len(self.fired)), dtype=self.dtype)
+        self.step_count = 0
+
+        if self.event_driven:
+            # Outgoing undelayed links grouped by source (compressed sparse rows).
+            order = np.argsort(self.src, kind='stable')
+            self.out_dst = self.dst[order]
+            self.out_weights = self.weights[order]
+            self.out_start = np.searchsorted(self.src[order], np.arange(len(self.values) + 1))
+            self._synchronize()
+
+    def _synchronize(self):
+        """Recomputes the accumulated currents from the current source values."""
+        self.accumulated = np.bincount(self.dst, weights=self.values[self.src] * self.weights,
+                                       minlength=len(self.current))
+        self.applied = self.values.copy()
+        self.steps_since_sync = 0
+
+    def _propagate(self):
+        """Adds the effect of every source value that changed since the last step to the currents."""
+        changed = np.flatnonzero(self.values != self.applied)
+        if not len(changed):
+            return
+
+        delta = self.values[changed] - self.applied[changed]
+        self.applied[changed] = self.values[changed]
+        links, counts = _outgoing_links(self.out_start, changed)
+        if len(links):
+            np.add.at(self.accumulated, self.out_dst[links], np.repeat(delta, counts) * self.out_weights[links])
+
+    def _deliver(self):
+        """Queues the last step's spikes on the delayed links, and adds the currents now due."""
+        size = len(self.pending)
+        slot = self.step_count % size
+        links, counts = _outgoing_links(self.delayed_start, np.flatnonzero(self.fired))
+        if len(links):
+            np.add.at(self.pending, ((slot + self.delayed_steps[links]) % size, self.delayed_dst[links]),
+                      self.delayed_weights[links])
+        arrivals = self.pending[slot]
+        self.current += arrivals
+        arrivals.fill(0.0)
+        self.step_count += 1
+
+    def set_inputs(self, inputs):
+        """Assign input voltages."""
+        if len(inputs) != len(self.inputs):
+            raise RuntimeError(
+                "Number of inputs {0:d} does not match number of input nodes {1:d}".format(
+                    len(inputs), len(self.inputs)))
+        self.input_values[:] = inputs
+
+    def reset(self):
+        """Reset all neurons to their default state."""
+        self.v[:] = self.c
+        self.u[:] = self.b * self.v
+        self.fired.fill(0.0)
+        self.current[:] = self.bias
+        self._configure_delays(self.delay_dt)
+
+    def get_time_step_msec(self):
+        # pylint: disable=no-self-use
+        return 0.05
+
+    def _step(self, dt_msec):
+        if dt_msec != self.delay_dt:
+            self._configure_delays(dt_msec)
+
+        if self.event_driven:
+            if self.steps_since_sync >= self.sync_interval:
+                self._synchronize()
+            else:
+                self._propagate()
+            self.steps_since_sync += 1
+            self.current[:] = self.accumulated
+        else:
+            self.current[:] = np.bincount(self.dst, weights=self.values[self.src] * self.weights,
+                                          minlength=len(self.current))
+        if self.pending is not None:
+            self._deliver()
+
+        v = self.v
+        u = self.u
+        with np.errstate(over='ignore', invalid='ignore'):
+            v += 0.5 * dt_msec * (0.04 * v ** 2 + 5 * v + 140 - u + self.current)
+            v += 0.5 * dt_msec * (0.04 * v ** 2 + 5 * v + 140 - u + self.current)
+            u += dt_msec * self.a * (self.b * v - u)
+
+        # Neurons whose state overflowed are reset without producing a spike.
+        overflow = ~(np.isfinite(v) & np.isfinite(u))
+        if overflow.any():
+            v[overflow] = self.c[overflow]
+            u[overflow] = self.b[overflow] * v[overflow]
+
+        # Output spikes and reset.
+        fired = v > 30.0
+        self.fired[:] = fired
+        v[fired] = self.c[fired]
+        u[fired] += self.d[fired]
+
+    def advance(self, dt_msec):
+        self._step(dt_msec)
+        return self.fired[self.output_index].tolist()
+
+    def advance_many(self, n_steps, inputs, dt_msec=None, outputs=None, spikes=None, state=None):
+        """
+        Advances the network by n_steps time steps, recording into NumPy buffers without
+        returning to the caller between steps; see IZNN.advance_many for the arguments.
+        Neurons are in the order of self.neuron_keys.
+        """
+        if dt_msec is None:
+            dt_msec = self.get_time_step_msec()
+
+        schedule = input_schedule(inputs, n_steps, len(self.inputs), self.dtype)
+        outputs = trace_buffer(outputs, (n_steps, len(self.outputs)), self.dtype)
+        if spikes is not None:
+            spikes = trace_buffer(spikes, (n_steps, len(self.neuron_keys)), self.dtype)
+        if state is not None:
+            state = trace_buffer(state, (n_steps, 2, len(self.neuron_keys)), self.dtype)
+
+        for t in range(n_steps):
+            self.input_values[:] = schedule[t]
+            self._step(dt_msec)
+            outputs[t] = self.fired[self.output_index]
+            if spikes is not None:
+                spikes[t] = self.fired
+            if state is not None:
+                state[t, 0] = self.v
+                state[t, 1] = self.u
+
+        return outputs
+
+    @staticmethod
+    def create(genome, config, event_driven=False, precision='float64', sync_interval=1000):
+        """ Receives a genome and returns its phenotype (a VectorizedIZNN). """
+        net = IZNN.create(genome, config)
+        return VectorizedIZNN(net.neurons, net.inputs, net.outputs, event_driven, net.delays, precision,
+                              sync_interval)
@@ -1,2 +1,5 @@
 from neat.nn.feed_forward import FeedForwardNetwork
 from neat.nn.recurrent import RecurrentNetwork
+from neat.nn.vectorized import VectorizedFeedForwardNetwork, VectorizedRecurrentNetwork
+from neat.nn.lockstep import PopulationFeedForwardNetwork
+from neat.nn.compiled import CompiledFeedForwardNetwork, CompiledRecurrentNetwork
@@ -0,0 +1,193 @@
+"""
+Compiles network phenotypes into straight-line Python functions.
+
+The generated source has every weight, bias and response inlined as a literal,
+the built-in sum, product, max, min and mean aggregations unrolled into plain
+expressions, and each activation called directly, so evaluating the network does
+no dictionary lookups and allocates no per-node lists.  Compiled functions are
+cached by their source, so identical phenotypes (such as elites carried over to
+the next generation) are only compiled once; when the cache is full, the least
+recently used function is dropped.
+"""
+import math
+from collections import OrderedDict
+
+from neat.aggregations import (sum_aggregation, product_aggregation, max_aggregation,
+                               min_aggregation, maxabs_aggregation, mean_aggregation)
+from neat.nn.feed_forward import FeedForwardNetwork
+from neat.nn.recurrent import RecurrentNetwork
+
+# Maximum number of compiled functions kept in the cache.
+MAX_CACHED_FUNCTIONS = 10000
+
+_function_cache = OrderedDict()
+
+
+def _literal(value):
+    """
+    Returns the source of a float constant; non-finite values, whose repr is not a valid
+    expression, are written as float('nan'), float('inf') or float('-inf').
+    """
+    if math.isnan(value) or math.isinf(value):
+        return "float({0!r})".format(repr(float(value)))
+    return repr(value)
+
+
+class _SourceBuilder(object):
+    """Collects the lines of a generated function and the objects it refers to by name."""
+    def __init__(self):
+        self.lines = []
+        self.names = {}
+        self.namespace = {}
+
+    def name_for(self, obj, prefix):
+        name = self.names.get(id(obj))
+        if name is None:
+            name = "{0}{1}".format(prefix, len(self.names))
+            self.names[id(obj)] = name
+            self.namespace[name] = obj
+        return name
+
+    def aggregate(self, agg_func, terms):
+        if not terms:
+            return "{0}([])".format(self.name_for(agg_func, 'agg'))
+        if agg_func is sum_aggregation:
+            return " + ".join(terms)
+        if agg_func is product_aggregation:
+            return " * ".join("({0})".format(t) for t in terms)
+        if agg_func is mean_aggregation:
+            return "({0}) / {1:d}.0".format(" + ".join(terms), len(terms))
+        if len(terms) == 1 and agg_func in (max_aggregation, min_aggregation, maxabs_aggregation):
+            return terms[0]
+        if agg_func is max_aggregation:
+            return "max({0})".format(", ".join(terms))
+        if agg_func is min_aggregation:
+            return "min({0})".format(", ".join(terms))
+        return "{0}([{1}])".format(self.name_for(agg_func, 'agg'), ", ".join(terms))
+
+    def node_expression(self, act_func, agg_func, bias, response, terms):
+        return "{0}({1} + {2} * ({3}))".format(self.name_for(act_func, 'act'), _literal(bias),
+                                              _literal(response), self.aggregate(agg_func, terms))
+
+    def compile(self, name):
+        source = "\n".join(self.lines) + "\n"
+        key = (source, tuple(sorted(self.namespace.items(), key=lambda x: x[0])))
+        func = _function_cache.pop(key, None)
+        if func is None:
+            namespace = dict(self.namespace)
+            exec(compile(source, "<neat.nn.compiled>", "exec"), namespace)
+            func = namespace[name]
+            while _function_cache and len(_function_cache) >= MAX_CACHED_FUNCTIONS:
+                _function_cache.popitem(last=False)
+        # (Re)insert the function to mark it as the most recently used.
+        _function_cache[key] = func
+        return source, func
+
+
+def feed_forward_source(inputs, outputs, node_evals):
+    """
+    Generates the source of ``activate(inputs)`` for a feed-forward network, taking the
+    same arguments as FeedForwardNetwork. Returns (source, function).
+    """
+    builder = _SourceBuilder()
+    names = {}
+    for n, key in enumerate(inputs):
+        names[key] = "i{0:d}".format(n)
+
+    builder.lines.append("def activate(inputs):")
+    if inputs:
+        builder.lines.append("    {0}, = inputs".format(", ".join(names[k] for k in inputs)))
+    for n, (node, act_func, agg_func, bias, response, links) in enumerate(node_evals):
+        terms = ["{0} * {1}".format(names.get(i, "0.0"), _literal(w)) for i, w in links]
+        names[node] = "n{0:d}".format(n)
+        builder.lines.append("    {0} = {1}".format(
+            names[node], builder.node_expression(act_func, agg_func, bias, response, terms)))
+    builder.lines.append("    return [{0}]".format(", ".join(names.get(k, "0.0") for k in outputs)))
+
+    return builder.compile('activate')
+
+
+def recurrent_source(inputs, outputs, node_evals):
+    """
+    Generates the source of ``activate(inputs, state)`` for a recurrent network, taking
+    the same arguments as RecurrentNetwork. The state is the tuple of node values from
+    the previous step (in node_evals order), and the function returns the outputs and
+    the new state. Returns (source, function).
+    """
+    builder = _SourceBuilder()
+    names = {}
+    for n, key in enumerate(inputs):
+        names[key] = "i{0:d}".format(n)
+    previous = dict(names)
+    for n, ne in enumerate(node_evals):
+        previous[ne[0]] = "p{0:d}".format(n)
+        names[ne[0]] = "n{0:d}".format(n)
+
+    builder.lines.append("def activate(inputs, state):")
+    if inputs:
+        builder.lines.append("    {0}, = inputs".format(", ".join(names[k] for k in inputs)))
+    if node_evals:
+        builder.lines.append("    {0}, = state".format(", ".join(previous[ne[0]] for ne in node_evals)))
+    for node, act_func, agg_func, bias, response, links in node_evals:
+        terms = ["{0} * {1}".format(previous.get(i, "0.0"), _literal(w)) for i, w in links]
+        builder.lines.append("    {0} = {1}".format(
+            names[node], builder.node_expression(act_func, agg_func, bias, response, terms)))
+    state = "".join("{0}, ".format(names[ne[0]]) for ne in node_evals)
+    builder.lines.append("    return [{0}], ({1})".format(
+        ", ".join(names.get(k, "0.0") for k in outputs), state))
+
+    return builder.compile('activate')
+
+
+class CompiledFeedForwardNetwork(object):
+    """A feed-forward network evaluated by a generated straight-line Python function."""
+    def __init__(self, inputs, outputs, node_evals):
+        self.input_nodes = inputs
+        self.output_nodes = outputs
+        self.node_evals = node_evals
+        self.source, self.function = feed_forward_source(inputs, outputs, node_evals)
+
+    def activate(self, inputs):
+        if len(self.input_nodes) != len(inputs):
+            raise RuntimeError("Expected {0:n} inputs, got {1:n}".format(len(self.input_nodes), len(inputs)))
+
+        return self.function(inputs)
+
+    def activate_batch(self, inputs):
+        """
+        Feeds each row of inputs into the network in turn and returns a list of the output
+        lists (FeedForwardNetwork.activate_batch returns a NumPy array if it can).
+        """
+        return [self.activate(row) for row in inputs]
+
+    @staticmethod
+    def create(genome, config):
+        """ Receives a genome and returns its phenotype (a CompiledFeedForwardNetwork). """
+        net = FeedForwardNetwork.create(genome, config)
+        return CompiledFeedForwardNetwork(net.input_nodes, net.output_nodes, net.node_evals)
+
+
+class CompiledRecurrentNetwork(object):
+    """A recurrent network evaluated by a generated straight-line Python function."""
+    def __init__(self, inputs, outputs, node_evals):
+        self.input_nodes = inputs
+        self.output_nodes = outputs
+        self.node_evals = node_evals
+        self.source, self.function = recurrent_source(inputs, outputs, node_evals)
+        self.state = (0.0,) * len(node_evals)
+
+    def reset(self):
+        self.state = (0.0,) * len(self.node_evals)
+
+    def activate(self, inputs):
+        if len(self.input_nodes) != len(inputs):
+            raise RuntimeError("Expected {0:n} inputs, got {1:n}".format(len(self.input_nodes), len(inputs)))
+
+        outputs, self.state = self.function(inputs, self.state)
+        return outputs
+
+    @staticmethod
+    def create(genome, config):
+        """ Receives a genome and returns its phenotype (a CompiledRecurrentNetwork). """
+        net = RecurrentNetwork.create(genome, config)
+        return CompiledRecurrentNetwork(net.input_nodes, net.output_nodes, net.node_evals)
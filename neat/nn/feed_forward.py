@@ -1,51 +1,199 @@
-from neat.graphs import feed_forward_layers
+try:
+    from collections.abc import MutableMapping
+except ImportError: # pragma: no cover
+    from collections import MutableMapping
+
+from neat.aggregations import sum_aggregation, product_aggregation, max_aggregation, min_aggregation
+from neat.graphs import feed_forward_layers, feed_forward_sequence
+from neat.numpy_util import HAVE_NUMPY
 from neat.six_util import itervalues
 
 
+# Aggregations evaluated by an accumulation loop over the node's inputs, rather than by
+# calling the aggregation function on a list of them.
+_SUM, _PRODUCT, _MAX, _MIN, _OTHER = range(5)
+_FUSED_AGGREGATIONS = {sum_aggregation: _SUM, sum: _SUM,
+                       product_aggregation: _PRODUCT,
+                       max_aggregation: _MAX, max: _MAX,
+                       min_aggregation: _MIN, min: _MIN}
+
+
+def _value_slots(inputs, outputs, node_evals):
+    """Returns the node keys of a network's values, in slot order, and a map from key to slot."""
+    keys = []
+    index = {}
+    for key in inputs + outputs + [ne[0] for ne in node_evals] + [i for ne in node_evals for i, w in ne[5]]:
+        if key not in index:
+            index[key] = len(keys)
+            keys.append(key)
+    return keys, index
+
+
+class NodeValues(MutableMapping):
+    """
+    The values of a network's nodes keyed by node key, as a view of the list of values
+    the network is evaluated in.  Values can be changed, but nodes cannot be added or
+    removed.
+    """
+    def __init__(self, keys, index, slots):
+        self._keys = keys
+        self._index = index
+        self._slots = slots
+
+    def __getitem__(self, key):
+        return self._slots[self._index[key]]
+
+    def __setitem__(self, key, value):
+        self._slots[self._index[key]] = value
+
+    def __delitem__(self, key):
+        raise RuntimeError("Cannot remove node {!r} from the network's values".format(key))
+
+    def __iter__(self):
+        return iter(self._keys)
+
+    def __len__(self):
+        return len(self._keys)
+
+    def __repr__(self):
+        return repr(dict(self))
+
+
+def _node_plan(node_evals, index):
+    """
+    Returns node_evals with node keys replaced by value slots and each node's
+    aggregation classified as one of the fused kinds (or _OTHER).
+    """
+    plan = []
+    for node, act_func, agg_func, bias, response, links in node_evals:
+        kind = _FUSED_AGGREGATIONS.get(agg_func, _OTHER)
+        if not links and kind in (_MAX, _MIN):
+            kind = _OTHER
+        plan.append((index[node], kind, act_func, agg_func, bias, response,
+                     tuple((index[i], w) for i, w in links)))
+    return plan
+
+
+def _evaluate(plan, ivalues, ovalues):
+    """
+    Evaluates each node of the plan from the values in ivalues, storing the results in
+    ovalues (which may be the same list).  The fused loops give the same results as the
+    aggregation functions, including the order in which terms are accumulated.
+    """
+    for node, kind, act_func, agg_func, bias, response, links in plan:
+        if kind == _SUM:
+            s = 0.0
+            for i, w in links:
+                s += ivalues[i] * w
+        elif kind == _PRODUCT:
+            s = 1.0
+            for i, w in links:
+                s *= ivalues[i] * w
+        elif kind == _MAX:
+            s = ivalues[links[0][0]] * links[0][1]
+            for i, w in links:
+                x = ivalues[i] * w
+                if x > s:
+                    s = x
+        elif kind == _MIN:
+            s = ivalues[links[0][0]] * links[0][1]
+            for i, w in links:
+                x = ivalues[i] * w
+                if x < s:
+                    s = x
+        else:
+            s = agg_func([ivalues[i] * w for i, w in links])
+        ovalues[node] = act_func(bias + response * s)
+
+
 class FeedForwardNetwork(object):
     def __init__(self, inputs, outputs, node_evals):
         self.input_nodes = inputs
         self.output_nodes = outputs
         self.node_evals = node_evals
-        self.values = dict((key, 0.0) for key in inputs + outputs)
+
+        # Node values are kept in a list, and node_evals is resolved to list indices.
+        # self.values gives access to the list by node key.
+        keys, index = _value_slots(inputs, outputs, node_evals)
+        self.slots = [0.0] * len(keys)
+        self.values = NodeValues(keys, index, self.slots)
+        self.input_slots = [index[k] for k in inputs]
+        self.output_slots = [index[k] for k in outputs]
+        self.plan = _node_plan(node_evals, index)
+
+        # The VectorizedFeedForwardNetwork that activate_batch delegates to, built on first use.
+        self.batch_network = None
 
     def activate(self, inputs):
         if len(self.input_nodes) != len(inputs):
             raise RuntimeError("Expected {0:n} inputs, got {1:n}".format(len(self.input_nodes), len(inputs)))
 
-        for k, v in zip(self.input_nodes, inputs):
-            self.values[k] = v
+        slots = self.slots
+        for k, v in zip(self.input_slots, inputs):
+            slots[k] = v
 
-        for node, act_func, agg_func, bias, response, links in self.node_evals:
-            node_inputs = []
-            for i, w in links:
-                node_inputs.append(self.values[i] * w)
-            s = agg_func(node_inputs)
-            self.values[node] = act_func(bias + response * s)
+        _evaluate(self.plan, slots, slots)
+
+        return [slots[i] for i in self.output_slots]
+
+    def activate_batch(self, inputs):
+        """
+        Evaluates the network on every row of inputs.  If NumPy is available, this is done
+        by a VectorizedFeedForwardNetwork of the same nodes, which computes all rows at once
+        and returns an (n_samples, n_outputs) array; otherwise each row is fed into the
+        network in turn and a list of the output lists is returned.
+        """
+        if not HAVE_NUMPY: # pragma: no cover
+            return [self.activate(row) for row in inputs]
 
-        return [self.values[i] for i in self.output_nodes]
+        if self.batch_network is None:
+            from neat.nn.vectorized import VectorizedFeedForwardNetwork
+            self.batch_network = VectorizedFeedForwardNetwork(self.input_nodes, self.output_nodes,
+                                                              self.node_evals)
+        return self.batch_network.activate_batch(inputs)
 
     @staticmethod
-    def create(genome, config):
-        """ Receives a genome and returns its phenotype (a FeedForwardNetwork). """
+    def create(genome, config, backend='python'):
+        """
+        Receives a genome and returns its phenotype (a FeedForwardNetwork).
+        If backend is 'numpy', a layer-matrix VectorizedFeedForwardNetwork is returned instead,
+        and if it is 'compiled', a CompiledFeedForwardNetwork.
+        """
+        if backend == 'numpy':
+            from neat.nn.vectorized import VectorizedFeedForwardNetwork
+            return VectorizedFeedForwardNetwork.create(genome, config)
+        elif backend == 'compiled':
+            from neat.nn.compiled import CompiledFeedForwardNetwork
+            return CompiledFeedForwardNetwork.create(genome, config)
+        elif backend != 'python':
+            raise RuntimeError("Unknown feed-forward network backend {!r}".format(backend))
 
-        # Gather expressed connections.
-        connections = [cg.key for cg in itervalues(genome.connections) if cg.enabled]
+        # Gather expressed connections, grouped by output node in a single pass.
+        connections = []
+        node_inputs = {}
+        for cg in itervalues(genome.connections):
+            if not cg.enabled:
+                continue
 
-        layers = feed_forward_layers(config.genome_config.input_keys, config.genome_config.output_keys, connections)
+            connections.append(cg.key)
+            inode, onode = cg.key
+            if onode not in node_inputs:
+                node_inputs[onode] = [(inode, cg.weight)]
+            else:
+                node_inputs[onode].append((inode, cg.weight))
+
+        # Genomes that keep a topological order can be evaluated in that order directly.
+        node_order = getattr(genome, 'node_order', None)
+        if node_order is not None:
+            layers = [feed_forward_sequence(config.genome_config.input_keys, config.genome_config.output_keys,
+                                            connections, node_order.rank)]
+        else:
+            layers = feed_forward_layers(config.genome_config.input_keys, config.genome_config.output_keys,
+                                         connections)
         node_evals = []
         for layer in layers:
             for node in layer:
-                inputs = []
-                node_expr = [] # currently unused
-                for conn_key in connections:
-                    inode, onode = conn_key
-                    if onode == node:
-                        cg = genome.connections[conn_key]
-                        inputs.append((inode, cg.weight))
-                        node_expr.append("v[{}] * {:.7e}".format(inode, cg.weight))
-
-
+                inputs = node_inputs.get(node, [])
                 ng = genome.nodes[node]
                 aggregation_function = config.genome_config.aggregation_function_defs.get(ng.aggregation)
                 activation_function = config.genome_config.activation_defs.get(ng.activation)
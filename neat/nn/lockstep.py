@@ -0,0 +1,102 @@
+"""
+Evaluates the feed-forward phenotypes of a whole population in lockstep.
+
+All networks are packed into a single block-sparse structure: the node values of
+every network live in one flat array, and layer ``d`` of the combined structure
+holds layer ``d`` of every network. One call to ``activate`` then advances every
+network on its own row of inputs with a handful of array operations per layer.
+"""
+from neat.nn.feed_forward import FeedForwardNetwork
+from neat.nn.vectorized import SparseLayerEval
+from neat.numpy_util import HAVE_NUMPY, check_numpy, precision_dtype
+
+if HAVE_NUMPY:
+    import numpy as np
+
+
+class PopulationFeedForwardNetwork(object):
+    """
+    A set of feed-forward networks (all with the same numbers of inputs and outputs)
+    evaluated together; network ``n`` reads row ``n`` of the inputs passed to
+    :py:meth:`activate` and writes row ``n`` of its result.  The weights and node
+    values are stored with the given precision, and the function sets are used as by
+    :py:class:`VectorizedFeedForwardNetwork`.
+    """
+    def __init__(self, networks, precision='float64', activation_defs=None, aggregation_defs=None):
+        check_numpy()
+        self.networks = networks
+        self.precision = precision
+        self.dtype = precision_dtype(precision)
+        num_inputs = len(networks[0].input_nodes) if networks else 0
+        num_outputs = len(networks[0].output_nodes) if networks else 0
+
+        # Assign every node of every network a slot in one flat value array, and
+        # sort the nodes into combined layers by their depth in their own network.
+        size = 0
+        layers = []
+        input_index = []
+        output_index = []
+        for net in networks:
+            if len(net.input_nodes) != num_inputs or len(net.output_nodes) != num_outputs:
+                raise RuntimeError("All networks must have the same number of inputs and outputs")
+
+            index = {}
+            for key in net.input_nodes:
+                index[key] = size + len(index)
+            for node, _, _, _, _, links in net.node_evals:
+                index[node] = size + len(index)
+            for node, _, _, _, _, links in net.node_evals:
+                for i, w in links:
+                    if i not in index:
+                        index[i] = size + len(index)
+            for key in net.output_nodes:
+                if key not in index:
+                    index[key] = size + len(index)
+            size += len(index)
+
+            depth = {}
+            for node, act_func, agg_func, bias, response, links in net.node_evals:
+                d = 1 + max([depth.get(i, 0) for i, w in links] + [0])
+                depth[node] = d
+                while len(layers) < d:
+                    layers.append([])
+                layers[d - 1].append((index[node], act_func, agg_func, bias, response,
+                                      [(index[i], w) for i, w in links]))
+
+            input_index.append([index[k] for k in net.input_nodes])
+            output_index.append([index[k] for k in net.output_nodes])
+
+        self.layers = [SparseLayerEval(layer, self.dtype, activation_defs, aggregation_defs)
+                       for layer in layers]
+        self.input_index = np.array(input_index, dtype=np.intp).reshape(len(networks), num_inputs)
+        self.output_index = np.array(output_index, dtype=np.intp).reshape(len(networks), num_outputs)
+        self.values = np.zeros(size, dtype=self.dtype)
+
+    def activate(self, inputs):
+        """
+        Advances every network on its own row of an (n_networks, n_inputs) array
+        and returns the (n_networks, n_outputs) array of outputs.
+        """
+        inputs = np.asarray(inputs, dtype=self.dtype)
+        if inputs.shape != self.input_index.shape:
+            raise RuntimeError("Expected an array of shape {0!r}, got {1!r}".format(
+                self.input_index.shape, inputs.shape))
+
+        values = self.values
+        values[self.input_index] = inputs
+        for layer in self.layers:
+            layer.evaluate(values)
+
+        return values[self.output_index]
+
+    @staticmethod
+    def create(genomes, config, precision='float64'):
+        """
+        Receives a list of (genome id, genome) pairs, as passed to the fitness function,
+        and returns a PopulationFeedForwardNetwork whose rows follow the same order.
+        """
+        genome_config = config.genome_config
+        return PopulationFeedForwardNetwork([FeedForwardNetwork.create(genome, config)
+                                             for ignored_genome_id, genome in genomes],
+                                            precision, genome_config.activation_defs,
+                                            genome_config.aggregation_defs)
@@ -0,0 +1,115 @@
+"""
+Simplifies feed-forward phenotypes before they are evaluated.
+
+Evolved genomes accumulate structure that does not change what the network computes,
+or hardly does: identity nodes, single-input relays, zero or near-zero weights, nodes
+whose value does not depend on the inputs at all.  optimize_network rewrites the
+node_evals of a feed-forward network (in any of its backends) to remove it:
+
+* connections whose weight is at most epsilon in magnitude are dropped;
+* nodes left without inputs are folded into constants, which are added to the bias
+  of the nodes they feed;
+* hidden identity nodes are fused into the nodes they feed, when that does not add
+  connections (the node has a single input or a single consumer);
+* parallel connections from the same node, as fusion can create, are merged;
+* nodes that no output depends on any more are removed.
+
+Only nodes using sum aggregation are rewritten, since dropping, merging or folding
+terms would change the value of the other aggregations.  With epsilon = 0 (the
+default) the optimized network computes the same function as the original, up to
+floating-point rounding; a larger epsilon trades accuracy for size.
+"""
+from neat.activations import identity_activation
+from neat.aggregations import sum_aggregation
+
+_SUM_AGGREGATIONS = (sum_aggregation, sum)
+
+
+def optimize_node_evals(inputs, outputs, node_evals, epsilon=0.0):
+    """
+    Optimizes the node_evals of a feed-forward network as described in the module
+    docstring.  Returns the new node_evals and a dict counting what was done:
+    'nodes_removed' and 'edges_removed' (net of the edges fusion adds), and
+    'edges_dropped', 'edges_merged', 'nodes_folded' and 'nodes_fused'.
+    """
+    output_set = set(outputs)
+
+    # Which nodes read each node's value, and whether they all sum their inputs.
+    consumers = {}
+    sum_only = {}
+    for node, act_func, agg_func, bias, response, links in node_evals:
+        is_sum = agg_func in _SUM_AGGREGATIONS
+        for i, w in links:
+            consumers[i] = consumers.get(i, 0) + 1
+            sum_only[i] = sum_only.get(i, True) and is_sum
+
+    stats = {'edges_dropped': 0, 'edges_merged': 0, 'nodes_folded': 0, 'nodes_fused': 0}
+    constants = {}
+    fused = {}
+    new_evals = []
+    for node, act_func, agg_func, bias, response, links in node_evals:
+        if agg_func in _SUM_AGGREGATIONS:
+            weights = {}
+            order = []
+            for i, w in links:
+                if abs(w) <= epsilon:
+                    stats['edges_dropped'] += 1
+                elif i in constants:
+                    bias += response * w * constants[i]
+                elif i in fused:
+                    # The fused node's value is fused_bias + fused_response * sum(its links).
+                    fused_bias, fused_response, fused_links = fused[i]
+                    bias += response * w * fused_bias
+                    for j, wj in fused_links:
+                        order.append(j)
+                        weights.setdefault(j, []).append(w * fused_response * wj)
+                else:
+                    order.append(i)
+                    weights.setdefault(i, []).append(w)
+
+            links = []
+            for i in order:
+                ws = weights.pop(i, None)
+                if ws is not None:
+                    stats['edges_merged'] += len(ws) - 1
+                    links.append((i, sum(ws)))
+
+            is_hidden = node not in output_set
+            if not links:
+                constants[node] = act_func(bias)
+                stats['nodes_folded'] += 1
+                if is_hidden and sum_only.get(node, True):
+                    continue
+            elif (is_hidden and act_func is identity_activation and sum_only.get(node, True) and
+                  (len(links) == 1 or consumers.get(node, 0) == 1)):
+                fused[node] = (bias, response, links)
+                stats['nodes_fused'] += 1
+                continue
+
+        new_evals.append((node, act_func, agg_func, bias, response, links))
+
+    # Drop the nodes that no output depends on any more.
+    required = set(outputs)
+    pruned = []
+    for ne in reversed(new_evals):
+        if ne[0] in required:
+            pruned.append(ne)
+            required.update(i for i, w in ne[5])
+    pruned.reverse()
+
+    stats['nodes_removed'] = len(node_evals) - len(pruned)
+    stats['edges_removed'] = sum(len(ne[5]) for ne in node_evals) - sum(len(ne[5]) for ne in pruned)
+    return pruned, stats
+
+
+def optimize_network(net, epsilon=0.0):
+    """
+    Returns an optimized copy of a feed-forward network (a FeedForwardNetwork,
+    CompiledFeedForwardNetwork or VectorizedFeedForwardNetwork, or any class built from
+    inputs, outputs and node_evals) and the dict of counts from optimize_node_evals.
+    The precision of a VectorizedFeedForwardNetwork is kept.
+    """
+    node_evals, stats = optimize_node_evals(net.input_nodes, net.output_nodes, net.node_evals, epsilon)
+    if hasattr(net, 'precision'):
+        return type(net)(net.input_nodes, net.output_nodes, node_evals, net.precision), stats
+    return type(net)(net.input_nodes, net.output_nodes, node_evals), stats
@@ -1,4 +1,5 @@
 from neat.graphs import required_for_output
+from neat.nn.feed_forward import NodeValues, _evaluate, _node_plan, _value_slots
 from neat.six_util import itervalues, iteritems
 
 
@@ -8,43 +9,54 @@ class RecurrentNetwork(object):
         self.output_nodes = outputs
         self.node_evals = node_evals
 
-        self.values = [{}, {}]
-        for v in self.values:
-            for k in inputs + outputs:
-                v[k] = 0.0
-
-            for node, ignored_activation, ignored_aggregation, ignored_bias, ignored_response, links in self.node_evals:
-                v[node] = 0.0
-                for i, w in links:
-                    v[i] = 0.0
+        # Node values are kept in two lists (the previous and the current step), and
+        # node_evals is resolved to list indices.  self.values gives access to the lists
+        # by node key.
+        keys, index = _value_slots(inputs, outputs, node_evals)
+        self.slots = [[0.0] * len(keys), [0.0] * len(keys)]
+        self.values = [NodeValues(keys, index, v) for v in self.slots]
+        self.input_slots = [index[k] for k in inputs]
+        self.output_slots = [index[k] for k in outputs]
+        self.plan = _node_plan(node_evals, index)
         self.active = 0
 
     def reset(self):
-        self.values = [dict((k, 0.0) for k in v) for v in self.values]
+        for v in self.slots:
+            v[:] = [0.0] * len(v)
         self.active = 0
 
     def activate(self, inputs):
         if len(self.input_nodes) != len(inputs):
             raise RuntimeError("Expected {0:n} inputs, got {1:n}".format(len(self.input_nodes), len(inputs)))
 
-        ivalues = self.values[self.active]
-        ovalues = self.values[1 - self.active]
+        ivalues = self.slots[self.active]
+        ovalues = self.slots[1 - self.active]
         self.active = 1 - self.active
 
-        for i, v in zip(self.input_nodes, inputs):
+        for i, v in zip(self.input_slots, inputs):
             ivalues[i] = v
             ovalues[i] = v
 
-        for node, activation, aggregation, bias, response, links in self.node_evals:
-            node_inputs = [ivalues[i] * w for i, w in links]
-            s = aggregation(node_inputs)
-            ovalues[node] = activation(bias + response * s)
+        _evaluate(self.plan, ivalues, ovalues)
 
-        return [ovalues[i] for i in self.output_nodes]
+        return [ovalues[i] for i in self.output_slots]
 
     @staticmethod
-    def create(genome, config):
-        """ Receives a genome and returns its phenotype (a RecurrentNetwork). """
+    def create(genome, config, backend='python'):
+        """
+        Receives a genome and returns its phenotype (a RecurrentNetwork).
+        If backend is 'numpy', an array-backed VectorizedRecurrentNetwork is returned instead,
+        and if it is 'compiled', a CompiledRecurrentNetwork.
+        """
+        if backend == 'numpy':
+            from neat.nn.vectorized import VectorizedRecurrentNetwork
+            return VectorizedRecurrentNetwork.create(genome, config)
+        elif backend == 'compiled':
+            from neat.nn.compiled import CompiledRecurrentNetwork
+            return CompiledRecurrentNetwork.create(genome, config)
+        elif backend != 'python':
+            raise RuntimeError("Unknown recurrent network backend {!r}".format(backend))
+
         genome_config = config.genome_config
         required = required_for_output(genome_config.input_keys, genome_config.output_keys, genome.connections)
 
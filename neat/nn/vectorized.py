@@ -0,0 +1,364 @@
+"""
+Array-based (NumPy) implementations of the neural network phenotypes.
+
+Each layer of a feed-forward network is compiled into weight matrices, bias
+vectors and response vectors, so that evaluating a layer is a single
+matrix-vector product followed by an array-wise activation.  A recurrent network
+is evaluated the same way, treating all of its nodes as one sparse layer.
+
+The networks store their weights, biases, responses and node values in float64
+by default; with precision 'float32' or 'float16' they use half or a quarter of
+the memory.  Net inputs and activation functions are always computed in at least
+float32, so float16 only loses precision where values are stored.
+"""
+from neat.activations import get_vectorized_activation
+from neat.aggregations import get_vectorized_aggregation, sum_aggregation
+from neat.numpy_util import HAVE_NUMPY, check_numpy, precision_dtype
+from neat.six_util import iteritems
+
+if HAVE_NUMPY:
+    import numpy as np
+
+
+def _compute_dtype(dtype):
+    """Returns the dtype that net inputs and activations are computed in for values stored as dtype."""
+    return np.promote_types(dtype, np.float32)
+
+
+def vectorize_activation(function, activation_defs=None):
+    """
+    Returns the array-wise version of the given scalar activation function: the one
+    registered for it in activation_defs (an ActivationFunctionSet) or the built-in
+    one, or else np.vectorize(function).
+    """
+    f = None
+    if activation_defs is not None:
+        f = activation_defs.vectorized.get(function)
+    if f is None:
+        f = get_vectorized_activation(function)
+    if f is None:
+        f = np.vectorize(function, otypes=[float])
+    return f
+
+
+def vectorize_aggregation(function, aggregation_defs=None):
+    """
+    Returns a version of the given aggregation function that reduces an array
+    along the given axis, called as ``f(x, axis)``: the one registered for it in
+    aggregation_defs (an AggregationFunctionSet) or the built-in one, or else one
+    calling function on each row.
+    """
+    f = None
+    if aggregation_defs is not None:
+        f = aggregation_defs.vectorized.get(function)
+    if f is None:
+        f = get_vectorized_aggregation(function)
+    if f is None:
+        def f(x, axis):
+            return np.apply_along_axis(lambda v: function(list(v)), axis, x)
+    return f
+
+
+class _LayerEval(object):
+    """
+    Holds the arrays needed to evaluate one layer of a feed-forward network.
+
+    Nodes using the built-in sum aggregation are computed together as one matrix
+    product over the layer's source values; nodes using other aggregations are
+    grouped by aggregation function and number of inputs, so that each group can be
+    reduced along the last axis of a (nodes, inputs) array of weighted values.
+    The parameters are stored as dtype; the function sets, if given, supply the
+    array-wise versions of functions added to them.
+    """
+    def __init__(self, node_evals, index, dtype=float, activation_defs=None, aggregation_defs=None):
+        self.compute_dtype = _compute_dtype(dtype)
+        self.dst = np.array([index[node] for node, _, _, _, _, _ in node_evals], dtype=np.intp)
+        self.bias = np.array([bias for _, _, _, bias, _, _ in node_evals], dtype=dtype)
+        self.response = np.array([response for _, _, _, _, response, _ in node_evals], dtype=dtype)
+
+        sum_rows = []
+        sources = []
+        source_pos = {}
+        grouped = {}
+        activations = {}
+        for row, (node, act_func, agg_func, bias, response, links) in enumerate(node_evals):
+            activations.setdefault(act_func, []).append(row)
+            if agg_func is sum_aggregation:
+                sum_rows.append(row)
+                for i, w in links:
+                    if i not in source_pos:
+                        source_pos[i] = len(sources)
+                        sources.append(i)
+            else:
+                grouped.setdefault((agg_func, len(links)), []).append(row)
+
+        # Dense weight matrix for the sum-aggregated nodes, restricted to the values they read.
+        self.sum_rows = np.array(sum_rows, dtype=np.intp)
+        self.src = np.array([index[i] for i in sources], dtype=np.intp)
+        self.weights = np.zeros((len(sum_rows), len(sources)), dtype=dtype)
+        for r, row in enumerate(sum_rows):
+            for i, w in node_evals[row][5]:
+                self.weights[r, source_pos[i]] += w
+        self.weights_t = self.weights.T.copy()
+
+        # Gathered (nodes, inputs) index and weight arrays for the other aggregations.
+        self.groups = []
+        for (agg_func, n), rows in iteritems(grouped):
+            src = np.array([[index[i] for i, w in node_evals[row][5]] for row in rows],
+                           dtype=np.intp).reshape(len(rows), n)
+            weights = np.array([[w for i, w in node_evals[row][5]] for row in rows],
+                               dtype=dtype).reshape(len(rows), n)
+            self.groups.append((vectorize_aggregation(agg_func, aggregation_defs),
+                                np.array(rows, dtype=np.intp), src, weights))
+
+        self.activations = [(vectorize_activation(f, activation_defs),
+                             np.array(rows, dtype=np.intp))
+                            for f, rows in iteritems(activations)]
+        if len(self.activations) == 1:
+            # Common case - the whole layer shares a single activation function.
+            self.activations = [(self.activations[0][0], None)]
+
+    def evaluate(self, values):
+        """Computes this layer's node values; values may have leading (sample) dimensions."""
+        s = np.zeros(values.shape[:-1] + (len(self.dst),), dtype=self.compute_dtype)
+        if len(self.sum_rows):
+            sources = values[..., self.src].astype(self.compute_dtype, copy=False)
+            s[..., self.sum_rows] = sources.dot(self.weights_t)
+        for agg_func, rows, src, weights in self.groups:
+            s[..., rows] = agg_func(np.multiply(values[..., src], weights, dtype=self.compute_dtype), -1)
+
+        z = self.bias + self.response * s
+        for act_func, rows in self.activations:
+            if rows is None:
+                values[..., self.dst] = act_func(z)
+            else:
+                values[..., self.dst[rows]] = act_func(z[..., rows])
+
+
+class SparseLayerEval(object):
+    """
+    Holds a set of mutually independent nodes (given with value indices, not node
+    keys) evaluated with sparse operations.  Sum-aggregated nodes are computed from an
+    edge list (a sparse matrix-vector product); other aggregations are grouped by
+    aggregation function and number of inputs.  The parameters are stored as dtype;
+    the function sets, if given, supply the array-wise versions of functions added to them.
+    """
+    def __init__(self, node_evals, dtype=float, activation_defs=None, aggregation_defs=None):
+        self.compute_dtype = _compute_dtype(dtype)
+        self.dst = np.array([node for node, _, _, _, _, _ in node_evals], dtype=np.intp)
+        self.bias = np.array([bias for _, _, _, bias, _, _ in node_evals], dtype=dtype)
+        self.response = np.array([response for _, _, _, _, response, _ in node_evals], dtype=dtype)
+
+        edge_rows = []
+        edge_src = []
+        edge_weights = []
+        grouped = {}
+        activations = {}
+        for row, (node, act_func, agg_func, bias, response, links) in enumerate(node_evals):
+            activations.setdefault(act_func, []).append(row)
+            if agg_func is sum_aggregation:
+                for i, w in links:
+                    edge_rows.append(row)
+                    edge_src.append(i)
+                    edge_weights.append(w)
+            else:
+                grouped.setdefault((agg_func, len(links)), []).append(row)
+
+        self.edge_rows = np.array(edge_rows, dtype=np.intp)
+        self.edge_src = np.array(edge_src, dtype=np.intp)
+        self.edge_weights = np.array(edge_weights, dtype=dtype)
+
+        self.groups = []
+        for (agg_func, n), rows in iteritems(grouped):
+            src = np.array([[i for i, w in node_evals[row][5]] for row in rows],
+                           dtype=np.intp).reshape(len(rows), n)
+            weights = np.array([[w for i, w in node_evals[row][5]] for row in rows],
+                               dtype=dtype).reshape(len(rows), n)
+            self.groups.append((vectorize_aggregation(agg_func, aggregation_defs),
+                                np.array(rows, dtype=np.intp), src, weights))
+
+        self.activations = [(vectorize_activation(f, activation_defs),
+                             np.array(rows, dtype=np.intp))
+                            for f, rows in iteritems(activations)]
+
+    def net_input(self, values):
+        """Returns bias + response * (aggregated weighted inputs) for each node."""
+        if len(self.edge_rows):
+            weighted = np.multiply(values[self.edge_src], self.edge_weights, dtype=self.compute_dtype)
+            s = np.bincount(self.edge_rows, weights=weighted,
+                            minlength=len(self.dst)).astype(self.compute_dtype, copy=False)
+        else:
+            s = np.zeros(len(self.dst), dtype=self.compute_dtype)
+        for agg_func, rows, src, weights in self.groups:
+            s[rows] = agg_func(np.multiply(values[src], weights, dtype=self.compute_dtype), -1)
+
+        return self.bias + self.response * s
+
+    def evaluate(self, values, out=None):
+        """Computes the node values from values, storing them in out (by default, values itself)."""
+        if out is None:
+            out = values
+        z = self.net_input(values)
+        for act_func, rows in self.activations:
+            out[self.dst[rows]] = act_func(z[rows])
+
+
+class VectorizedFeedForwardNetwork(object):
+    """
+    A feed-forward network evaluated one layer at a time with NumPy.
+
+    Takes the same arguments as :py:class:`FeedForwardNetwork`; ``node_evals`` must
+    be in evaluation order, and is split into layers of mutually independent nodes.
+    The weights and node values are stored with the given precision.  The function
+    sets (those of the genome config) supply the array-wise versions of any functions
+    added to them; without them only the built-in functions have one.
+    """
+    def __init__(self, inputs, outputs, node_evals, precision='float64',
+                 activation_defs=None, aggregation_defs=None):
+        check_numpy()
+        self.input_nodes = inputs
+        self.output_nodes = outputs
+        self.node_evals = node_evals
+        self.precision = precision
+        self.dtype = precision_dtype(precision)
+
+        # Map node keys to contiguous value indices: inputs first, then nodes in evaluation order.
+        self.node_index = {}
+        for key in inputs:
+            self.node_index[key] = len(self.node_index)
+        for node, _, _, _, _, _ in node_evals:
+            self.node_index[node] = len(self.node_index)
+        for node, _, _, _, _, links in node_evals:
+            for i, w in links:
+                if i not in self.node_index:
+                    self.node_index[i] = len(self.node_index)
+        for key in outputs:
+            if key not in self.node_index:
+                self.node_index[key] = len(self.node_index)
+
+        # A node's layer is one past the deepest layer of the nodes it reads from.
+        depth = dict((key, 0) for key in self.node_index)
+        layers = []
+        for ne in node_evals:
+            d = 1 + max([depth[i] for i, w in ne[5]] + [0])
+            depth[ne[0]] = d
+            while len(layers) < d:
+                layers.append([])
+            layers[d - 1].append(ne)
+
+        self.layers = [_LayerEval(layer, self.node_index, self.dtype,
+                                  activation_defs, aggregation_defs)
+                       for layer in layers]
+        self.input_index = np.array([self.node_index[k] for k in inputs], dtype=np.intp)
+        self.output_index = np.array([self.node_index[k] for k in outputs], dtype=np.intp)
+        self.values = np.zeros(len(self.node_index), dtype=self.dtype)
+
+    def activate(self, inputs):
+        if len(self.input_nodes) != len(inputs):
+            raise RuntimeError("Expected {0:n} inputs, got {1:n}".format(len(self.input_nodes), len(inputs)))
+
+        values = self.values
+        values[self.input_index] = inputs
+        for layer in self.layers:
+            layer.evaluate(values)
+
+        return values[self.output_index].tolist()
+
+    def activate_batch(self, inputs):
+        """
+        Evaluates the network on every row of an (n_samples, n_inputs) array at once,
+        one layer at a time, and returns an (n_samples, n_outputs) array of outputs.
+        """
+        inputs = np.asarray(inputs, dtype=self.dtype)
+        if inputs.ndim != 2 or inputs.shape[1] != len(self.input_nodes):
+            raise RuntimeError("Expected an array of shape (n_samples, {0:n}), got {1!r}".format(
+                len(self.input_nodes), inputs.shape))
+
+        values = np.zeros((inputs.shape[0], len(self.node_index)), dtype=self.dtype)
+        values[:, self.input_index] = inputs
+        for layer in self.layers:
+            layer.evaluate(values)
+
+        return values[:, self.output_index]
+
+    @staticmethod
+    def create(genome, config, precision='float64'):
+        """ Receives a genome and returns its phenotype (a VectorizedFeedForwardNetwork). """
+        from neat.nn.feed_forward import FeedForwardNetwork
+        net = FeedForwardNetwork.create(genome, config)
+        genome_config = config.genome_config
+        return VectorizedFeedForwardNetwork(net.input_nodes, net.output_nodes, net.node_evals,
+                                            precision, genome_config.activation_defs,
+                                            genome_config.aggregation_defs)
+
+
+class VectorizedRecurrentNetwork(object):
+    """
+    A recurrent network whose state is kept in two flat arrays.
+
+    Takes the same arguments as :py:class:`RecurrentNetwork`.  Node keys are mapped to
+    contiguous indices once, and each call to :py:meth:`activate` computes every node
+    from the previous step's values with one sparse matrix-vector product, then swaps
+    the two buffers.  The weights and node values are stored with the given precision,
+    and the function sets are used as by :py:class:`VectorizedFeedForwardNetwork`.
+    """
+    def __init__(self, inputs, outputs, node_evals, precision='float64',
+                 activation_defs=None, aggregation_defs=None):
+        check_numpy()
+        self.input_nodes = inputs
+        self.output_nodes = outputs
+        self.node_evals = node_evals
+        self.precision = precision
+        self.dtype = precision_dtype(precision)
+
+        self.node_index = {}
+        for key in inputs:
+            self.node_index[key] = len(self.node_index)
+        for node, _, _, _, _, _ in node_evals:
+            self.node_index[node] = len(self.node_index)
+        for node, _, _, _, _, links in node_evals:
+            for i, w in links:
+                if i not in self.node_index:
+                    self.node_index[i] = len(self.node_index)
+        for key in outputs:
+            if key not in self.node_index:
+                self.node_index[key] = len(self.node_index)
+
+        index = self.node_index
+        self.nodes = SparseLayerEval([(index[node], act_func, agg_func, bias, response,
+                                        [(index[i], w) for i, w in links])
+                                       for node, act_func, agg_func, bias, response, links in node_evals],
+                                      self.dtype, activation_defs, aggregation_defs)
+        self.input_index = np.array([index[k] for k in inputs], dtype=np.intp)
+        self.output_index = np.array([index[k] for k in outputs], dtype=np.intp)
+        self.values = [np.zeros(len(index), dtype=self.dtype), np.zeros(len(index), dtype=self.dtype)]
+        self.active = 0
+
+    def reset(self):
+        for v in self.values:
+            v.fill(0.0)
+        self.active = 0
+
+    def activate(self, inputs):
+        if len(self.input_nodes) != len(inputs):
+            raise RuntimeError("Expected {0:n} inputs, got {1:n}".format(len(self.input_nodes), len(inputs)))
+
+        ivalues = self.values[self.active]
+        ovalues = self.values[1 - self.active]
+        self.active = 1 - self.active
+
+        ivalues[self.input_index] = inputs
+        ovalues[self.input_index] = inputs
+        self.nodes.evaluate(ivalues, ovalues)
+
+        return ovalues[self.output_index].tolist()
+
+    @staticmethod
+    def create(genome, config, precision='float64'):
+        """ Receives a genome and returns its phenotype (a VectorizedRecurrentNetwork). """
+        from neat.nn.recurrent import RecurrentNetwork
+        net = RecurrentNetwork.create(genome, config)
+        genome_config = config.genome_config
+        return VectorizedRecurrentNetwork(net.input_nodes, net.output_nodes, net.node_evals,
+                                          precision, genome_config.activation_defs,
+                                          genome_config.aggregation_defs)
@@ -0,0 +1,50 @@
+"""
+Helpers shared by the array-based (NumPy) genome, network and simulator implementations,
+which can be used whether or not NumPy is installed (check HAVE_NUMPY first).
+"""
+try:
+    import numpy as np
+except ImportError: # pragma: no cover
+    np = None
+    HAVE_NUMPY = False
+else:
+    HAVE_NUMPY = True
+
+
+PRECISIONS = ('float64', 'float32', 'float16')
+
+
+def check_numpy():
+    """Raises RuntimeError if NumPy is not installed."""
+    if not HAVE_NUMPY: # pragma: no cover
+        raise RuntimeError("NumPy is required for the array-based implementations")
+
+
+def precision_dtype(precision):
+    """Returns the NumPy dtype for the given precision (one of PRECISIONS)."""
+    if precision not in PRECISIONS:
+        raise RuntimeError("Unknown precision {0!r}; expected one of {1!r}".format(precision, PRECISIONS))
+    return np.dtype(precision)
+
+
+def input_schedule(inputs, n_steps, num_inputs, dtype=float):
+    """
+    Returns an (n_steps, num_inputs) array giving the inputs for each step, from either
+    a single row of inputs (held constant) or a full schedule.
+    """
+    inputs = np.asarray(inputs, dtype=dtype)
+    if inputs.ndim == 1:
+        inputs = np.broadcast_to(inputs, (n_steps,) + inputs.shape)
+    if inputs.shape != (n_steps, num_inputs):
+        raise RuntimeError("Expected {0:n} inputs or an array of shape {1!r}, got {2!r}".format(
+            num_inputs, (n_steps, num_inputs), inputs.shape))
+    return inputs
+
+
+def trace_buffer(buffer, shape, dtype=float):
+    """Returns the caller's buffer after checking its shape, or a new array of dtype if it is None."""
+    if buffer is None:
+        return np.zeros(shape, dtype=dtype)
+    if buffer.shape != shape:
+        raise RuntimeError("Expected a buffer of shape {0!r}, got {1!r}".format(shape, buffer.shape))
+    return buffer
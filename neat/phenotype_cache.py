@@ -0,0 +1,168 @@
+"""
+Caches the phenotypes (networks) built from genomes, so that genomes passed unchanged
+into the next generation (elites) and, with a fingerprint function, identical
+offspring are not rebuilt.
+
+A cache only saves time when a good part of the phenotypes it is asked for are
+repeats: every miss costs more than building the phenotype directly.  In
+benchmarks/phenotype_cache.py (a short run with 150 genomes per generation, of which
+about 1% are repeats) building FeedForwardNetworks took 150-180 ms without a cache,
+175-270 ms keyed by genome identity (the default; the extra time comes mostly from
+keeping up to max_entries phenotypes and genomes alive), about 1000 ms keyed by
+genome_fingerprint and about 500 ms by genome_hashes, since computing those keys
+costs more than building a small network.  So a cache is for expensive phenotypes or
+populations with many repeated genomes, not a default.
+"""
+import hashlib
+import sys
+import types
+from collections import OrderedDict
+
+from neat.six_util import iteritems
+
+
+def genome_fingerprint(genome):
+    """
+    Returns a canonical hash (a hex string) of the parts of a genome that determine its
+    phenotype: the attributes of every node gene and of every enabled connection gene.
+    The hash does not depend on the order in which genes were added, and is the same in
+    every process, so it can be used as a key by worker processes.
+    """
+    nodes = sorted((key, tuple(getattr(ng, a.name) for a in ng._gene_attributes))
+                   for key, ng in iteritems(genome.nodes))
+    connections = sorted((key, tuple(getattr(cg, a.name) for a in cg._gene_attributes))
+                         for key, cg in iteritems(genome.connections) if cg.enabled)
+    return hashlib.sha1(repr((nodes, connections)).encode('utf-8')).hexdigest()
+
+
+def genome_hashes(genome):
+    """
+    Returns the structure and parameter hashes of a DefaultGenome, which are cached but
+    recomputed from every gene on the first lookup after its genes change (so they are
+    cheap only for genomes that have not changed).  Unlike genome_fingerprint, they also cover
+    disabled connections, and are only correct if genes are added, removed and changed
+    through the genome's own methods.
+    """
+    return genome.structure_hash, genome.parameter_hash
+
+
+_ATOMIC_TYPES = (type, types.ModuleType, types.FunctionType, types.BuiltinFunctionType, types.MethodType)
+
+
+def estimate_size(obj, seen=None):
+    """
+    Returns an estimate, in bytes, of the memory used by an object and the containers and
+    instance attributes reachable from it (including the data of NumPy arrays it owns).
+    Functions, classes and modules are counted but not followed.
+    """
+    if seen is None:
+        seen = set()
+    if id(obj) in seen:
+        return 0
+    seen.add(id(obj))
+
+    size = sys.getsizeof(obj)
+    if isinstance(obj, _ATOMIC_TYPES):
+        return size
+
+    if isinstance(obj, dict):
+        for k, v in iteritems(obj):
+            size += estimate_size(k, seen) + estimate_size(v, seen)
+    elif isinstance(obj, (list, tuple, set, frozenset)):
+        for v in obj:
+            size += estimate_size(v, seen)
+
+    if hasattr(obj, '__dict__'):
+        size += estimate_size(obj.__dict__, seen)
+    for cls in type(obj).__mro__:
+        for name in cls.__dict__.get('__slots__', ()):
+            if name not in ('__dict__', '__weakref__') and hasattr(obj, name):
+                size += estimate_size(getattr(obj, name), seen)
+
+    return size
+
+
+class PhenotypeCache(object):
+    """
+    A least-recently-used cache of phenotypes, keyed by the network type, the genome and
+    any extra arguments to the network's create method.  Entries are evicted once there
+    are more than max_entries of them or, if max_bytes is given, once their estimated
+    total size exceeds it.
+
+    By default genomes are matched by identity, which costs almost nothing but only
+    finds genomes passed on unchanged (such as elites), and assumes that a genome is not
+    changed in place after its phenotype is cached (DefaultReproduction never does so).
+    Given a fingerprint function, such as genome_fingerprint or genome_hashes, the cache
+    also finds identical genomes and notices changes, at the cost of computing the
+    fingerprint of every genome (see the module docstring).
+
+    A cache assumes that the configuration does not change while it is in use.  Phenotypes
+    are shared between identical genomes, so one cache should not be used by several
+    threads at once; worker processes should each use their own (for instance, one created
+    at module level in the module holding the evaluation function).
+    """
+    def __init__(self, max_entries=1000, max_bytes=None, fingerprint=None):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.fingerprint = fingerprint
+        self.entries = OrderedDict()
+        self.total_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def __len__(self):
+        return len(self.entries)
+
+    def create(self, network_type, genome, config, *args, **kwargs):
+        """
+        Returns network_type.create(genome, config, *args, **kwargs), reusing the phenotype
+        of an identical genome if there is one in the cache.  A reused phenotype that has a
+        reset method is reset first, so that it starts from the same state as a new one.
+        """
+        if self.fingerprint is None:
+            # The entry keeps the genome alive, so its id is not reused while the key is in use.
+            genome_key = id(genome)
+        else:
+            genome_key = self.fingerprint(genome)
+        key = (network_type.__module__, network_type.__name__, genome_key,
+               args, tuple(sorted(iteritems(kwargs))))
+
+        entry = self.entries.pop(key, None)
+        if entry is not None:
+            # Reinsert the entry to mark it as the most recently used.
+            self.entries[key] = entry
+            self.hits += 1
+            phenotype = entry[0]
+            reset = getattr(phenotype, 'reset', None)
+            if reset is not None:
+                reset()
+            return phenotype
+
+        self.misses += 1
+        phenotype = network_type.create(genome, config, *args, **kwargs)
+        size = estimate_size(phenotype) if self.max_bytes is not None else 0
+        self.entries[key] = (phenotype, size, genome)
+        self.total_bytes += size
+        self._evict()
+        return phenotype
+
+    def _evict(self):
+        while self.entries and (len(self.entries) > self.max_entries or
+                                (self.max_bytes is not None and self.total_bytes > self.max_bytes)):
+            ignored_key, (ignored_phenotype, size, ignored_genome) = self.entries.popitem(last=False)
+            self.total_bytes -= size
+            self.evictions += 1
+
+    def clear(self):
+        """Removes all the cached phenotypes; the counters are kept."""
+        self.entries.clear()
+        self.total_bytes = 0
+
+    def get_stats(self):
+        """Returns a dict with the hit, miss and eviction counts and the current number and size of entries."""
+        return {'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'entries': len(self.entries),
+                'bytes': self.total_bytes}
@@ -0,0 +1,27 @@
+"""Pickling support shared by the classes that keep their attributes in __slots__."""
+from neat.six_util import iteritems
+
+
+class SlotsPickleMixin(object):
+    """
+    Pickles an instance as a dict of its slot values (for every class in its MRO) and
+    any __dict__, which works with every pickle protocol, and restores such a dict
+    (including the __dict__ of an instance pickled before its class had __slots__) by
+    setting each item.  Slots named in _transient_slots are not pickled; a subclass
+    that has them sets them again in __setstate__.
+    """
+    __slots__ = ()
+    _transient_slots = ()
+
+    def __getstate__(self):
+        state = dict(getattr(self, '__dict__', ()))
+        for cls in type(self).__mro__:
+            for name in cls.__dict__.get('__slots__', ()):
+                if (name not in ('__dict__', '__weakref__') and name not in self._transient_slots
+                        and hasattr(self, name)):
+                    state[name] = getattr(self, name)
+        return state
+
+    def __setstate__(self, state):
+        for name, value in iteritems(state):
+            setattr(self, name, value)
@@ -105,6 +105,10 @@ class DefaultReproduction(DefaultClassConfig):
         # TODO: I don't like this modification of the species and stagnation objects,
         # because it requires internal knowledge of the objects.
 
+        # Structural mutations made from here on are new in this generation.
+        if hasattr(config.genome_config, 'reset_innovations'):
+            config.genome_config.reset_innovations()
+
         # Filter out stagnated species, collect the set of non-stagnated
         # species members, and compute their average adjusted fitness.
         # The average adjusted fitness scheme (normalized to the interval
@@ -152,6 +156,12 @@ class DefaultReproduction(DefaultClassConfig):
         spawn_amounts = self.compute_spawn(adjusted_fitnesses, previous_sizes,
                                            pop_size, min_species_size)
 
+        # Genome types that can make many children at once (such as ArrayGenome) are
+        # given all of this generation's parent pairs together, after they are chosen.
+        create_offspring = getattr(config.genome_type, 'create_offspring', None)
+        planned_keys = []
+        planned_parents = []
+
         new_population = {}
         species.species = {}
         for spawn, s in zip(spawn_amounts, remaining_species):
@@ -194,10 +204,19 @@ class DefaultReproduction(DefaultClassConfig):
                 # Note that if the parents are not distinct, crossover will produce a
                 # genetically identical clone of the parent (but with a different ID).
                 gid = next(self.genome_indexer)
+                self.ancestors[gid] = (parent1_id, parent2_id)
+                if create_offspring is not None:
+                    planned_keys.append(gid)
+                    planned_parents.append((parent1, parent2))
+                    continue
                 child = config.genome_type(gid)
                 child.configure_crossover(parent1, parent2, config.genome_config)
                 child.mutate(config.genome_config)
                 new_population[gid] = child
-                self.ancestors[gid] = (parent1_id, parent2_id)
+
+        if planned_keys:
+            children = create_offspring(planned_keys, planned_parents, config.genome_config)
+            for gid, child in zip(planned_keys, children):
+                new_population[gid] = child
 
         return new_population
@@ -24,4 +24,3 @@ else:
 
     def itervalues(d, **kw):
         return iter(d.itervalues(**kw))
-
@@ -4,8 +4,12 @@ from itertools import count
 from neat.math_util import mean, stdev
 from neat.six_util import iteritems, iterkeys, itervalues
 from neat.config import ConfigParameter, DefaultClassConfig
+from neat.pickle_util import SlotsPickleMixin
+
+class Species(SlotsPickleMixin):
+    __slots__ = ('key', 'created', 'last_improved', 'representative', 'members', 'fitness',
+                 'adjusted_fitness', 'fitness_history')
 
-class Species(object):
     def __init__(self, key, generation):
         self.key = key
         self.created = generation
@@ -0,0 +1,43 @@
+"""Configuration and genomes shared by the tests of the network and genome types."""
+import os
+
+import neat
+
+
+def load_config(feed_forward=True, genome_type=neat.DefaultGenome,
+                config_file='test_configuration2', **genome_params):
+    """
+    Returns the configuration in config_file (in the tests directory), set up so that
+    randomly mutated genomes have every activation function, hidden nodes and
+    many added and deleted connections.  Any genome_params are then set on the
+    genome config, overriding those settings.
+    """
+    local_dir = os.path.dirname(__file__)
+    config_path = os.path.join(local_dir, config_file)
+    config = neat.Config(genome_type, neat.DefaultReproduction,
+                         neat.DefaultSpeciesSet, neat.DefaultStagnation,
+                         config_path)
+    config.genome_config.activation_options = list(config.genome_config.activation_defs.functions)
+    config.genome_config.feed_forward = feed_forward
+    config.genome_config.initial_connection = 'full_direct'
+    config.genome_config.num_hidden = 2
+    config.genome_config.conn_add_prob = 0.8
+    config.genome_config.conn_delete_prob = 0.1
+    config.genome_config.node_add_prob = 0.5
+    config.genome_config.node_delete_prob = 0.05
+    config.genome_config.single_structural_mutation = False
+    for name, value in genome_params.items():
+        setattr(config.genome_config, name, value)
+    return config
+
+
+def random_genomes(config, count, mutations=20):
+    """Returns count new genomes of the configured type, each mutated the given number of times."""
+    genomes = []
+    for key in range(count):
+        g = config.genome_type(key)
+        g.configure_new(config.genome_config)
+        for _ in range(mutations):
+            g.mutate(config.genome_config)
+        genomes.append(g)
+    return genomes
@@ -184,6 +184,60 @@ def test_bad_add2():
     else:
         raise Exception("Should have had a TypeError/derived for dud_function")
 
+def test_vectorized():
+    if not activations.HAVE_NUMPY:
+        return
+    import numpy as np
+
+    # Values around and beyond the clamping ranges of every function.
+    z = np.concatenate([np.linspace(-15.0, 15.0, 3001), [-3.4, 3.4, -12.0, 12.0, 24.0, -24.0, 0.0, 1e-8, -1e-8]])
+    s = activations.ActivationFunctionSet()
+    for name, f in s.functions.items():
+        vf = s.get_vectorized(name)
+        assert vf is not None, name
+        expected = np.array([f(float(v)) for v in z])
+        # NumPy's exp, log and tanh may differ from math's by an ulp or two.
+        assert np.allclose(vf(z), expected, rtol=1e-15, atol=1e-15), name
+
+
+def plus_one_activation(z):
+    return z + 1.0
+
+
+def plus_one_activation_array(z):
+    return z + 1.0
+
+
+def test_add_vectorized():
+    local_dir = os.path.dirname(__file__)
+    config_path = os.path.join(local_dir, 'test_configuration')
+    config = neat.Config(neat.DefaultGenome, neat.DefaultReproduction,
+                         neat.DefaultSpeciesSet, neat.DefaultStagnation,
+                         config_path)
+    config.genome_config.add_activation('plus_one', plus_one_activation, plus_one_activation_array)
+    s = config.genome_config.activation_defs
+    assert s.get_vectorized('plus_one') is plus_one_activation_array
+    # The registration belongs to this config's function set only.
+    assert activations.get_vectorized_activation(plus_one_activation) is None
+    other = activations.ActivationFunctionSet()
+    other.add('plus_one', plus_one_activation)
+    assert other.get_vectorized('plus_one') is None
+    if activations.HAVE_NUMPY:
+        from neat.nn.vectorized import vectorize_activation
+        assert vectorize_activation(plus_one_activation, s) is plus_one_activation_array
+        assert vectorize_activation(plus_one_activation) is not plus_one_activation_array
+
+    config.genome_config.add_activation('plus_one2', lambda z: z)
+    assert s.get_vectorized('plus_one2') is None
+
+    try:
+        config.genome_config.add_activation('plus_one3', plus_one_activation, 1.0)
+    except TypeError:
+        pass
+    else:
+        raise Exception("Should have had a TypeError/derived for vectorized 1.0")
+
+
 if __name__ == '__main__':
     test_sigmoid()
     test_tanh()
@@ -200,4 +254,6 @@ if __name__ == '__main__':
     test_hat()
     test_square()
     test_cube()
+    test_vectorized()
+    test_add_vectorized()
 
@@ -120,6 +120,51 @@ def test_bad_add2():
     else:
         raise Exception("Should have had a TypeError/derived for dud_function")
 
+def test_vectorized():
+    if not aggregations.HAVE_NUMPY:
+        return
+    import numpy as np
+    import random
+
+    random.seed(18)
+    s = aggregations.AggregationFunctionSet()
+    for n in range(1, 8):
+        x = np.array([[random.gauss(0.0, 10.0) for _ in range(n)] for _ in range(20)])
+        for name, f in s.functions.items():
+            vf = s.get_vectorized(name)
+            assert vf is not None, name
+            assert np.array_equal(vf(x, -1), [f(list(row)) for row in x]), name
+            assert np.array_equal(vf(x.T, 0), [f(list(row)) for row in x]), name
+
+    empty = np.zeros((3, 0))
+    assert np.array_equal(s.get_vectorized('sum')(empty, -1), [0.0, 0.0, 0.0])
+    assert np.array_equal(s.get_vectorized('product')(empty, -1), [1.0, 1.0, 1.0])
+
+
+def minabs_aggregation_array(x, axis):
+    import numpy as np
+    i = np.expand_dims(np.argmin(np.abs(x), axis=axis), axis)
+    return np.squeeze(np.take_along_axis(x, i, axis=axis), axis)
+
+
+def test_add_vectorized():
+    s = aggregations.AggregationFunctionSet()
+    s.add('minabs', minabs_aggregation, minabs_aggregation_array)
+    assert s.get_vectorized('minabs') is minabs_aggregation_array
+    # The registration belongs to this function set only.
+    assert aggregations.get_vectorized_aggregation(minabs_aggregation) is None
+    assert aggregations.AggregationFunctionSet().vectorized.get(minabs_aggregation) is None
+    if not aggregations.HAVE_NUMPY:
+        return
+
+    from neat.nn.vectorized import vectorize_aggregation
+    import numpy as np
+    assert vectorize_aggregation(minabs_aggregation, s) is minabs_aggregation_array
+    x = np.array([[3.0, -1.0, 2.0], [-0.5, 4.0, 0.25]])
+    assert np.array_equal(vectorize_aggregation(minabs_aggregation, s)(x, -1), [-1.0, 0.25])
+    assert np.array_equal(vectorize_aggregation(minabs_aggregation)(x, -1), [-1.0, 0.25])
+
+
 if __name__ == '__main__':
     test_sum()
     test_product()
@@ -130,3 +175,5 @@ if __name__ == '__main__':
     test_mean()
     test_add_minabs()
     test_function_set()
+    test_vectorized()
+    test_add_vectorized()
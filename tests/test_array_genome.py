@@ -0,0 +1,228 @@
+import pickle
+import random
+import unittest
+
+import neat
+from neat.array_genome import HAVE_NUMPY
+from neat.nn import FeedForwardNetwork
+
+import helpers
+from helpers import random_genomes
+
+if HAVE_NUMPY:
+    import numpy as np
+
+
+def load_config():
+    return helpers.load_config(genome_type=neat.ArrayGenome,
+                               config_file='test_configuration_array',
+                               activation_options=['sigmoid', 'tanh', 'relu'],
+                               activation_mutate_rate=0.1,
+                               aggregation_options=['sum', 'product', 'max'],
+                               aggregation_mutate_rate=0.1)
+
+
+def as_default_genome(g):
+    """Returns a DefaultGenome with the same genes as the ArrayGenome g."""
+    d = neat.DefaultGenome(g.key)
+    for ng in g.nodes.values():
+        d.add_node_gene(ng)
+    for cg in g.connections.values():
+        d.add_connection_gene(cg)
+    return d
+
+
+def eval_genomes(genomes, config):
+    for genome_id, genome in genomes:
+        net = FeedForwardNetwork.create(genome, config)
+        genome.fitness = 1.0 - abs(net.activate([0.5, -0.5])[0] - 0.25)
+
+
+@unittest.skipIf(not HAVE_NUMPY, "NumPy is not available.")
+def test_run():
+    """ArrayGenome works unchanged with DefaultReproduction and DefaultSpeciesSet."""
+    random.seed(0)
+    np.random.seed(0)
+    config = load_config()
+    config.pop_size = 30
+    config.fitness_threshold = 2.0
+    p = neat.Population(config)
+    stats = neat.StatisticsReporter()
+    p.add_reporter(stats)
+    winner = p.run(eval_genomes, 5)
+    assert isinstance(winner, neat.ArrayGenome)
+    assert len(stats.most_fit_genomes) == 5
+    for g in p.population.values():
+        check_sorted(g)
+        assert g.size() == (len(g.nodes), sum(1 for cg in g.connections.values() if cg.enabled))
+
+
+@unittest.skipIf(not HAVE_NUMPY, "NumPy is not available.")
+def test_matches_default_genome():
+    """Distance and networks agree with a DefaultGenome holding the same genes."""
+    np.random.seed(1)
+    config = load_config()
+    genomes = random_genomes(config, 10)
+    defaults = [as_default_genome(g) for g in genomes]
+    for g1, d1 in zip(genomes, defaults):
+        for g2, d2 in zip(genomes, defaults):
+            assert abs(g1.distance(g2, config.genome_config) - d1.distance(d2, config.genome_config)) < 1e-9
+
+        inputs = [0.3, -0.7]
+        expected = FeedForwardNetwork.create(d1, config).activate(inputs)
+        assert FeedForwardNetwork.create(g1, config).activate(inputs) == expected
+
+
+@unittest.skipIf(not HAVE_NUMPY, "NumPy is not available.")
+def test_crossover():
+    np.random.seed(2)
+    config = load_config()
+    parent1, parent2 = random_genomes(config, 2)
+    parent1.fitness = 1.0
+    parent2.fitness = 0.0
+    child = neat.ArrayGenome(2)
+    child.configure_crossover(parent1, parent2, config.genome_config)
+
+    # The child has exactly the fitter parent's genes, with attributes from either parent.
+    assert set(child.nodes) == set(parent1.nodes)
+    assert set(child.connections) == set(parent1.connections)
+    for key, cg in child.connections.items():
+        choices = [parent1.connections[key].weight]
+        if key in parent2.connections:
+            choices.append(parent2.connections[key].weight)
+        assert cg.weight in choices
+    for key, ng in child.nodes.items():
+        parents = [parent1.nodes[key]] + ([parent2.nodes[key]] if key in parent2.nodes else [])
+        assert ng.bias in [p.bias for p in parents]
+        assert ng.activation in [p.activation for p in parents]
+
+
+def check_sorted(g):
+    assert list(g.node_keys) == sorted(g.node_keys)
+    codes = list(zip(g.conn_in, g.conn_out))
+    assert codes == sorted(codes)
+    assert len(set(codes)) == len(codes)
+    assert len(g.bias) == len(g.response) == len(g.activation) == len(g.aggregation) == len(g.node_keys)
+    assert len(g.conn_out) == len(g.weight) == len(g.enabled) == len(g.conn_in)
+
+
+@unittest.skipIf(not HAVE_NUMPY, "NumPy is not available.")
+def test_create_offspring():
+    np.random.seed(5)
+    config = load_config()
+    gc = config.genome_config
+    parents = random_genomes(config, 6)
+    for g in parents:
+        g.fitness = np.random.random()
+    pairs = [(parents[np.random.randint(6)], parents[np.random.randint(6)]) for _ in range(300)]
+
+    # Without mutation, each child is a crossover of its parents.
+    rates = dict((name, getattr(gc, name)) for name in dir(gc) if name.endswith('_rate') or name.endswith('_prob'))
+    for name in rates:
+        setattr(gc, name, 0.0)
+    children = neat.ArrayGenome.create_offspring(list(range(300)), pairs, gc)
+    from_second = []
+    for child, (parent1, parent2) in zip(children, pairs):
+        if parent1.fitness <= parent2.fitness:
+            parent1, parent2 = parent2, parent1
+        check_sorted(child)
+        assert set(child.connections) == set(parent1.connections)
+        assert set(child.nodes) == set(parent1.nodes)
+        for key, cg in child.connections.items():
+            if key in parent2.connections and parent1.connections[key].weight != parent2.connections[key].weight:
+                assert cg.weight in (parent1.connections[key].weight, parent2.connections[key].weight)
+                from_second.append(cg.weight == parent2.connections[key].weight)
+            else:
+                assert cg.weight == parent1.connections[key].weight
+        for key, ng in child.nodes.items():
+            parent_genes = [parent1.nodes[key]] + ([parent2.nodes[key]] if key in parent2.nodes else [])
+            assert ng.bias in [p.bias for p in parent_genes]
+            assert ng.activation in [p.activation for p in parent_genes]
+    assert 0.4 < np.mean(from_second) < 0.6
+
+    # With mutation, the children stay consistent and feed-forward.
+    for name, value in rates.items():
+        setattr(gc, name, value)
+    gc.feed_forward = True
+    children = neat.ArrayGenome.create_offspring(list(range(300)), pairs, gc)
+    assert [child.key for child in children] == list(range(300))
+    for child in children:
+        check_sorted(child)
+        neat.graphs.feed_forward_layers(gc.input_keys, gc.output_keys, list(child.connections))
+        assert all(gc.weight_min_value <= w <= gc.weight_max_value for w in child.weight)
+        assert set(ng.aggregation for ng in child.nodes.values()) <= set(gc.aggregation_options)
+    assert any(child.size()[0] > pair[0].size()[0] and child.size()[0] > pair[1].size()[0]
+               for child, pair in zip(children, pairs))
+
+
+@unittest.skipIf(not HAVE_NUMPY, "NumPy is not available.")
+def test_innovation_tracking():
+    np.random.seed(6)
+    config = load_config()
+    gc = config.genome_config
+    gc.innovation_tracking = True
+    gc.initial_connection = 'full_direct'
+    parent = neat.ArrayGenome(0)
+    parent.configure_new(gc)
+    parent.fitness = 0.0
+    splits = {}
+    for key in range(1, 30):
+        g = neat.ArrayGenome(key)
+        g.configure_crossover(parent, parent, gc)
+        g.mutate_add_node(gc)
+        new_key, = set(g.nodes) - set(parent.nodes)
+        split, = [k for k, cg in g.connections.items() if not cg.enabled]
+        assert splits.setdefault(split, new_key) == new_key
+    assert len(set(splits.values())) == len(splits) < 29
+
+
+@unittest.skipIf(not HAVE_NUMPY, "NumPy is not available.")
+def test_mutation_bounds():
+    np.random.seed(3)
+    config = load_config()
+    gc = config.genome_config
+    gc.weight_min_value, gc.weight_max_value = -1.0, 1.0
+    gc.weight_mutate_rate = 1.0
+    gc.weight_mutate_power = 5.0
+    gc.feed_forward = True
+    for g in random_genomes(config, 5, mutations=50):
+        assert g.weight.min() >= -1.0 and g.weight.max() <= 1.0
+        assert g.bias.min() >= gc.bias_min_value and g.bias.max() <= gc.bias_max_value
+        assert set(ng.activation for ng in g.nodes.values()) <= set(gc.activation_options)
+        # Feed-forward genomes have no cycles.
+        neat.graphs.feed_forward_layers(gc.input_keys, gc.output_keys, list(g.connections))
+        for key in g.connections:
+            assert not g._reaches(key[1], key[0])
+
+    gc.bias_init_type = 'bogus'
+    g = neat.ArrayGenome(0)
+    try:
+        g.configure_new(gc)
+    except RuntimeError:
+        pass
+    else:
+        raise Exception("Should have had a RuntimeError")
+
+
+@unittest.skipIf(not HAVE_NUMPY, "NumPy is not available.")
+def test_pickle():
+    np.random.seed(4)
+    config = load_config()
+    g = random_genomes(config, 1)[0]
+    g.fitness = 0.5
+    nodes = g.nodes
+    g2 = pickle.loads(pickle.dumps(g))
+    assert g2.fitness == 0.5
+    assert str(g2) == str(g)
+    assert g2.distance(g, config.genome_config) == 0.0
+    assert set(g2.nodes) == set(nodes)
+
+
+if __name__ == '__main__':
+    test_run()
+    test_matches_default_genome()
+    test_crossover()
+    test_create_offspring()
+    test_innovation_tracking()
+    test_mutation_bounds()
+    test_pickle()
@@ -0,0 +1,122 @@
+import math
+import random
+
+from neat import activations
+from neat.nn import compiled
+from neat.nn import (FeedForwardNetwork, RecurrentNetwork, CompiledFeedForwardNetwork,
+                     CompiledRecurrentNetwork)
+
+from helpers import load_config, random_genomes
+
+
+def assert_almost_equal(x, y, tol):
+    assert abs(x - y) < tol, "{!r} !~= {!r}".format(x, y)
+
+
+def test_basic():
+    node_evals = [(0, activations.sigmoid_activation, sum, 0.0, 1.0, [(-1, 1.0)])]
+    r = CompiledFeedForwardNetwork([-1], [0], node_evals)
+
+    result = r.activate([0.2])
+    assert_almost_equal(result[0], 0.731, 0.001)
+
+    result = r.activate([0.4])
+    assert_almost_equal(result[0], 0.881, 0.001)
+
+    try:
+        r.activate([0.2, 0.4])
+    except RuntimeError:
+        pass
+    else:
+        raise Exception("Wrong number of inputs was not detected")
+
+
+def test_unconnected():
+    r = CompiledFeedForwardNetwork([], [0], [])
+    assert r.activate([]) == [0.0]
+
+    r = CompiledRecurrentNetwork([-1], [0], [])
+    assert r.activate([1.0]) == [0.0]
+
+
+def test_source_is_cached():
+    node_evals = [(0, activations.sigmoid_activation, sum, 0.5, 1.0, [(-1, 0.25), (-2, -1.5)])]
+    r1 = CompiledFeedForwardNetwork([-1, -2], [0], node_evals)
+    r2 = CompiledFeedForwardNetwork([-1, -2], [0], list(node_evals))
+    assert r1.function is r2.function
+    assert "0.25" in r1.source and "-1.5" in r1.source
+
+
+def test_non_finite_constants():
+    inf = float('inf')
+    node_evals = [(0, activations.identity_activation, sum, float('nan'), 1.0, [(-1, 1.0)]),
+                  (1, activations.identity_activation, sum, 0.0, 1.0, [(-1, inf)]),
+                  (2, activations.identity_activation, sum, -inf, 1.0, [(-1, 1.0)])]
+    r = CompiledFeedForwardNetwork([-1], [0, 1, 2], node_evals)
+    assert "float('nan')" in r.source and "float('-inf')" in r.source
+    result = r.activate([1.0])
+    assert math.isnan(result[0]) and result[1] == inf and result[2] == -inf
+
+
+def test_cache_evicts_least_recently_used():
+    def network(weight):
+        node_evals = [(0, activations.sigmoid_activation, sum, 0.0, 1.0, [(-1, weight)])]
+        return CompiledFeedForwardNetwork([-1], [0], node_evals)
+
+    saved_max = compiled.MAX_CACHED_FUNCTIONS
+    saved_cache = compiled._function_cache.copy()
+    try:
+        compiled.MAX_CACHED_FUNCTIONS = 2
+        compiled._function_cache.clear()
+        first = network(0.125).function
+        network(0.25)
+        # Using the first function again makes the second one the least recently used.
+        assert network(0.125).function is first
+        network(0.5)
+        assert len(compiled._function_cache) == 2
+        assert network(0.125).function is first
+        assert network(0.25).function is not None
+    finally:
+        compiled.MAX_CACHED_FUNCTIONS = saved_max
+        compiled._function_cache.clear()
+        compiled._function_cache.update(saved_cache)
+
+
+def test_matches_feed_forward_network():
+    random.seed(2020)
+    config = load_config(True)
+    for g in random_genomes(config, 40):
+        net = FeedForwardNetwork.create(g, config)
+        cnet = FeedForwardNetwork.create(g, config, backend='compiled')
+        assert isinstance(cnet, CompiledFeedForwardNetwork)
+        for _ in range(5):
+            inputs = [random.uniform(-2.0, 2.0) for _ in config.genome_config.input_keys]
+            assert net.activate(inputs) == cnet.activate(inputs)
+        batch = [[random.uniform(-2.0, 2.0) for _ in config.genome_config.input_keys] for _ in range(3)]
+        result = cnet.activate_batch(batch)
+        assert type(result) is list and result == [net.activate(row) for row in batch]
+
+
+def test_matches_recurrent_network():
+    random.seed(2021)
+    config = load_config(False)
+    for g in random_genomes(config, 40):
+        net = RecurrentNetwork.create(g, config)
+        cnet = RecurrentNetwork.create(g, config, backend='compiled')
+        assert isinstance(cnet, CompiledRecurrentNetwork)
+        for _ in range(2):
+            for _ in range(5):
+                inputs = [random.uniform(-2.0, 2.0) for _ in config.genome_config.input_keys]
+                assert net.activate(inputs) == cnet.activate(inputs)
+            net.reset()
+            cnet.reset()
+
+
+if __name__ == '__main__':
+    test_basic()
+    test_unconnected()
+    test_source_is_cached()
+    test_non_finite_constants()
+    test_cache_evicts_least_recently_used()
+    test_matches_feed_forward_network()
+    test_matches_recurrent_network()
@@ -1,7 +1,22 @@
 from __future__ import print_function
 
+import math
+import os
+import random
+import unittest
+import warnings
+
 import neat
-from neat.activations import sigmoid_activation
+from neat.activations import sigmoid_activation, identity_activation
+from neat.aggregations import (sum_aggregation, max_aggregation, median_aggregation, mean_aggregation,
+                               product_aggregation)
+from neat.ctrnn import INTEGRATION_METHODS, input_gain, max_time_step
+from neat.ctrnn.vectorized import VectorizedCTRNN
+from neat.nn.vectorized import HAVE_NUMPY
+
+
+def assert_almost_equal(x, y, tol):
+    assert abs(x - y) < tol, "{!r} !~= {!r}".format(x, y)
 
 
 def test_basic():
@@ -27,6 +42,237 @@ def test_basic():
         times.append(net.time_seconds)
         outputs.append(output)
 
+
+def test_max_time_step():
+    node1_inputs = [(1, 0.9), (2, 0.2)]
+    node2_inputs = [(1, -0.2), (2, 0.9)]
+    node_evals = {1: neat.ctrnn.CTRNNNodeEval(0.01, sigmoid_activation, sum, -2.75 / 5.0, 1.0, node1_inputs),
+                  2: neat.ctrnn.CTRNNNodeEval(0.02, sigmoid_activation, sum, -1.75 / 5.0, 1.0, node2_inputs)}
+    net = neat.ctrnn.CTRNN([], [1, 2], node_evals)
+
+    # The sigmoid has a maximum slope of 1.25, and both nodes have |weights| summing to 1.1,
+    # so the gain is over 1: no step is stable, which is warned about, and the step is
+    # limited to the smallest time constant.
+    with warnings.catch_warnings(record=True) as w:
+        warnings.simplefilter('always')
+        assert_almost_equal(net.get_max_time_step(), 0.01, 1e-12)
+        assert w and all(issubclass(x.category, RuntimeWarning) for x in w)
+        net.advance([], 0.1)
+    assert_almost_equal(net.time_seconds, 0.1, 1e-12)
+
+    assert max_time_step(0.01, 0.5, 'exponential') == float('inf')
+    assert max_time_step(0.01, 0.5, 'rk4') > max_time_step(0.01, 0.5, 'forward_euler')
+    assert max_time_step(0.01, 0.5, 'euler') == max_time_step(0.01, 0.5, 'forward_euler')
+    with warnings.catch_warnings(record=True) as w:
+        warnings.simplefilter('always')
+        assert max_time_step(0.01, 3.0, 'euler') == 0.01
+        assert len(w) == 1
+    with warnings.catch_warnings():
+        warnings.simplefilter('error')
+        max_time_step(0.01, 0.99, 'euler')
+
+    # The gain of the input depends on the aggregation function.
+    weights = [0.5, -2.0, 1.5]
+    assert input_gain(sum_aggregation, weights) == 4.0
+    assert input_gain(max_aggregation, weights) == 2.0
+    assert input_gain(median_aggregation, weights) == 2.0
+    assert_almost_equal(input_gain(mean_aggregation, weights), 4.0 / 3.0, 1e-12)
+    assert input_gain(product_aggregation, weights) == 4.0
+    assert input_gain(sum_aggregation, []) == 0.0
+
+
+def decaying_node(weight, method):
+    """A single linear node with a self-connection, whose decay rate is (1 - weight) / tau."""
+    node_evals = {0: neat.ctrnn.CTRNNNodeEval(0.1, identity_activation, sum_aggregation, 1.0, 1.0, [(0, weight)])}
+    return VectorizedCTRNN([], [0], node_evals, method)
+
+
+def rotating_pair(weight, method):
+    """Two linear nodes coupled with weights weight and -weight, giving the coupling +/- i * weight."""
+    node_evals = {0: neat.ctrnn.CTRNNNodeEval(0.1, identity_activation, sum_aggregation, 0.0, 1.0, [(1, weight)]),
+                  1: neat.ctrnn.CTRNNNodeEval(0.1, identity_activation, sum_aggregation, 0.0, 1.0, [(0, -weight)])}
+    net = VectorizedCTRNN([], [0], node_evals, method)
+    net.set_node_value(0, 1.0)
+    return net
+
+
+@unittest.skipIf(not HAVE_NUMPY, "NumPy is not available.")
+def test_vectorized_integration_methods():
+    # With no self-connection, y(t) = 1 - exp(-t / tau).
+    for method, dt, tol in (('forward_euler', 0.001, 5e-3), ('rk4', 0.01, 1e-6), ('exponential', 0.5, 1e-12)):
+        net = decaying_node(0.0, method)
+        for t in range(1, 11):
+            output = net.advance([], 0.1, dt)
+            assert_almost_equal(output[0], 1.0 - math.exp(-0.1 * t / 0.1), tol)
+
+    try:
+        decaying_node(0.0, 'midpoint')
+    except RuntimeError:
+        pass
+    else:
+        raise Exception("Unknown integration method was not detected")
+
+
+@unittest.skipIf(not HAVE_NUMPY, "NumPy is not available.")
+def test_vectorized_max_time_step():
+    # For a linear node with strong self-inhibition the bound is exact: slightly smaller
+    # steps converge to the fixed point 1 / (1 - weight), slightly larger ones diverge.
+    for method in ('forward_euler', 'rk4', 'exponential'):
+        max_step = decaying_node(-9.0, method).get_max_time_step()
+        assert_almost_equal(max_step, max_time_step(0.1, 9.0, method), 1e-12)
+
+        for factor in (0.95, 1.05):
+            net = decaying_node(-9.0, method)
+            for _ in range(200):
+                output = net.advance([], factor * max_step, factor * max_step)
+            if factor < 1.0:
+                assert_almost_equal(output[0], 0.1, 1e-3)
+            else:
+                assert abs(output[0] - 0.1) > 1.0
+
+    # The double-buffered scheme is unstable with any step under strong self-inhibition,
+    # and its bound is exact for a pair of nodes with imaginary coupling.
+    net = decaying_node(-9.0, 'euler')
+    assert_almost_equal(net.get_max_time_step(), 0.1, 1e-12)
+    for _ in range(2000):
+        output = net.advance([], 0.001, 0.001)
+    assert abs(output[0] - 0.1) > 1.0
+
+    max_step = rotating_pair(0.5, 'euler').get_max_time_step()
+    assert_almost_equal(max_step, 2.0 * 0.1 / 1.5, 1e-12)
+    for factor in (0.95, 1.05):
+        net = rotating_pair(0.5, 'euler')
+        for _ in range(200):
+            output = net.advance([], factor * max_step, factor * max_step)
+        if factor < 1.0:
+            assert abs(output[0]) < 1e-3
+        else:
+            assert abs(output[0]) > 1.0
+
+
+@unittest.skipIf(not HAVE_NUMPY, "NumPy is not available.")
+def test_vectorized_matches_ctrnn():
+    # The default method gives the outputs of CTRNN.advance, including its default steps.
+    random.seed(2022)
+    local_dir = os.path.dirname(__file__)
+    config = neat.Config(neat.DefaultGenome, neat.DefaultReproduction,
+                         neat.DefaultSpeciesSet, neat.DefaultStagnation,
+                         os.path.join(local_dir, 'test_configuration2'))
+    config.genome_config.activation_options = ['sigmoid', 'tanh', 'sin', 'gauss', 'relu', 'identity', 'log']
+    config.genome_config.feed_forward = False
+    config.genome_config.initial_connection = 'full_direct'
+    config.genome_config.num_hidden = 2
+    for key in range(10):
+        g = neat.DefaultGenome(key)
+        g.configure_new(config.genome_config)
+        for _ in range(10):
+            g.mutate(config.genome_config)
+
+        expected = neat.ctrnn.CTRNN.create(g, config, 0.05)
+        net = neat.ctrnn.CTRNN.create(g, config, 0.05, backend='numpy')
+        assert net.method == 'euler'
+        expected.set_node_value(0, 0.5)
+        net.set_node_value(0, 0.5)
+        for t in range(50):
+            inputs = [random.uniform(-1.0, 1.0) for _ in config.genome_config.input_keys]
+            time_step = None if t % 2 else 0.002
+            for a, b in zip(expected.advance(inputs, 0.01, time_step), net.advance(inputs, 0.01, time_step)):
+                assert_almost_equal(a, b, 1e-12)
+            assert_almost_equal(expected.time_seconds, net.time_seconds, 1e-12)
+
+
+@unittest.skipIf(not HAVE_NUMPY, "NumPy is not available.")
+def test_vectorized_matches_ode():
+    random.seed(2023)
+    local_dir = os.path.dirname(__file__)
+    config = neat.Config(neat.DefaultGenome, neat.DefaultReproduction,
+                         neat.DefaultSpeciesSet, neat.DefaultStagnation,
+                         os.path.join(local_dir, 'test_configuration2'))
+    config.genome_config.activation_options = ['sigmoid', 'tanh', 'sin', 'gauss', 'relu', 'identity']
+    config.genome_config.feed_forward = False
+    config.genome_config.initial_connection = 'full_direct'
+    config.genome_config.num_hidden = 2
+    for key in range(10):
+        g = neat.DefaultGenome(key)
+        g.configure_new(config.genome_config)
+        for _ in range(10):
+            g.mutate(config.genome_config)
+
+        inputs = [random.uniform(-1.0, 1.0) for _ in config.genome_config.input_keys]
+        reference = neat.ctrnn.CTRNN.create(g, config, 0.05, backend='numpy')
+        assert isinstance(reference, VectorizedCTRNN)
+        reference.method = 'rk4'
+        expected = reference.advance(inputs, 0.5, 0.001)
+        for method in ('forward_euler', 'rk4', 'exponential'):
+            # Exponential Euler may be stable with arbitrarily large steps; keep them
+            # within one time constant so that the result is also accurate.
+            net = VectorizedCTRNN.create(g, config, 0.05, method)
+            output = net.advance(inputs, 0.5, min(0.5 * net.get_max_time_step(), 0.05))
+            for a, b in zip(expected, output):
+                assert_almost_equal(a, b, 0.01)
+
+@unittest.skipIf(not HAVE_NUMPY, "NumPy is not available.")
+def test_advance_many():
+    import numpy as np
+
+    node1_inputs = [(-1, 0.5), (1, 0.9), (2, 0.2)]
+    node2_inputs = [(1, -0.2), (2, 0.9)]
+    node_evals = {1: neat.ctrnn.CTRNNNodeEval(0.01, sigmoid_activation, sum, -2.75 / 5.0, 1.0, node1_inputs),
+                  2: neat.ctrnn.CTRNNNodeEval(0.01, sigmoid_activation, sum, -1.75 / 5.0, 1.0, node2_inputs)}
+    schedule = np.linspace(-1.0, 1.0, 50).reshape(50, 1)
+    for cls in (neat.ctrnn.CTRNN, VectorizedCTRNN):
+        net = cls([-1], [2], node_evals)
+        expected = [net.advance(row.tolist(), 0.002, 0.001) for row in schedule]
+        if cls is VectorizedCTRNN:
+            expected_state = net.values[net.node_rows].tolist()
+        else:
+            expected_state = [net.values[1 - net.active][k] for k in node_evals]
+
+        net.reset()
+        state = np.zeros((50, 2))
+        outputs = net.advance_many(50, schedule, 0.002, 0.001, state=state)
+        assert outputs.tolist() == expected
+        assert state[-1].tolist() == expected_state
+        assert_almost_equal(net.time_seconds, 0.1, 1e-9)
+
+        try:
+            net.advance_many(50, [0.0, 1.0], 0.002, 0.001)
+        except RuntimeError:
+            pass
+        else:
+            raise Exception("Wrong number of inputs was not detected")
+
+
+@unittest.skipIf(not HAVE_NUMPY, "NumPy is not available.")
+def test_vectorized_precision():
+    random.seed(2024)
+    local_dir = os.path.dirname(__file__)
+    config = neat.Config(neat.DefaultGenome, neat.DefaultReproduction,
+                         neat.DefaultSpeciesSet, neat.DefaultStagnation,
+                         os.path.join(local_dir, 'test_configuration2'))
+    config.genome_config.activation_options = ['sigmoid', 'tanh']
+    config.genome_config.feed_forward = False
+    config.genome_config.initial_connection = 'full_direct'
+    config.genome_config.num_hidden = 2
+    for precision, tol in (('float32', 1e-5), ('float16', 0.01)):
+        delta = 0.0
+        for key in range(10):
+            g = neat.DefaultGenome(key)
+            g.configure_new(config.genome_config)
+            for _ in range(10):
+                g.mutate(config.genome_config)
+
+            inputs = [random.uniform(-1.0, 1.0) for _ in config.genome_config.input_keys]
+            for method in INTEGRATION_METHODS:
+                expected = VectorizedCTRNN.create(g, config, 0.05, method)
+                net = VectorizedCTRNN.create(g, config, 0.05, method, precision)
+                assert net.values.dtype == precision and net.nodes.edge_weights.dtype == precision
+                for a, b in zip(expected.advance(inputs, 0.5, 0.01), net.advance(inputs, 0.5, 0.01)):
+                    delta = max(delta, abs(a - b))
+        print("{0}: max delta from float64 {1:.3g}".format(precision, delta))
+        assert delta < tol
+
+
 #
 #
 # def create_simple():
@@ -99,5 +345,12 @@ def test_basic():
 #
 if __name__ == '__main__':
     test_basic()
+    test_max_time_step()
+    test_vectorized_integration_methods()
+    test_vectorized_max_time_step()
+    test_vectorized_matches_ctrnn()
+    test_vectorized_matches_ode()
+    test_advance_many()
+    test_vectorized_precision()
 #     test_evolve()
 #     test_manual_network()
\ No newline at end of file
@@ -1,5 +1,8 @@
-from neat import activations
-from neat.nn import FeedForwardNetwork
+import random
+
+from neat import activations, aggregations
+from neat.nn import FeedForwardNetwork, RecurrentNetwork
+from neat.numpy_util import HAVE_NUMPY
 
 
 def assert_almost_equal(x, y, tol):
@@ -109,6 +112,69 @@ def test_basic():
 #     assert_almost_equal(v11[0], 0.018325, 1e-3)
 
 
+def test_values():
+    # Setting a node's value changes what the network computes from it.
+    node_evals = [(0, activations.identity_activation, sum, 0.0, 1.0, [(-1, 1.0), (1, 2.0)])]
+    r = FeedForwardNetwork([-1], [0], node_evals)
+    r.values[1] = 0.5
+    assert r.activate([0.25]) == [1.25]
+    assert dict(r.values) == {-1: 0.25, 0: 1.25, 1: 0.5}
+
+    try:
+        r.values[2] = 1.0
+    except KeyError:
+        pass
+    else:
+        raise Exception("Unknown node was not detected")
+
+    try:
+        del r.values[1]
+    except RuntimeError:
+        pass
+    else:
+        raise Exception("Node removal was not detected")
+
+
+def test_activate_batch():
+    # With NumPy, the rows are computed at once by a VectorizedFeedForwardNetwork.
+    node_evals = [(0, activations.identity_activation, sum, 0.5, 1.0, [(-1, 1.0), (-2, 2.0)])]
+    r = FeedForwardNetwork([-1, -2], [0], node_evals)
+    result = r.activate_batch([[1.0, 0.0], [0.0, 1.0], [0.25, 0.25]])
+    if HAVE_NUMPY:
+        from neat.nn.vectorized import VectorizedFeedForwardNetwork
+        assert isinstance(r.batch_network, VectorizedFeedForwardNetwork)
+        assert result.shape == (3, 1)
+        result = result.tolist()
+        assert r.values[0] == 0.0
+    assert result == [[1.5], [2.5], [1.25]]
+
+
+def test_fused_aggregations():
+    # The fused loops give exactly the results of calling the aggregation functions.
+    random.seed(19)
+    functions = [aggregations.sum_aggregation, aggregations.product_aggregation, aggregations.max_aggregation,
+                 aggregations.min_aggregation, aggregations.mean_aggregation, sum, max, min]
+    node_evals = []
+    for node in range(len(functions) * 2):
+        sources = [-1, -2, -3] + list(range(node))
+        links = [(random.choice(sources), random.gauss(0.0, 1.0)) for _ in range(random.randint(1, 5))]
+        node_evals.append((node, activations.tanh_activation, functions[node % len(functions)],
+                           random.gauss(0.0, 1.0), random.gauss(1.0, 0.5), links))
+    general = [(node, act, (lambda x, f=agg: f(x)), bias, response, links)
+               for node, act, agg, bias, response, links in node_evals]
+    outputs = list(range(len(node_evals)))
+    # RecurrentNetwork evaluates its nodes in the same way.
+    for network_type in (FeedForwardNetwork, RecurrentNetwork):
+        r1 = network_type([-1, -2, -3], outputs, node_evals)
+        r2 = network_type([-1, -2, -3], outputs, general)
+        for _ in range(20):
+            inputs = [random.uniform(-2.0, 2.0) for _ in range(3)]
+            assert r1.activate(inputs) == r2.activate(inputs)
+
+
 if __name__ == '__main__':
     test_unconnected()
-    test_basic()
\ No newline at end of file
+    test_basic()
+    test_values()
+    test_activate_batch()
+    test_fused_aggregations()
@@ -1,2 +1,182 @@
+import copy
+import pickle
+import random
+import unittest
+
 from neat import genes
+from neat.attributes import BoolAttribute, FloatAttribute, StringAttribute
+from neat.genome import HAVE_NUMPY
+
+if HAVE_NUMPY:
+    import numpy as np
+
+
+def test_attribute_defaults():
+    # Defaults given to one attribute must not leak into other attributes of the same type.
+    activation = StringAttribute('activation', options='sigmoid')
+    aggregation = StringAttribute('aggregation', options='sum')
+    defaults = dict((p.name, p.default) for p in activation.get_config_params() + aggregation.get_config_params())
+    assert defaults['activation_options'] == 'sigmoid'
+    assert defaults['aggregation_options'] == 'sum'
+
+    delay = FloatAttribute('delay', init_mean=0.0)
+    weight = FloatAttribute('weight')
+    assert [p.default for p in delay.get_config_params() if p.name == 'delay_init_mean'] == [0.0]
+    assert [p.default for p in weight.get_config_params() if p.name == 'weight_init_mean'] == [None]
+
+    node_params = dict((p.name, p.default) for p in genes.DefaultNodeGene.get_config_params())
+    assert node_params['activation_options'] == 'sigmoid'
+
+
+class TaggedGene(genes.DefaultConnectionGene):
+    # A user subclass without __slots__, which keeps a __dict__ for its own attributes.
+    _gene_attributes = genes.DefaultConnectionGene._gene_attributes + [StringAttribute('tag')]
+
+    def __init__(self, key):
+        genes.DefaultConnectionGene.__init__(self, key)
+        self.extra = 'x'
+
+
+class LegacyGene(genes.BaseGene):
+    __gene_attributes__ = [FloatAttribute('value')]
+
+
+def test_slots():
+    assert genes.DefaultNodeGene.__slots__ == ('bias', 'response', 'activation', 'aggregation')
+    assert genes.DefaultConnectionGene.__slots__ == ('weight', 'enabled')
+
+    g = genes.DefaultConnectionGene((1, 2))
+    g.weight = 0.5
+    g.enabled = True
+    assert not hasattr(g, '__dict__')
+    try:
+        g.label = 'x'
+    except AttributeError:
+        pass
+    else:
+        raise Exception("Setting an attribute without a slot was not detected")
+
+    for protocol in range(pickle.HIGHEST_PROTOCOL + 1):
+        h = pickle.loads(pickle.dumps(g, protocol))
+        assert (h.key, h.weight, h.enabled) == ((1, 2), 0.5, True)
+    h = copy.deepcopy(g)
+    assert (h.key, h.weight, h.enabled) == ((1, 2), 0.5, True)
+
+    # State pickled before the gene classes had slots.
+    h = genes.DefaultConnectionGene.__new__(genes.DefaultConnectionGene)
+    h.__setstate__({'key': (1, 2), 'weight': 0.5, 'enabled': True})
+    assert str(h) == str(g)
+
+    # Subclasses that do not define __slots__ can set attributes of their own.
+    g = TaggedGene((1, 2))
+    g.weight = 0.5
+    g.enabled = True
+    g.tag = 'a'
+    assert g.__dict__ == {'extra': 'x', 'tag': 'a'}
+    for protocol in range(pickle.HIGHEST_PROTOCOL + 1):
+        h = pickle.loads(pickle.dumps(g, protocol))
+        assert (h.key, h.weight, h.enabled, h.tag, h.extra) == ((1, 2), 0.5, True, 'a', 'x')
+
+    g = LegacyGene(0)
+    g.value = 1.0
+    assert g.__dict__ == {'value': 1.0}
+    assert pickle.loads(pickle.dumps(g)).value == 1.0
+
+
+class AttributeConfig(object):
+    weight_init_mean = 0.0
+    weight_init_stdev = 1.0
+    weight_init_type = 'gaussian'
+    weight_mutate_rate = 0.5
+    weight_mutate_power = 2.0
+    weight_replace_rate = 0.2
+    weight_min_value = -1.0
+    weight_max_value = 1.0
+    enabled_mutate_rate = 0.1
+    enabled_rate_to_true_add = 0.3
+    enabled_rate_to_false_add = 0.0
+    activation_mutate_rate = 0.25
+    activation_options = ['sigmoid', 'tanh']
+
+
+@unittest.skipIf(not HAVE_NUMPY, "NumPy is not available.")
+def test_mutate_values():
+    # mutate_values gives the same distribution of results as mutate_value.
+    random.seed(0)
+    rng = np.random.RandomState(0)
+    config = AttributeConfig()
+    n = 20000
+
+    weight = FloatAttribute('weight')
+    values = [0.5] * n
+    for init_type in ('gaussian', 'uniform'):
+        config.weight_init_type = init_type
+        bulk = np.array(weight.mutate_values(values, config, rng))
+        single = np.array([weight.mutate_value(v, config) for v in values])
+        for x in (bulk, single):
+            assert x.min() >= -1.0 and x.max() <= 1.0
+        for f in (lambda x: x == 0.5, lambda x: x == 1.0, lambda x: x == -1.0, lambda x: x < 0.0):
+            assert abs(f(bulk).mean() - f(single).mean()) < 0.02
+
+    # Clamping keeps its order when the bounds are crossed.
+    config.weight_min_value, config.weight_max_value = 1.0, -1.0
+    assert weight.mutate_values([0.5], config, rng) in ([0.5], [1.0])
+    config.weight_min_value, config.weight_max_value = -1.0, 1.0
+
+    config.weight_init_type = 'bogus'
+    try:
+        weight.mutate_values(values, config, rng)
+    except RuntimeError:
+        pass
+    else:
+        raise Exception("Should have had a RuntimeError")
+
+    enabled = BoolAttribute('enabled')
+    values = [True] * (n // 2) + [False] * (n // 2)
+    bulk = enabled.mutate_values(values, config, rng)
+    single = [enabled.mutate_value(v, config) for v in values]
+    assert all(type(v) is bool for v in bulk)
+    for x in (bulk, single):
+        changed = np.not_equal(x, values)
+        # Rates of 0.1 (True) and 0.4 (False), half of which leave the value alone.
+        assert abs(changed[:n // 2].mean() - 0.05) < 0.01
+        assert abs(changed[n // 2:].mean() - 0.2) < 0.02
+
+    activation = StringAttribute('activation')
+    bulk = activation.mutate_values(['sigmoid'] * n, config, rng)
+    assert set(bulk) == {'sigmoid', 'tanh'}
+    assert abs(bulk.count('tanh') / float(n) - 0.125) < 0.01
+
+    # Values held as codes are mutated to the codes of the options.
+    codes = activation.mutate_values(np.zeros(n, dtype=np.intp), config, rng, np.array([3, 4]))
+    assert set(codes) == {0, 3, 4}
+    assert abs(codes.count(4) / float(n) - 0.125) < 0.01
+
+
+@unittest.skipIf(not HAVE_NUMPY, "NumPy is not available.")
+def test_init_values():
+    rng = np.random.RandomState(0)
+    config = AttributeConfig()
+    n = 20000
+
+    enabled = BoolAttribute('enabled')
+    for default, expected in (('True', 1.0), ('off', 0.0)):
+        config.enabled_default = default
+        values = enabled.init_values(n, config, rng)
+        assert values.dtype == bool and values.mean() == expected
+    config.enabled_default = 'random'
+    assert abs(enabled.init_values(n, config, rng).mean() - 0.5) < 0.02
+    config.enabled_default = 'bogus'
+    try:
+        enabled.init_values(n, config, rng)
+    except RuntimeError:
+        pass
+    else:
+        raise Exception("Should have had a RuntimeError")
+
 
+if __name__ == '__main__':
+    test_attribute_defaults()
+    test_slots()
+    test_mutate_values()
+    test_init_values()
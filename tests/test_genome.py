@@ -2,6 +2,8 @@
 from __future__ import print_function
 
 import os
+import pickle
+import random
 import sys
 import unittest
 
@@ -308,5 +310,314 @@ class TestCreateNew(unittest.TestCase):
         self.assertEqual(set(iterkeys(g.nodes)), {0, 1, 2})
         self.assertLess(len(g.connections), 8)
 
+
+class TaggedGenome(neat.DefaultGenome):
+    pass
+
+
+class TestStructuralMutation(unittest.TestCase):
+    """Tests that the bookkeeping kept by DefaultGenome survives mutation and crossover."""
+    def setUp(self):
+        local_dir = os.path.dirname(__file__)
+        config_path = os.path.join(local_dir, 'test_configuration2')
+        self.config = neat.Config(neat.DefaultGenome, neat.DefaultReproduction,
+                                  neat.DefaultSpeciesSet, neat.DefaultStagnation,
+                                  config_path)
+        self.config.genome_config.single_structural_mutation = False
+
+    def evolve_genomes(self, count=20, generations=30):
+        config = self.config.genome_config
+        genomes = []
+        for key in range(count):
+            g = neat.DefaultGenome(key)
+            g.configure_new(config)
+            g.fitness = random.random()
+            genomes.append(g)
+
+        for _ in range(generations):
+            children = []
+            for key in range(count):
+                child = neat.DefaultGenome(key)
+                child.configure_crossover(random.choice(genomes), random.choice(genomes), config)
+                child.mutate(config)
+                child.fitness = random.random()
+                children.append(child)
+            genomes = children
+
+        return genomes
+
+    def check_adjacency(self, g):
+        incoming = {}
+        outgoing = {}
+        for i, o in iterkeys(g.connections):
+            outgoing.setdefault(i, set()).add(o)
+            incoming.setdefault(o, set()).add(i)
+        self.assertEqual(incoming, g.incoming)
+        self.assertEqual(outgoing, g.outgoing)
+
+    def check_acyclic(self, g):
+        pending = dict((o, len(inputs)) for o, inputs in g.incoming.items())
+        ready = [n for n in set(g.outgoing) | set(g.incoming) if not pending.get(n)]
+        visited = 0
+        while ready:
+            n = ready.pop()
+            visited += 1
+            for o in g.outgoing.get(n, ()):
+                pending[o] -= 1
+                if not pending[o]:
+                    ready.append(o)
+        self.assertEqual(visited, len(set(g.outgoing) | set(g.incoming)))
+
+    def test_adjacency_index(self):
+        random.seed(7)
+        for g in self.evolve_genomes():
+            self.check_adjacency(g)
+            self.check_acyclic(g)
+
+    def test_topological_order(self):
+        random.seed(8)
+        for g in self.evolve_genomes():
+            self.assertIsNotNone(g.node_order)
+            for i, o in iterkeys(g.connections):
+                self.assertLess(g.node_order.rank[i], g.node_order.rank[o])
+
+            # Evaluating in the stored order gives the same outputs as re-layering.
+            net = neat.nn.FeedForwardNetwork.create(g, self.config)
+            order = g.node_order
+            g.node_order = None
+            layered = neat.nn.FeedForwardNetwork.create(g, self.config)
+            g.node_order = order
+            self.assertEqual(set(ne[0] for ne in net.node_evals), set(ne[0] for ne in layered.node_evals))
+            for _ in range(5):
+                inputs = [random.uniform(-2.0, 2.0) for _ in self.config.genome_config.input_keys]
+                self.assertEqual(net.activate(inputs), layered.activate(inputs))
+
+    def test_directly_edited_genome(self):
+        random.seed(13)
+        config = self.config.genome_config
+        config.initial_connection = 'full_direct'
+        config.num_hidden = 0
+
+        def check_network(g):
+            net = neat.nn.FeedForwardNetwork.create(g, self.config)
+            order = g.node_order
+            g.node_order = None
+            layered = neat.nn.FeedForwardNetwork.create(g, self.config)
+            g.node_order = order
+            self.assertEqual(set(ne[0] for ne in net.node_evals), set(ne[0] for ne in layered.node_evals))
+            inputs = [random.uniform(-2.0, 2.0) for _ in config.input_keys]
+            self.assertEqual(net.activate(inputs), layered.activate(inputs))
+            return net
+
+        # A node and connections added to the dicts directly are not in the stored order.
+        g = neat.DefaultGenome(0)
+        g.configure_new(config)
+        g.nodes[5] = g.create_node(config, 5)
+        for key in ((-1, 5), (5, 0)):
+            g.connections[key] = g.create_connection(config, *key)
+        self.assertIn(5, [ne[0] for ne in check_network(g).node_evals])
+
+        # A connection added directly against the stored order is still evaluated in order.
+        g = neat.DefaultGenome(1)
+        g.configure_new(config)
+        for key in (5, 6):
+            g.add_node_gene(g.create_node(config, key))
+        for key in ((-1, 5), (5, 0), (-2, 6), (6, 0)):
+            g.add_connection_gene(g.create_connection(config, *key))
+        rank = g.node_order.rank
+        a, b = sorted((5, 6), key=rank.__getitem__, reverse=True)
+        g.connections[(a, b)] = g.create_connection(config, a, b)
+        g.connections[(a, b)].enabled = True
+        evals = [ne[0] for ne in check_network(g).node_evals]
+        self.assertLess(evals.index(a), evals.index(b))
+
+    def test_hashes(self):
+        random.seed(9)
+        genomes = self.evolve_genomes()
+        for g in genomes:
+            self.assertEqual((g.structure_hash, g.parameter_hash), g.compute_hashes())
+
+        # The hashes do not depend on the order in which genes were added.
+        g = max(genomes, key=lambda g: g.size()[1])
+        clone = neat.DefaultGenome(100)
+        for key in sorted(g.nodes, reverse=True):
+            clone.add_node_gene(g.nodes[key].copy())
+        for key in sorted(g.connections, reverse=True):
+            clone.add_connection_gene(g.connections[key].copy())
+        self.assertEqual((g.structure_hash, g.parameter_hash), (clone.structure_hash, clone.parameter_hash))
+
+        # Disabling a connection changes both hashes; changing only a weight leaves the structure hash alone.
+        cg = next(cg for cg in clone.connections.values() if cg.enabled)
+        cg = cg.copy()
+        cg.weight += 1.0
+        clone.add_connection_gene(cg)
+        self.assertEqual(g.structure_hash, clone.structure_hash)
+        self.assertNotEqual(g.parameter_hash, clone.parameter_hash)
+        cg = cg.copy()
+        cg.enabled = False
+        clone.add_connection_gene(cg)
+        self.assertNotEqual(g.structure_hash, clone.structure_hash)
+
+        # Removing and re-adding a gene restores the hashes.
+        key = next(iter(g.connections))
+        cg = g.connections[key]
+        hashes = (g.structure_hash, g.parameter_hash)
+        g.remove_connection_gene(key)
+        self.assertNotEqual(hashes, (g.structure_hash, g.parameter_hash))
+        g.add_connection_gene(cg)
+        self.assertEqual(hashes, (g.structure_hash, g.parameter_hash))
+
+        # Unpickled genomes get their hashes recomputed.
+        self.assertNotIn('structure_hash', g.__getstate__())
+        g = pickle.loads(pickle.dumps(g))
+        self.assertEqual(hashes, (g.structure_hash, g.parameter_hash))
+
+        # Mutation and crossover leave the hashes to be computed when they are looked up.
+        config = self.config.genome_config
+        clone.fitness = 0.0
+        child = neat.DefaultGenome(101)
+        child.configure_crossover(g, clone, config)
+        self.assertIsNone(child._hashes)
+        child.mutate(config)
+        self.assertIsNone(child._hashes)
+        self.assertEqual((child.structure_hash, child.parameter_hash), child.compute_hashes())
+        self.assertIsNotNone(child._hashes)
+
+    def test_slots(self):
+        random.seed(10)
+        genomes = self.evolve_genomes(count=5, generations=5)
+        g = genomes[0]
+        self.assertFalse(hasattr(g, '__dict__'))
+        self.assertFalse(hasattr(neat.iznn.IZGenome(0), '__dict__'))
+        self.assertFalse(hasattr(neat.species.Species(1, 0), '__dict__'))
+
+        # Subclasses that do not define __slots__ keep their extra attributes.
+        t = TaggedGenome(0)
+        for name in neat.DefaultGenome.__slots__:
+            setattr(t, name, getattr(g, name))
+        t.tag = 'a'
+        # The adjacency index and topological order are rebuilt rather than pickled.
+        for name in ('incoming', 'outgoing', 'node_order'):
+            self.assertNotIn(name, g.__getstate__())
+        for protocol in range(pickle.HIGHEST_PROTOCOL + 1):
+            h = pickle.loads(pickle.dumps(g, protocol))
+            self.assertEqual(str(h), str(g))
+            self.check_adjacency(h)
+            self.check_acyclic(h)
+            self.assertEqual(g.node_order is None, h.node_order is None)
+        h = pickle.loads(pickle.dumps(t))
+        self.assertEqual((str(h), h.tag), (str(g), 'a'))
+
+        s = neat.species.Species(1, 3)
+        s.update(g, {g.key: g})
+        s = pickle.loads(pickle.dumps(s))
+        self.assertEqual((s.key, s.created, list(s.members)), (1, 3, [g.key]))
+
+    def test_baseline_pickle(self):
+        # A genome pickled before DefaultGenome had __slots__ or an adjacency index.
+        path = os.path.join(os.path.dirname(__file__), 'baseline_genome.pickle')
+        with open(path, 'rb') as f:
+            g = pickle.load(f)
+        self.assertEqual((g.key, g.fitness, g.size()), (1, 0.5, (2, 5)))
+        self.check_adjacency(g)
+        self.check_acyclic(g)
+        for i, o in iterkeys(g.connections):
+            self.assertLess(g.node_order.rank[i], g.node_order.rank[o])
+        self.assertEqual((g.structure_hash, g.parameter_hash), g.compute_hashes())
+
+        # The output computed when it was pickled.
+        net = neat.nn.FeedForwardNetwork.create(g, self.config)
+        self.assertAlmostEqual(net.activate([0.5, -0.25])[0], 0.9998921518893068)
+
+        random.seed(14)
+        config = self.config.genome_config
+        config.node_indexer = None
+        for _ in range(20):
+            g.mutate(config)
+        self.check_adjacency(g)
+        self.check_acyclic(g)
+        self.assertEqual((g.structure_hash, g.parameter_hash), g.compute_hashes())
+        neat.nn.FeedForwardNetwork.create(g, self.config).activate([0.5, -0.25])
+
+    @unittest.skipIf(not neat.genome.HAVE_NUMPY, "NumPy is not available.")
+    def test_bulk_mutation(self):
+        self.config.genome_config.bulk_mutation = True
+        random.seed(11)
+        genomes = self.evolve_genomes(count=10, generations=10)
+        config = self.config.genome_config
+        config.node_indexer = None
+        config._bulk_rng = None
+        random.seed(11)
+        again = self.evolve_genomes(count=10, generations=10)
+        for g, h in zip(genomes, again):
+            # Bulk mutation is repeated by seeding only the random module.
+            self.assertEqual(str(g), str(h))
+            self.assertEqual((g.structure_hash, g.parameter_hash), g.compute_hashes())
+            for cg in g.connections.values():
+                self.assertIs(type(cg.weight), float)
+                self.assertTrue(config.weight_min_value <= cg.weight <= config.weight_max_value)
+            for ng in g.nodes.values():
+                self.assertTrue(config.bias_min_value <= ng.bias <= config.bias_max_value)
+
+    def test_innovation_tracking(self):
+        random.seed(12)
+        config = self.config.genome_config
+        config.initial_connection = 'full_direct'
+        config.num_hidden = 0
+        parent = neat.DefaultGenome(0)
+        parent.configure_new(config)
+        parent.fitness = 0.0
+
+        def split_all(tracking):
+            config.innovation_tracking = tracking
+            config.reset_innovations()
+            keys = set()
+            for key in range(20):
+                g = neat.DefaultGenome(key)
+                g.configure_crossover(parent, parent, config)
+                g.mutate_add_node(config)
+                new_key, = set(g.nodes) - set(parent.nodes)
+                # The split connection's new node has its key.
+                i, o = next(k for k, cg in g.connections.items() if not cg.enabled)
+                self.assertIn((i, new_key), g.connections)
+                self.assertIn((new_key, o), g.connections)
+                keys.add(((i, o), new_key))
+                self.assertEqual((g.structure_hash, g.parameter_hash), g.compute_hashes())
+            return keys
+
+        # Without tracking every split gets a new key.
+        self.assertEqual(len(set(k for c, k in split_all(False))), 20)
+
+        # With tracking, splits of the same connection share a key, and different ones do not.
+        splits = split_all(True)
+        self.assertEqual(len(splits), len(set(c for c, k in splits)))
+        self.assertEqual(len(splits), len(set(k for c, k in splits)))
+        self.assertLess(len(splits), 20)
+
+        # A genome that already has the registered key gets a new one.
+        (i, o), node_key = next(iter(splits))
+        g = neat.DefaultGenome(100)
+        g.configure_crossover(parent, parent, config)
+        g.add_node_gene(g.create_node(config, node_key))
+        self.assertNotEqual(config.get_split_node_key(g.nodes, (i, o)), node_key)
+
+        # Reproduction starts each generation with an empty registry.
+        resets = []
+        reset_innovations = config.reset_innovations
+        config.reset_innovations = lambda: resets.append(reset_innovations())
+        self.config.no_fitness_termination = True
+        population = neat.Population(self.config)
+        population.run(lambda genomes, c: [setattr(g, 'fitness', random.random()) for k, g in genomes], 3)
+        self.assertEqual(len(resets), 3)
+
+    def test_recurrent_genome_drops_order(self):
+        self.config.genome_config.feed_forward = False
+        self.config.genome_config.initial_connection = 'full_direct'
+        g = neat.DefaultGenome(0)
+        g.configure_new(self.config.genome_config)
+        # Full connections for recurrent genomes include self-connections.
+        self.assertIsNone(g.node_order)
+
+
 if __name__ == '__main__':
     unittest.main()
@@ -1,11 +1,75 @@
 import random
-from neat.graphs import creates_cycle, required_for_output, feed_forward_layers
+from neat.graphs import (creates_cycle, path_exists, required_for_output, feed_forward_layers,
+                         feed_forward_sequence, TopologicalOrder)
 
 
 def assert_almost_equal(x, y, tol):
     assert abs(x - y) < tol, "{!r} !~= {!r}".format(x, y)
 
 
+def reference_required_for_output(inputs, outputs, connections):
+    """The original fixed-point implementation of required_for_output."""
+    required = set(outputs)
+    s = set(outputs)
+    while 1:
+        t = set(a for (a, b) in connections if b in s and a not in s)
+        if not t:
+            break
+
+        layer_nodes = set(x for x in t if x not in inputs)
+        if not layer_nodes:
+            break
+
+        required = required.union(layer_nodes)
+        s = s.union(t)
+
+    return required
+
+
+def reference_feed_forward_layers(inputs, outputs, connections):
+    """The original rescanning implementation of feed_forward_layers."""
+    required = reference_required_for_output(inputs, outputs, connections)
+
+    layers = []
+    s = set(inputs)
+    while 1:
+        c = set(b for (a, b) in connections if a in s and b not in s)
+        t = set()
+        for n in c:
+            if n in required and all(a in s for (a, b) in connections if b == n):
+                t.add(n)
+
+        if not t:
+            break
+
+        layers.append(t)
+        s = s.union(t)
+
+    return layers
+
+
+def random_graph():
+    n_hidden = random.randint(10, 100)
+    n_in = random.randint(1, 10)
+    n_out = random.randint(1, 10)
+    nodes = list(set(random.randint(0, 1000) for _ in range(n_in + n_out + n_hidden)))
+    random.shuffle(nodes)
+
+    inputs = nodes[:n_in]
+    outputs = nodes[n_in:n_in + n_out]
+    connections = []
+    for _ in range(n_hidden * 2):
+        a = random.choice(nodes)
+        b = random.choice(nodes)
+        if a in inputs and b in inputs:
+            continue
+        if a in outputs and b in outputs:
+            continue
+        connections.append((a, b))
+
+    return inputs, outputs, connections
+
+
 def test_creates_cycle():
     assert creates_cycle([(0, 1), (1, 2), (2, 3)], (0, 0))
 
@@ -22,6 +86,30 @@ def test_creates_cycle():
     assert not creates_cycle([(0, 2), (1, 3), (2, 3), (4, 2)], (4, 3))
 
 
+def test_path_exists():
+    outgoing = {0: [1], 1: [2], 2: [3], 4: [2]}
+    assert path_exists(outgoing, 0, 0)
+    assert path_exists(outgoing, 0, 3)
+    assert path_exists(outgoing, 4, 3)
+    assert not path_exists(outgoing, 3, 0)
+    assert not path_exists(outgoing, 0, 4)
+    assert not path_exists(outgoing, 5, 0)
+
+    # A connection creates a cycle exactly when its input is reachable from its output.
+    for _ in range(200):
+        inputs, outputs, connections = random_graph()
+        connections = [(a, b) for a, b in connections if not creates_cycle(connections, (a, b))]
+        if not connections:
+            continue
+        outgoing = {}
+        for a, b in connections:
+            outgoing.setdefault(a, []).append(b)
+        for _ in range(10):
+            a, b = random.choice(connections)
+            test = (b, a) if random.random() < 0.5 else (a, random.choice(outputs))
+            assert creates_cycle(connections, test) == path_exists(outgoing, test[1], test[0])
+
+
 def test_required_for_output():
     inputs = [0, 1]
     outputs = [2]
@@ -151,9 +239,77 @@ def test_fuzz_feed_forward_layers():
         feed_forward_layers(inputs, outputs, connections)
 
 
+def test_fuzz_matches_reference():
+    for _ in range(1000):
+        inputs, outputs, connections = random_graph()
+        assert (reference_required_for_output(inputs, outputs, connections) ==
+                required_for_output(inputs, outputs, connections))
+        assert (reference_feed_forward_layers(inputs, outputs, connections) ==
+                feed_forward_layers(inputs, outputs, connections))
+
+
+def test_topological_order():
+    for _ in range(200):
+        inputs, outputs, connections = random_graph()
+        order = TopologicalOrder()
+        outgoing = {}
+        incoming = {}
+        accepted = []
+        for a, b in connections:
+            if (a, b) in accepted:
+                continue
+            cycle = a == b or path_exists(outgoing, b, a)
+            assert order.creates_cycle(outgoing, a, b) == cycle
+            assert order.add_connection(outgoing, incoming, a, b) == (not cycle)
+            if cycle:
+                continue
+            accepted.append((a, b))
+            outgoing.setdefault(a, set()).add(b)
+            incoming.setdefault(b, set()).add(a)
+            for i, o in accepted:
+                assert order.rank[i] < order.rank[o]
+
+        # An order built from scratch also ranks every connection, unless there is a cycle.
+        built = TopologicalOrder.from_adjacency(outgoing, incoming)
+        assert set(built.rank) == set(order.rank)
+        for i, o in accepted:
+            assert built.rank[i] < built.rank[o]
+        if accepted:
+            i, o = accepted[-1]
+            cyclic = dict((n, set(s)) for n, s in outgoing.items())
+            cyclic.setdefault(o, set()).add(i)
+            reverse = dict((n, set(s)) for n, s in incoming.items())
+            reverse.setdefault(i, set()).add(o)
+            assert TopologicalOrder.from_adjacency(cyclic, reverse) is None
+
+        # The sequence holds the same nodes as the layers, in an order consistent with them.
+        layers = feed_forward_layers(inputs, outputs, accepted)
+        sequence = feed_forward_sequence(inputs, outputs, accepted, order.rank)
+        assert set(sequence) == set().union(*layers) if layers else not sequence
+        position = dict((n, k) for k, n in enumerate(sequence))
+        for i, o in accepted:
+            if i in position and o in position:
+                assert position[i] < position[o]
+
+        # A rank that does not cover or order every connection falls back to the layers.
+        internal = [(a, b) for a, b in accepted if a not in inputs and b not in inputs]
+        if internal:
+            a, b = internal[0]
+            unordered = dict(order.rank)
+            unordered[b] = unordered[a]
+            missing = dict(order.rank)
+            del missing[b]
+            for rank in (unordered, missing):
+                sequence = feed_forward_sequence(inputs, outputs, accepted, rank)
+                assert sequence == [n for layer in layers for n in layer]
+
+
 if __name__ == '__main__':
     test_creates_cycle()
+    test_path_exists()
     test_required_for_output()
     test_fuzz_required()
     test_feed_forward_layers()
     test_fuzz_feed_forward_layers()
+    test_fuzz_matches_reference()
+    test_topological_order()
@@ -1,5 +1,10 @@
 import os
+import random
+import unittest
+
 import neat
+from neat.iznn.vectorized import VectorizedIZNN
+from neat.nn.vectorized import HAVE_NUMPY
 
 
 def test_basic():
@@ -25,6 +30,243 @@ def test_network():
     net.advance(0.25)
     net.advance(0.25)
 
+
+def random_iznn_genomes(count, mutations=10, delays=False):
+    local_dir = os.path.dirname(__file__)
+    config = neat.Config(neat.iznn.IZGenome, neat.DefaultReproduction,
+                         neat.DefaultSpeciesSet, neat.DefaultStagnation,
+                         os.path.join(local_dir, 'test_configuration_iznn'))
+    config.genome_config.num_hidden = 3
+    config.genome_config.initial_connection = 'full_direct'
+    if delays:
+        config.genome_config.delay_init_mean = 1.0
+        config.genome_config.delay_init_stdev = 1.0
+        config.genome_config.delay_max_value = 3.0
+        config.genome_config.delay_mutate_rate = 0.5
+        config.genome_config.delay_mutate_power = 0.5
+    genomes = []
+    for key in range(count):
+        g = neat.iznn.IZGenome(key)
+        g.configure_new(config.genome_config)
+        for _ in range(mutations):
+            g.mutate(config.genome_config)
+        genomes.append(g)
+    return config, genomes
+
+
+@unittest.skipIf(not HAVE_NUMPY, "NumPy is not available.")
+def test_vectorized_spike_trains():
+    random.seed(11)
+    config, genomes = random_iznn_genomes(20)
+    num_spikes = 0
+    for g in genomes:
+        net = neat.iznn.IZNN.create(g, config)
+        vnet = neat.iznn.IZNN.create(g, config, backend='numpy')
+        assert isinstance(vnet, VectorizedIZNN)
+        for _ in range(2):
+            inputs = [random.uniform(0.0, 20.0) for _ in config.genome_config.input_keys]
+            net.reset()
+            vnet.reset()
+            net.set_inputs(inputs)
+            vnet.set_inputs(inputs)
+            for _ in range(400):
+                output = net.advance(0.25)
+                assert vnet.advance(0.25) == output
+                num_spikes += sum(output)
+            # v ** 2 is v * v in NumPy, which may differ from the C library's pow in the last bit.
+            for key, n in net.neurons.items():
+                assert abs(vnet.v[vnet.neuron_index[key]] - n.v) < 1e-6
+                assert abs(vnet.u[vnet.neuron_index[key]] - n.u) < 1e-6
+
+    assert num_spikes > 0
+
+    try:
+        vnet.set_inputs([0.0])
+    except RuntimeError:
+        pass
+    else:
+        raise Exception("Wrong number of inputs was not detected")
+
+@unittest.skipIf(not HAVE_NUMPY, "NumPy is not available.")
+def test_advance_many():
+    import numpy as np
+
+    random.seed(12)
+    config, genomes = random_iznn_genomes(5)
+    num_inputs = len(config.genome_config.input_keys)
+    schedule = np.array([[random.uniform(0.0, 20.0) for _ in range(num_inputs)] for _ in range(300)])
+    for g in genomes:
+        for backend in ('python', 'numpy'):
+            net = neat.iznn.IZNN.create(g, config, backend=backend)
+            expected = []
+            expected_v = []
+            for row in schedule:
+                net.set_inputs(row.tolist())
+                expected.append(net.advance(0.25))
+                if backend == 'python':
+                    expected_v.append([n.v for n in net.neurons.values()])
+                else:
+                    expected_v.append(net.v.tolist())
+
+            net.reset()
+            spikes = np.zeros((len(schedule), len(net.neurons)))
+            state = np.zeros((len(schedule), 2, len(net.neurons)))
+            outputs = net.advance_many(len(schedule), schedule, 0.25, spikes=spikes, state=state)
+            assert outputs.tolist() == expected
+            assert state[:, 0].tolist() == expected_v
+            keys = list(net.neurons)
+            for n, k in enumerate(net.outputs):
+                assert spikes[:, keys.index(k)].tolist() == outputs[:, n].tolist()
+
+            # Constant inputs are held for every step.
+            net.reset()
+            buffer = np.zeros((10, len(net.outputs)))
+            assert net.advance_many(10, schedule[0], 0.25, outputs=buffer) is buffer
+            net.reset()
+            net.set_inputs(schedule[0].tolist())
+            assert buffer.tolist() == [net.advance(0.25) for _ in range(10)]
+
+            try:
+                net.advance_many(10, schedule, 0.25)
+            except RuntimeError:
+                pass
+            else:
+                raise Exception("Wrong input schedule shape was not detected")
+
+
+@unittest.skipIf(not HAVE_NUMPY, "NumPy is not available.")
+def test_event_driven():
+    random.seed(13)
+    config, genomes = random_iznn_genomes(20)
+    num_spikes = 0
+    for g in genomes:
+        dense = VectorizedIZNN.create(g, config)
+        event = VectorizedIZNN.create(g, config, event_driven=True)
+        for _ in range(2):
+            inputs = [random.uniform(0.0, 20.0) for _ in config.genome_config.input_keys]
+            dense.reset()
+            event.reset()
+            dense.set_inputs(inputs)
+            event.set_inputs(inputs)
+            for _ in range(400):
+                output = dense.advance(0.25)
+                assert event.advance(0.25) == output
+                for a, b in zip(dense.current, event.current):
+                    assert abs(a - b) < 1e-9
+                num_spikes += sum(output)
+
+    assert num_spikes > 0
+
+
+@unittest.skipIf(not HAVE_NUMPY, "NumPy is not available.")
+def test_event_driven_sync():
+    # The accumulated currents are recomputed on reset and every sync_interval steps,
+    # after which they are exactly those of the dense computation.
+    random.seed(15)
+    config, genomes = random_iznn_genomes(10)
+    for g in genomes:
+        dense = VectorizedIZNN.create(g, config)
+        event = VectorizedIZNN.create(g, config, event_driven=True, sync_interval=5)
+        inputs = [random.uniform(0.0, 20.0) for _ in config.genome_config.input_keys]
+        for n in (dense, event):
+            n.reset()
+            n.set_inputs(inputs)
+        assert event.steps_since_sync == 0
+        for t in range(100):
+            assert event.advance(0.25) == dense.advance(0.25)
+            if t % 5 == 0:
+                assert event.current.tolist() == dense.current.tolist()
+            else:
+                for a, b in zip(dense.current, event.current):
+                    assert abs(a - b) < 1e-9
+        event.reset()
+        assert event.steps_since_sync == 0
+
+
+def test_propagation_delays():
+    p = neat.iznn.REGULAR_SPIKING_PARAMS
+    backends = [neat.iznn.IZNN]
+    if HAVE_NUMPY:
+        backends.append(VectorizedIZNN)
+
+    # A spike from neuron 0 reaches neuron 1 the number of time steps closest to the delay later.
+    for backend in backends:
+        arrivals = []
+        for delay in (0.0, 1.0, 2.1):
+            neurons = {0: neat.iznn.IZNeuron(0, p['a'], p['b'], p['c'], p['d'], [(-1, 100.0)]),
+                       1: neat.iznn.IZNeuron(0, p['a'], p['b'], p['c'], p['d'], [(0, 5.0)])}
+            net = backend(neurons, [-1], [1], delays={(0, 1): delay})
+            net.set_inputs([1.0])
+            for step in range(200):
+                net.advance(0.25)
+                current = net.neurons[1].current if backend is neat.iznn.IZNN else net.current[net.neuron_index[1]]
+                if current:
+                    assert current == 5.0
+                    arrivals.append(step)
+                    break
+        assert arrivals[1] == arrivals[0] + 4
+        assert arrivals[2] == arrivals[0] + 8
+
+    # Genomes without delay configuration items have undelayed connections.
+    config, genomes = random_iznn_genomes(1)
+    assert all(cg.delay == 0.0 for cg in genomes[0].connections.values())
+    assert not neat.iznn.IZNN.create(genomes[0], config).delays
+
+
+@unittest.skipIf(not HAVE_NUMPY, "NumPy is not available.")
+def test_vectorized_propagation_delays():
+    random.seed(14)
+    config, genomes = random_iznn_genomes(20, delays=True)
+    num_spikes = 0
+    for g in genomes:
+        net = neat.iznn.IZNN.create(g, config)
+        assert net.delays
+        dense = VectorizedIZNN.create(g, config)
+        event = VectorizedIZNN.create(g, config, event_driven=True)
+        for dt_msec in (0.25, 0.5):
+            inputs = [random.uniform(0.0, 20.0) for _ in config.genome_config.input_keys]
+            for n in (net, dense, event):
+                n.reset()
+                n.set_inputs(inputs)
+            for _ in range(400):
+                output = net.advance(dt_msec)
+                assert dense.advance(dt_msec) == output
+                assert event.advance(dt_msec) == output
+                for a, b in zip(dense.current, event.current):
+                    assert abs(a - b) < 1e-9
+                num_spikes += sum(output)
+            for key, n in net.neurons.items():
+                assert abs(dense.v[dense.neuron_index[key]] - n.v) < 1e-6
+                assert abs(dense.u[dense.neuron_index[key]] - n.u) < 1e-6
+
+    assert num_spikes > 0
+
+
+@unittest.skipIf(not HAVE_NUMPY, "NumPy is not available.")
+def test_precision():
+    import numpy as np
+
+    random.seed(14)
+    config, genomes = random_iznn_genomes(20)
+    for precision, tol in (('float32', 0.01), ('float16', 0.05)):
+        num_spikes = 0
+        delta = 0
+        for g in genomes:
+            net64 = VectorizedIZNN.create(g, config)
+            net = VectorizedIZNN.create(g, config, precision=precision)
+            assert net.v.dtype == precision and net.edge_weights.dtype == precision
+            inputs = [random.uniform(0.0, 20.0) for _ in config.genome_config.input_keys]
+            expected = np.zeros((400, len(net.neuron_keys)))
+            spikes = np.zeros((400, len(net.neuron_keys)), dtype=precision)
+            net64.advance_many(400, inputs, 0.25, spikes=expected)
+            net.advance_many(400, inputs, 0.25, spikes=spikes)
+            num_spikes += expected.sum()
+            delta += abs(expected.sum(axis=0) - spikes.sum(axis=0)).sum()
+        print("{0}: {1:n} of {2:n} spike counts differ from float64".format(precision, delta, num_spikes))
+        assert num_spikes > 0
+        assert delta <= tol * num_spikes
+
+
 # # TODO: Update this test to work with the current implementation.
 # # def test_iznn_evolve():
 # #     """This is a stripped-down copy of the XOR2 spiking example."""
@@ -139,3 +381,10 @@ def test_network():
 if __name__ == '__main__':
     test_basic()
     test_network()
+    test_vectorized_spike_trains()
+    test_advance_many()
+    test_event_driven()
+    test_event_driven_sync()
+    test_propagation_delays()
+    test_vectorized_propagation_delays()
+    test_precision()
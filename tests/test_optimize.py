@@ -0,0 +1,85 @@
+import random
+
+from neat import activations
+from neat.aggregations import sum_aggregation, max_aggregation
+from neat.nn import FeedForwardNetwork, CompiledFeedForwardNetwork
+from neat.nn.optimize import optimize_network, optimize_node_evals
+
+import helpers
+from helpers import random_genomes
+
+
+def assert_almost_equal(x, y, tol):
+    assert abs(x - y) < tol, "{!r} !~= {!r}".format(x, y)
+
+
+def load_config():
+    return helpers.load_config(activation_options=['identity', 'sigmoid', 'tanh', 'relu'],
+                               aggregation_options=['sum', 'sum', 'sum', 'max', 'product'])
+
+
+def test_passes():
+    identity = activations.identity_activation
+    sigmoid = activations.sigmoid_activation
+    node_evals = [
+        # A relay: fused into node 0.
+        (1, identity, sum_aggregation, 0.5, 2.0, [(-1, 1.5)]),
+        # Only a zero-weight input: folded into a constant.
+        (2, sigmoid, sum_aggregation, 0.25, 1.0, [(-2, 0.0)]),
+        # Parallel edges to -1 once node 1 is fused, and a constant input.
+        (0, sigmoid, sum_aggregation, 0.0, 1.0, [(-1, 1.0), (1, -0.5), (2, 2.0)]),
+        # Not needed for the output.
+        (3, sigmoid, sum_aggregation, 0.0, 1.0, [(-2, 1.0)]),
+        # Non-sum nodes are left alone.
+        (4, sigmoid, max_aggregation, 0.0, 1.0, [(-1, 0.0), (2, 1.0)])]
+    new_evals, stats = optimize_node_evals([-1, -2], [0, 4], node_evals)
+    assert [ne[0] for ne in new_evals] == [2, 0, 4]
+    assert new_evals[1][5] == [(-1, 1.0 - 0.5 * 2.0 * 1.5)]
+    assert stats == {'edges_dropped': 1, 'edges_merged': 1, 'nodes_folded': 1, 'nodes_fused': 1,
+                     'nodes_removed': 2, 'edges_removed': 5}
+
+    net = FeedForwardNetwork([-1, -2], [0, 4], node_evals)
+    optimized, stats = optimize_network(net)
+    assert isinstance(optimized, FeedForwardNetwork)
+    for inputs in ([0.0, 0.0], [0.3, -0.7], [-1.5, 2.0]):
+        for x, y in zip(net.activate(inputs), optimized.activate(inputs)):
+            assert_almost_equal(x, y, 1e-12)
+
+
+def check_networks(config, genomes, epsilon, tol):
+    removed = 0
+    for g in genomes:
+        net = FeedForwardNetwork.create(g, config)
+        optimized, stats = optimize_network(net, epsilon)
+        assert len(optimized.node_evals) == len(net.node_evals) - stats['nodes_removed']
+        removed += stats['nodes_removed'] + stats['edges_removed']
+
+        compiled, ignored_stats = optimize_network(CompiledFeedForwardNetwork(net.input_nodes, net.output_nodes,
+                                                                              net.node_evals), epsilon)
+        for _ in range(10):
+            inputs = [random.uniform(-2.0, 2.0) for _ in config.genome_config.input_keys]
+            expected = net.activate(inputs)
+            for x, y, z in zip(expected, optimized.activate(inputs), compiled.activate(inputs)):
+                assert_almost_equal(x, y, tol)
+                assert_almost_equal(y, z, 1e-12)
+    return removed
+
+
+def test_exact():
+    random.seed(2021)
+    config = load_config()
+    assert check_networks(config, random_genomes(config, 40), 0.0, 1e-9) > 0
+
+
+def test_epsilon():
+    random.seed(2022)
+    config = load_config()
+    genomes = random_genomes(config, 40)
+    exact = check_networks(config, genomes, 0.0, 1e-9)
+    assert check_networks(config, genomes, 0.01, 0.2) > exact
+
+
+if __name__ == '__main__':
+    test_passes()
+    test_exact()
+    test_epsilon()
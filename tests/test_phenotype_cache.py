@@ -0,0 +1,129 @@
+import copy
+import random
+
+import neat
+from neat.phenotype_cache import PhenotypeCache, genome_fingerprint, genome_hashes, estimate_size
+
+from helpers import load_config, random_genomes
+
+
+def test_fingerprint():
+    random.seed(21)
+    config = load_config()
+    g = random_genomes(config, 1, mutations=10)[0]
+    clone = copy.deepcopy(g)
+    clone.key = 2
+    assert genome_fingerprint(g) == genome_fingerprint(clone)
+
+    # Crossover of a genome with itself gives a clone.
+    g.fitness = 1.0
+    child = neat.DefaultGenome(3)
+    child.configure_crossover(g, g, config.genome_config)
+    assert genome_fingerprint(g) == genome_fingerprint(child)
+
+    # Disabled connections do not affect the phenotype.
+    cg = next(iter(clone.connections.values()))
+    cg.enabled = False
+    disabled = genome_fingerprint(clone)
+    assert disabled != genome_fingerprint(g)
+    cg.weight += 1.0
+    assert genome_fingerprint(clone) == disabled
+
+    cg.enabled = True
+    assert genome_fingerprint(clone) != genome_fingerprint(g)
+
+
+def test_lru():
+    random.seed(22)
+    config = load_config()
+    genomes = random_genomes(config, 3, mutations=10)
+    cache = PhenotypeCache(max_entries=2, fingerprint=genome_fingerprint)
+
+    net = cache.create(neat.nn.FeedForwardNetwork, genomes[0], config)
+    assert cache.create(neat.nn.FeedForwardNetwork, copy.deepcopy(genomes[0]), config) is net
+    assert (cache.hits, cache.misses) == (1, 1)
+
+    # Other network types and arguments are cached separately.
+    recurrent = cache.create(neat.nn.RecurrentNetwork, genomes[0], config)
+    assert isinstance(recurrent, neat.nn.RecurrentNetwork)
+    assert (cache.hits, cache.misses, len(cache)) == (1, 2, 2)
+
+    # The least recently used entry (the feed-forward network) is evicted.
+    cache.create(neat.nn.FeedForwardNetwork, genomes[1], config)
+    assert cache.evictions == 1
+    assert cache.create(neat.nn.RecurrentNetwork, genomes[0], config) is recurrent
+    assert cache.create(neat.nn.FeedForwardNetwork, genomes[0], config) is not net
+    assert cache.get_stats() == {'hits': 2, 'misses': 4, 'evictions': 2, 'entries': 2, 'bytes': 0}
+
+    cache.clear()
+    assert not len(cache)
+
+
+def test_identity():
+    # By default only the same genome object finds its phenotype.
+    random.seed(26)
+    config = load_config()
+    g = random_genomes(config, 1, mutations=10)[0]
+    cache = PhenotypeCache()
+
+    net = cache.create(neat.nn.FeedForwardNetwork, g, config)
+    assert cache.create(neat.nn.FeedForwardNetwork, g, config) is net
+    assert cache.create(neat.nn.FeedForwardNetwork, copy.deepcopy(g), config) is not net
+    assert (cache.hits, cache.misses) == (1, 2)
+
+
+def test_genome_hashes():
+    random.seed(25)
+    config = load_config()
+    g = random_genomes(config, 1, mutations=10)[0]
+    cache = PhenotypeCache(fingerprint=genome_hashes)
+
+    net = cache.create(neat.nn.FeedForwardNetwork, g, config)
+    assert cache.create(neat.nn.FeedForwardNetwork, copy.deepcopy(g), config) is net
+    g.mutate(config.genome_config)
+    assert cache.create(neat.nn.FeedForwardNetwork, g, config) is not net
+    assert (cache.hits, cache.misses) == (1, 2)
+
+
+def test_reset_on_hit():
+    random.seed(23)
+    config = load_config()
+    config.genome_config.feed_forward = False
+    g = random_genomes(config, 1, mutations=10)[0]
+    cache = PhenotypeCache()
+    inputs = [0.5, -0.5]
+
+    net = cache.create(neat.ctrnn.CTRNN, g, config, 0.01)
+    expected = [net.advance(inputs, 0.1, 0.01) for _ in range(5)]
+    assert cache.create(neat.ctrnn.CTRNN, g, config, 0.02) is not net
+    assert cache.create(neat.ctrnn.CTRNN, g, config, 0.01) is net
+    assert [net.advance(inputs, 0.1, 0.01) for _ in range(5)] == expected
+
+
+def test_memory_eviction():
+    random.seed(24)
+    config = load_config()
+    genomes = random_genomes(config, 10, mutations=10)
+    size = estimate_size(neat.nn.FeedForwardNetwork.create(genomes[0], config))
+    assert size > 0
+
+    cache = PhenotypeCache(max_bytes=3 * size)
+    for g in genomes:
+        cache.create(neat.nn.FeedForwardNetwork, g, config)
+        assert cache.total_bytes <= cache.max_bytes
+    assert 0 < len(cache) < len(genomes)
+    assert cache.evictions == len(genomes) - len(cache)
+
+    # A phenotype larger than the limit is returned but not kept.
+    cache = PhenotypeCache(max_bytes=1)
+    assert cache.create(neat.nn.FeedForwardNetwork, genomes[0], config) is not None
+    assert not len(cache)
+
+
+if __name__ == '__main__':
+    test_fingerprint()
+    test_lru()
+    test_identity()
+    test_genome_hashes()
+    test_reset_on_hit()
+    test_memory_eviction()
@@ -54,6 +54,18 @@ def test_basic():
     assert result[0] == r.values[0][0]
 
 
+def test_values():
+    # Setting a node's value in the current step changes the next step's output.
+    node_evals = [(0, activations.identity_activation, sum, 0.0, 1.0, [(0, 0.5)])]
+    r = RecurrentNetwork([], [0], node_evals)
+    r.values[r.active][0] = 2.0
+    assert r.activate([]) == [1.0]
+    r.reset()
+    assert r.values[0][0] == r.values[1][0] == 0.0
+    assert r.activate([]) == [0.0]
+
+
 if __name__ == '__main__':
     test_unconnected()
     test_basic()
+    test_values()
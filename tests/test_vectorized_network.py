@@ -0,0 +1,257 @@
+import random
+import unittest
+
+from neat import activations
+from neat.nn import (FeedForwardNetwork, RecurrentNetwork, VectorizedFeedForwardNetwork,
+                     VectorizedRecurrentNetwork, PopulationFeedForwardNetwork)
+from neat.nn.vectorized import HAVE_NUMPY
+
+from helpers import load_config, random_genomes
+
+
+def assert_almost_equal(x, y, tol):
+    assert abs(x - y) < tol, "{!r} !~= {!r}".format(x, y)
+
+
+def assert_close(x, y, tol):
+    assert abs(x - y) <= tol * max(1.0, abs(x), abs(y)), "{!r} !~= {!r}".format(x, y)
+
+
+@unittest.skipIf(not HAVE_NUMPY, "NumPy is not available.")
+def test_basic():
+    node_evals = [(0, activations.sigmoid_activation, sum, 0.0, 1.0, [(-1, 1.0)])]
+    r = VectorizedFeedForwardNetwork([-1], [0], node_evals)
+
+    result = r.activate([0.2])
+    assert_almost_equal(result[0], 0.731, 0.001)
+
+    result = r.activate([0.4])
+    assert_almost_equal(result[0], 0.881, 0.001)
+
+
+@unittest.skipIf(not HAVE_NUMPY, "NumPy is not available.")
+def test_unconnected():
+    r = VectorizedFeedForwardNetwork([-1], [0], [])
+    assert r.activate([1.0]) == [0.0]
+
+
+@unittest.skipIf(not HAVE_NUMPY, "NumPy is not available.")
+def test_bad_input():
+    r = VectorizedFeedForwardNetwork([-1, -2], [0], [])
+    try:
+        r.activate([1.0])
+    except RuntimeError:
+        pass
+    else:
+        raise Exception("Wrong number of inputs was not detected")
+
+
+@unittest.skipIf(not HAVE_NUMPY, "NumPy is not available.")
+def test_matches_python_network():
+    random.seed(2017)
+    config = load_config()
+    for g in random_genomes(config, 40):
+        net = FeedForwardNetwork.create(g, config)
+        vnet = FeedForwardNetwork.create(g, config, backend='numpy')
+        assert isinstance(vnet, VectorizedFeedForwardNetwork)
+        for _ in range(5):
+            inputs = [random.uniform(-2.0, 2.0) for _ in config.genome_config.input_keys]
+            for a, b in zip(net.activate(inputs), vnet.activate(inputs)):
+                assert_close(a, b, 1e-9)
+
+
+@unittest.skipIf(not HAVE_NUMPY, "NumPy is not available.")
+def test_activate_batch():
+    random.seed(2018)
+    config = load_config()
+    num_inputs = len(config.genome_config.input_keys)
+    batch = [[random.uniform(-2.0, 2.0) for _ in range(num_inputs)] for _ in range(16)]
+    for g in random_genomes(config, 40):
+        net = FeedForwardNetwork.create(g, config)
+        vnet = VectorizedFeedForwardNetwork.create(g, config)
+        expected = [net.activate(row) for row in batch]
+        result = vnet.activate_batch(batch)
+        assert result.shape == (len(batch), len(config.genome_config.output_keys))
+        # FeedForwardNetwork.activate_batch delegates to a VectorizedFeedForwardNetwork.
+        assert (net.activate_batch(batch) == result).all()
+        for erow, row in zip(expected, result):
+            for a, b in zip(erow, row):
+                assert_close(a, b, 1e-9)
+
+    try:
+        vnet.activate_batch([[0.0] * (num_inputs + 1)])
+    except RuntimeError:
+        pass
+    else:
+        raise Exception("Wrong number of inputs was not detected")
+
+
+@unittest.skipIf(not HAVE_NUMPY, "NumPy is not available.")
+def test_population_lockstep():
+    random.seed(2019)
+    config = load_config()
+    genomes = [(g.key, g) for g in random_genomes(config, 40)]
+    nets = [FeedForwardNetwork.create(g, config) for gid, g in genomes]
+    pnet = PopulationFeedForwardNetwork.create(genomes, config)
+    num_inputs = len(config.genome_config.input_keys)
+    for _ in range(5):
+        inputs = [[random.uniform(-2.0, 2.0) for _ in range(num_inputs)] for _ in genomes]
+        result = pnet.activate(inputs)
+        assert result.shape == (len(genomes), len(config.genome_config.output_keys))
+        for net, xi, row in zip(nets, inputs, result):
+            for a, b in zip(net.activate(xi), row):
+                assert_close(a, b, 1e-9)
+
+    try:
+        pnet.activate(inputs[1:])
+    except RuntimeError:
+        pass
+    else:
+        raise Exception("Wrong number of input rows was not detected")
+
+
+@unittest.skipIf(not HAVE_NUMPY, "NumPy is not available.")
+def test_recurrent_matches_python_network():
+    random.seed(2022)
+    config = load_config(False)
+    for g in random_genomes(config, 40):
+        net = RecurrentNetwork.create(g, config)
+        vnet = RecurrentNetwork.create(g, config, backend='numpy')
+        assert isinstance(vnet, VectorizedRecurrentNetwork)
+        for _ in range(2):
+            for _ in range(5):
+                inputs = [random.uniform(-2.0, 2.0) for _ in config.genome_config.input_keys]
+                for a, b in zip(net.activate(inputs), vnet.activate(inputs)):
+                    assert_close(a, b, 1e-6)
+            net.reset()
+            vnet.reset()
+
+    r = VectorizedRecurrentNetwork([-1], [0], [])
+    assert r.activate([1.0]) == [0.0]
+    try:
+        r.activate([1.0, 2.0])
+    except RuntimeError:
+        pass
+    else:
+        raise Exception("Wrong number of inputs was not detected")
+
+
+def double_activation(z):
+    return 2.0 * z
+
+
+def double_activation_array(z):
+    double_activation_array.calls += 1
+    return 2.0 * z
+
+
+@unittest.skipIf(not HAVE_NUMPY, "NumPy is not available.")
+def test_config_vectorized_functions():
+    random.seed(2023)
+    config = load_config()
+    config.genome_config.add_activation('double', double_activation, double_activation_array)
+    config.genome_config.activation_options = ['double']
+    config.genome_config.activation_default = 'double'
+    g = random_genomes(config, 1, mutations=0)[0]
+    net = FeedForwardNetwork.create(g, config)
+    inputs = [random.uniform(-2.0, 2.0) for _ in config.genome_config.input_keys]
+    expected = net.activate(inputs)
+    for vnet in (VectorizedFeedForwardNetwork.create(g, config),
+                 VectorizedRecurrentNetwork.create(g, config),
+                 PopulationFeedForwardNetwork.create([(g.key, g)], config)):
+        double_activation_array.calls = 0
+        result = vnet.activate([inputs] if isinstance(vnet, PopulationFeedForwardNetwork) else inputs)
+        assert double_activation_array.calls > 0
+        if isinstance(vnet, VectorizedFeedForwardNetwork):
+            for a, b in zip(expected, result):
+                assert_close(a, b, 1e-9)
+
+    # Another config's function set, and the networks built without one, do not see it.
+    assert load_config().genome_config.activation_defs.vectorized.get(double_activation) is None
+    double_activation_array.calls = 0
+    VectorizedFeedForwardNetwork(net.input_nodes, net.output_nodes, net.node_evals).activate(inputs)
+    assert double_activation_array.calls == 0
+
+
+def layer_nbytes(layer):
+    return sum(a.nbytes for a in [layer.bias, layer.response, layer.weights, layer.weights_t] +
+               [weights for agg_func, rows, src, weights in layer.groups])
+
+
+@unittest.skipIf(not HAVE_NUMPY, "NumPy is not available.")
+def test_precision():
+    random.seed(2023)
+    config = load_config()
+    config.genome_config.activation_options = ['sigmoid', 'tanh', 'relu', 'identity']
+    num_inputs = len(config.genome_config.input_keys)
+    batch = [[random.uniform(-2.0, 2.0) for _ in range(num_inputs)] for _ in range(16)]
+    genomes = random_genomes(config, 40)
+    expected = [VectorizedFeedForwardNetwork.create(g, config).activate_batch(batch) for g in genomes]
+    for precision, tol in (('float32', 1e-5), ('float16', 2e-2)):
+        delta = 0.0
+        for g, e in zip(genomes, expected):
+            net64 = VectorizedFeedForwardNetwork.create(g, config)
+            net = VectorizedFeedForwardNetwork.create(g, config, precision)
+            result = net.activate_batch(batch)
+            assert result.dtype == precision
+            delta = max(delta, (abs(result - e) / (1.0 + abs(e))).max())
+            assert all(layer.weights.dtype == precision for layer in net.layers)
+            factor = 2 if precision == 'float32' else 4
+            assert net.values.nbytes * factor == net64.values.nbytes
+            assert (sum(layer_nbytes(layer) for layer in net.layers) * factor ==
+                    sum(layer_nbytes(layer) for layer in net64.layers))
+        print("{0}: max relative delta from float64 {1:.3g}".format(precision, delta))
+        assert delta < tol
+
+    try:
+        VectorizedFeedForwardNetwork([-1], [0], [], 'float8')
+    except RuntimeError:
+        pass
+    else:
+        raise Exception("Unknown precision was not detected")
+
+
+@unittest.skipIf(not HAVE_NUMPY, "NumPy is not available.")
+def test_recurrent_precision():
+    random.seed(2024)
+    config = load_config(False)
+    # Bounded activations, since unbounded feedback loops can exceed the range of float16.
+    config.genome_config.activation_options = ['sigmoid', 'tanh']
+    genomes = [(g.key, g) for g in random_genomes(config, 40)]
+    schedule = [[random.uniform(-2.0, 2.0) for _ in config.genome_config.input_keys] for _ in range(10)]
+    for precision, tol in (('float32', 1e-5), ('float16', 5e-2)):
+        delta = 0.0
+        for gid, g in genomes:
+            net64 = VectorizedRecurrentNetwork.create(g, config)
+            net = VectorizedRecurrentNetwork.create(g, config, precision)
+            assert net.nodes.edge_weights.dtype == precision
+            for inputs in schedule:
+                for a, b in zip(net64.activate(inputs), net.activate(inputs)):
+                    delta = max(delta, abs(a - b) / (1.0 + abs(a)))
+        print("recurrent {0}: max relative delta from float64 {1:.3g}".format(precision, delta))
+        assert delta < tol
+
+    config = load_config()
+    config.genome_config.activation_options = ['sigmoid', 'tanh']
+    genomes = [(g.key, g) for g in random_genomes(config, 40)]
+    inputs = [[random.uniform(-2.0, 2.0) for _ in config.genome_config.input_keys] for _ in genomes]
+    expected = PopulationFeedForwardNetwork.create(genomes, config).activate(inputs)
+    for precision, tol in (('float32', 1e-5), ('float16', 2e-2)):
+        result = PopulationFeedForwardNetwork.create(genomes, config, precision).activate(inputs)
+        assert result.dtype == precision
+        delta = abs(result - expected).max()
+        print("lockstep {0}: max delta from float64 {1:.3g}".format(precision, delta))
+        assert delta < tol
+
+
+if __name__ == '__main__':
+    test_basic()
+    test_unconnected()
+    test_bad_input()
+    test_matches_python_network()
+    test_activate_batch()
+    test_population_lockstep()
+    test_recurrent_matches_python_network()
+    test_config_vectorized_functions()
+    test_precision()
+    test_recurrent_precision()